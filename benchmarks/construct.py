@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+construct
+----------------------------------
+
+Measures how many CPU objects can be created per second. The opcode table
+is shared by every CPU, see :py:meth:`py65emu.operation.OpCodes.shared`;
+the `table` mode builds a fresh table each time, what every constructor
+used to do.
+
+Run from the repository root with::
+
+    python -m benchmarks.construct
+"""
+
+import argparse
+import time
+
+from py65emu.cpu import CPU
+from py65emu.mmu import MMU
+from py65emu.operation import OpCodes
+
+
+COUNT = 2000
+"""Number of objects created per run"""
+
+
+def construct_cpu(**kwargs) -> float:
+    """
+    Create :py:data:`COUNT` CPU objects on the same memory.
+
+    :rtype: float
+    :return: Elapsed seconds
+    """
+    mmu = MMU([(0x0000, 0x10000)])
+
+    start = time.perf_counter()
+    for _ in range(COUNT):
+        CPU(mmu=mmu, pc=0x200, **kwargs)
+    return time.perf_counter() - start
+
+
+def construct_table() -> float:
+    """
+    Build :py:data:`COUNT` opcode tables.
+
+    :rtype: float
+    :return: Elapsed seconds
+    """
+    start = time.perf_counter()
+    for _ in range(COUNT):
+        OpCodes(CPU)
+    return time.perf_counter() - start
+
+
+MODES = {
+    "cpu": construct_cpu,
+    "specialize": lambda: construct_cpu(specialize=True),
+    "table": construct_table,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "-n", "--repeat", type=int, default=5,
+        help="Number of runs, the best one is reported (Default: 5)"
+    )
+    parser.add_argument(
+        "-m", "--mode", choices=MODES, action="append",
+        help="Object to construct, can be repeated (Default: all)"
+    )
+    args = parser.parse_args()
+
+    for mode in args.mode or MODES:
+        best = 0.0
+        for _ in range(args.repeat):
+            best = max(best, COUNT / MODES[mode]())
+
+        print(f"construct [{mode}]: {best:,.0f} objects/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+loops
+----------------------------------
+
+Measures instructions per second for a program spending its time in inner
+loops: it fills 32 pages, copies them and sums them up, the kind of code
+:py:class:`py65emu.translate.LoopCache` compiles. Block translation and
+instruction fusion pay off here too, unlike on `nestest`, where most code
+only runs a few times.
+
+Run from the repository root with::
+
+    python -m benchmarks.loops
+"""
+
+import argparse
+import time
+
+from py65emu.cpu import CPU
+from py65emu.mmu import MMU
+
+
+PROGRAM = [
+    # Fill $2000-$3FFF
+    0xA9, 0x20,        # $0200: LDA #$20
+    0x85, 0x11,        # STA $11
+    0xA2, 0x20,        # LDX #$20
+    0xA0, 0x00,        # LDY #$00
+    0xA9, 0x55,        # LDA #$55
+    0x91, 0x10,        # fill: STA ($10),Y
+    0xC8,              # INY
+    0xD0, 0xFB,        # BNE fill
+    0xE6, 0x11,        # INC $11
+    0xCA,              # DEX
+    0xD0, 0xF6,        # BNE fill
+    # Copy $2000-$3FFF to $4000-$5FFF
+    0xA9, 0x20,        # LDA #$20
+    0x85, 0x11,        # STA $11
+    0xA9, 0x40,        # LDA #$40
+    0x85, 0x13,        # STA $13
+    0xA2, 0x20,        # LDX #$20
+    0xB1, 0x10,        # copy: LDA ($10),Y
+    0x91, 0x12,        # STA ($12),Y
+    0xC8,              # INY
+    0xD0, 0xF9,        # BNE copy
+    0xE6, 0x11,        # INC $11
+    0xE6, 0x13,        # INC $13
+    0xCA,              # DEX
+    0xD0, 0xF2,        # BNE copy
+    # Sum up $4000-$5FFF
+    0xA9, 0x40,        # LDA #$40
+    0x85, 0x13,        # STA $13
+    0xA2, 0x20,        # LDX #$20
+    0x18,              # CLC
+    0x71, 0x12,        # sum: ADC ($12),Y
+    0xC8,              # INY
+    0xD0, 0xFB,        # BNE sum
+    0xE6, 0x13,        # INC $13
+    0xCA,              # DEX
+    0xD0, 0xF6,        # BNE sum
+    0x02,              # KIL
+]
+
+
+def load_cpu(**kwargs) -> CPU:
+    mmu = MMU([(0x0000, 0x10000, False, PROGRAM, 0x200)])
+    return CPU(mmu=mmu, pc=0x200, **kwargs)
+
+
+def run(**kwargs) -> tuple[int, float]:
+    """
+    Run the program once, using :py:meth:`CPU.run`.
+
+    :param kwargs: Options of the CPU, like `compile_loops`
+    :rtype: tuple[int, float]
+    :return: Number of executed instructions and elapsed seconds
+    """
+    c = load_cpu(**kwargs)
+
+    start = time.perf_counter()
+    result = c.run()
+    elapsed = time.perf_counter() - start
+
+    return result.instructions, elapsed
+
+
+MODES = {
+    "run": lambda: run(),
+    "fuse": lambda: run(fuse=True),
+    "translate": lambda: run(translate=True),
+    "loops": lambda: run(compile_loops=True),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "-n", "--repeat", type=int, default=5,
+        help="Number of runs, the best one is reported (Default: 5)"
+    )
+    parser.add_argument(
+        "-m", "--mode", choices=MODES, action="append",
+        help="Execution mode to measure, can be repeated (Default: all)"
+    )
+    args = parser.parse_args()
+
+    for mode in args.mode or MODES:
+        best = 0.0
+        for _ in range(args.repeat):
+            instructions, elapsed = MODES[mode]()
+            best = max(best, instructions / elapsed)
+
+        print(
+            f"loops [{mode}]: {instructions:d} instructions, "
+            f"{best:,.0f} instr/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
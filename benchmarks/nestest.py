@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+nestest
+----------------------------------
+
+Measures instructions per second when running the automated part of the
+bundled `nestest.nes` (`$C000` until `$C66E`), the same program that
+`tests/test_nestest.py` verifies.
+
+Run from the repository root with::
+
+    python -m benchmarks.nestest
+"""
+
+import argparse
+import os
+import time
+from typing import Any
+
+from py65emu.cpu import CPU
+from py65emu.mmu import MMU, FlatMemory
+
+
+ROM = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.realpath(__file__))),
+    "tests",
+    "files",
+    "nestest.nes"
+)
+
+
+def load_cpu(memory: type[MMU | FlatMemory] = MMU, **kwargs: Any) -> CPU:
+    with open(ROM, "rb") as f:
+        mmu = memory(
+            [
+                (0x0000, 0x800),  # RAM
+                (0x2000, 0x8),  # PPU
+                (0x4000, 0x18),
+                (0x8000, 0xC000, True, f, 0x3FF0),  # ROM
+            ]
+        )
+
+    c = CPU(mmu=mmu, pc=0xC000, disable_bcd=True, **kwargs)
+    c.r.s = 0xFD
+    return c
+
+
+def run(step: bool = False, **kwargs: Any) -> tuple[int, float]:
+    """
+    Run nestest once, using :py:meth:`CPU.run`.
+
+    :param bool step: Call :py:meth:`CPU.step` for each instruction
+                      instead
+    :param kwargs: Memory class and options of the CPU, see
+                   :py:func:`load_cpu`
+    :rtype: tuple[int, float]
+    :return: Number of executed instructions and elapsed seconds
+    """
+    c = load_cpu(**kwargs)
+
+    start = time.perf_counter()
+    if step:
+        instructions = 0
+        while c.r.pc != 0xC66E:
+            c.step()
+            instructions += 1
+    else:
+        instructions = c.run(stop_pc=0xC66E).instructions
+    elapsed = time.perf_counter() - start
+
+    return instructions, elapsed
+
+
+def bench(name: str, repeat: int = 5, **kwargs: Any) -> None:
+    """
+    Run nestest `repeat` times and print the best rate.
+
+    :param str name: Name of the configuration, for the output
+    :param int repeat: Number of runs
+    :param kwargs: Options of :py:func:`run`
+    """
+    best = 0.0
+    for _ in range(repeat):
+        instructions, elapsed = run(**kwargs)
+        best = max(best, instructions / elapsed)
+
+    print(
+        f"nestest [{name}]: {instructions:d} instructions, "
+        f"{best:,.0f} instr/s"
+    )
+
+
+MODES: dict[str, dict[str, Any]] = {
+    "step": {"step": True},
+    "run": {},
+    "fuse": {"fuse": True},
+    "specialize": {"specialize": True},
+    "table": {"table_cycles": True},
+    "fast": {"profile": "fast"},
+    "translate": {"translate": True},
+    "flat": {"memory": FlatMemory},
+}
+"""Options of :py:func:`run` by execution mode"""
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "-n", "--repeat", type=int, default=5,
+        help="Number of runs, the best one is reported (Default: 5)"
+    )
+    parser.add_argument(
+        "-m", "--mode", choices=MODES, action="append",
+        help="Execution mode to measure, can be repeated (Default: all)"
+    )
+    args = parser.parse_args()
+
+    for mode in args.mode or MODES:
+        bench(mode, args.repeat, **MODES[mode])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import functools
+from array import array
+from typing import Callable, NamedTuple
+
+
+RESULT_FLAGS = 0xC3
+"""Flags an entry sets, `N`, `V`, `Z` and `C`"""
+
+
+class Tables(NamedTuple):
+    """
+    Result of `ADC` and `SBC` for every accumulator, operand and carry.
+    Looked up with :py:func:`index`, each entry holds the 8 bit result in
+    the low byte and the `N`, `V`, `Z` and `C` flags, in the layout of
+    :py:attr:`py65emu.cpu.Registers.p`, in the high byte.
+    """
+
+    adc: array
+    """Add with carry"""
+
+    sbc: array
+    """Subtract with borrow"""
+
+
+def index(a: int, v: int, carry: int) -> int:
+    """
+    Position of an entry in :py:class:`Tables`
+
+    :param int a: Accumulator
+    :param int v: Operand
+    :param int carry: Carry flag, 0 or 1
+    :rtype: int
+    :return: Index
+    """
+    return carry << 16 | a << 8 | v
+
+
+def _entry(result: int, n: int, v: int, z: int, c: int) -> int:
+    return result | (
+        (0x80 if n else 0)
+        | (0x40 if v else 0)
+        | (0x02 if z else 0)
+        | (0x01 if c else 0)
+    ) << 8
+
+
+def adc_binary(a: int, v: int, carry: int) -> int:
+    """
+    `ADC` with the decimal flag clear, or decimal mode disabled
+
+    :param int a: Accumulator
+    :param int v: Operand
+    :param int carry: Carry flag, 0 or 1
+    :rtype: int
+    :return: Table entry
+    """
+    r = a + v + carry
+    result = r & 0xFF
+    return _entry(
+        result,
+        result & 0x80,
+        ~(a ^ v) & (a ^ r) & 0x80,
+        result == 0,
+        r > 0xFF,
+    )
+
+
+def sbc_binary(a: int, v: int, carry: int) -> int:
+    """
+    `SBC` with the decimal flag clear, or decimal mode disabled. The same
+    as adding the complement of the operand.
+
+    :param int a: Accumulator
+    :param int v: Operand
+    :param int carry: Carry flag, 0 or 1
+    :rtype: int
+    :return: Table entry
+    """
+    return adc_binary(a, v ^ 0xFF, carry)
+
+
+def adc_decimal(a: int, v: int, carry: int) -> int:
+    """
+    `ADC` with the decimal flag set, as the NMOS 6502 does it. `Z` is the
+    one of the binary addition, `N` and `V` come from the result before
+    the upper digit is adjusted. Invalid BCD operands give the same result
+    as on the real chip.
+
+    .. seealso:: http://www.6502.org/tutorials/decimal_mode.html
+
+    :param int a: Accumulator
+    :param int v: Operand
+    :param int carry: Carry flag, 0 or 1
+    :rtype: int
+    :return: Table entry
+    """
+    low = (a & 0x0F) + (v & 0x0F) + carry
+    if low >= 0x0A:
+        low = ((low + 0x06) & 0x0F) + 0x10
+
+    r = (a & 0xF0) + (v & 0xF0) + low
+    signed = (a & 0xF0) - (a & 0x80) * 2 + (v & 0xF0) - (v & 0x80) * 2 + low
+    if r >= 0xA0:
+        r += 0x60
+
+    return _entry(
+        r & 0xFF,
+        signed & 0x80,
+        not -128 <= signed <= 127,
+        (a + v + carry) & 0xFF == 0,
+        r >= 0x100,
+    )
+
+
+def sbc_decimal(a: int, v: int, carry: int) -> int:
+    """
+    `SBC` with the decimal flag set, as the NMOS 6502 does it. The flags
+    are the ones of the binary subtraction.
+
+    .. seealso:: http://www.6502.org/tutorials/decimal_mode.html
+
+    :param int a: Accumulator
+    :param int v: Operand
+    :param int carry: Carry flag, 0 or 1
+    :rtype: int
+    :return: Table entry
+    """
+    low = (a & 0x0F) - (v & 0x0F) + carry - 1
+    if low < 0:
+        low = ((low - 0x06) & 0x0F) - 0x10
+
+    r = (a & 0xF0) - (v & 0xF0) + low
+    if r < 0:
+        r -= 0x60
+
+    return (r & 0xFF) | (sbc_binary(a, v, carry) & 0xFF00)
+
+
+def build(operation: Callable[[int, int, int], int]) -> array:
+    """
+    Table of an operation for every accumulator, operand and carry
+
+    :param operation: Computes one entry, like :py:func:`adc_binary`
+    :type operation: Callable[[int, int, int], int]
+    :rtype: array
+    :return: Entries ordered by :py:func:`index`
+    """
+    return array("H", [
+        operation(a, v, carry)
+        for carry in (0, 1)
+        for a in range(0x100)
+        for v in range(0x100)
+    ])
+
+
+@functools.cache
+def binary() -> Tables:
+    """
+    Tables for the decimal flag clear, built on the first call
+
+    :rtype: Tables
+    """
+    return Tables(build(adc_binary), build(sbc_binary))
+
+
+@functools.cache
+def decimal() -> Tables:
+    """
+    Tables for the decimal flag set, built on the first call
+
+    :rtype: Tables
+    """
+    return Tables(build(adc_decimal), build(sbc_decimal))
@@ -0,0 +1,569 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import functools
+import hashlib
+import importlib.util
+import inspect
+import os
+import sys
+from types import MappingProxyType
+from typing import Callable, Mapping, TYPE_CHECKING
+
+from py65emu.operation import (
+    ALWAYS_INDEX_CYCLE,
+    InstructionType,
+    get_opname
+)
+from py65emu.translate import FLAGS
+
+if TYPE_CHECKING:
+    from py65emu.cpu import CPU
+
+
+VERSION = 2
+"""
+Version of the generated code, names the cache directory. Cached modules
+are also keyed on the source of this module, see :py:func:`key`.
+"""
+
+Handler = Callable[["CPU"], None]
+"""Specialized handler, executes one opcode on the given CPU"""
+
+Handlers = tuple[Handler | None, ...]
+"""Specialized handler by opcode, None for undefined opcodes"""
+
+_loaded: dict[str, Handlers] = {}
+# Handlers of immutable instruction sets by identity, profile and
+# directory, holding the set so the identity stays valid
+_memo: dict[
+    tuple[int, str, str | None],
+    tuple[Mapping[int, InstructionType], Handlers]
+] = {}
+
+BRANCH_TESTS: dict[tuple[str, bool], str] = {
+    ("N", True): "r._nz & 0x180",
+    ("N", False): "not r._nz & 0x180",
+    ("Z", True): "not r._nz & 0xFF",
+    ("Z", False): "r._nz & 0xFF",
+    ("C", True): "r._c",
+    ("C", False): "not r._c",
+    ("V", True): "r._v",
+    ("V", False): "not r._v",
+}
+"""
+Condition of each branch on the flag results kept by
+:py:class:`py65emu.cpu.Registers`, by flag and whether it should be set
+"""
+
+SIMPLE = frozenset({
+    "LDA", "LDX", "LDY", "STA", "STX", "STY", "AND", "ORA", "EOR", "BIT",
+    "CMP", "CPX", "CPY", "INX", "INY", "DEX", "DEY", "JMP", "NOP",
+    "B", "CL", "SE", "P", "T",
+})
+"""Mnemonic methods whose body is generated instead of called"""
+
+READ_MODIFY_WRITE: dict[str, tuple[str, str | None]] = {
+    "ASL": ("ASL", None),
+    "LSR": ("LSR", None),
+    "ROL": ("ROL", None),
+    "ROR": ("ROR", None),
+    "INC": ("INC", None),
+    "DEC": ("DEC", None),
+    "SLO": ("ASL", "ORA"),
+    "RLA": ("ROL", "AND"),
+    "SRE": ("LSR", "EOR"),
+    "RRA": ("ROR", "ADC"),
+    "DCP": ("DEC", "CMP"),
+    "ISC": ("INC", "SBC"),
+}
+"""
+Read-modify-write methods, with the modification and the operation the
+illegal ones apply to the result. Generated without the dummy write for
+the `fast` profile.
+"""
+
+PROFILES = ("exact", "fast")
+"""
+`exact` reproduces every bus access and the interrupt bookkeeping of the
+generic methods. `fast` only keeps the architectural results: the dummy
+accesses and the per-access cycle counting are left out, cycles have to
+come from the instruction table (see `table_cycles` on
+:py:class:`py65emu.cpu.CPU`).
+"""
+
+
+class _Function:
+    """
+    Generates the source of one specialized handler.
+
+    With the `exact` profile the generated code calls
+    :py:meth:`py65emu.cpu.CPU.readByte`, :py:meth:`py65emu.cpu.CPU.writeByte`
+    and :py:meth:`py65emu.cpu.CPU.increment_cycle_count` in the same order
+    as the generic methods do, so cycle and interrupt bookkeeping is
+    unchanged. Only the decoding is folded away. The `fast` profile accesses
+    the memory directly, and only where the result depends on it.
+    """
+
+    def __init__(
+        self,
+        opcode: int,
+        name: str,
+        mode: str,
+        cycles: int,
+        type: str,
+        config: object = None,
+        profile: str = "exact"
+    ):
+        self.opcode = opcode
+        self.name = name
+        self.mode = mode
+        self.type = type
+        self.config = config
+        self.fast = profile == "fast"
+        self.lines: list[str] = []
+
+    def emit(self, *lines: str) -> None:
+        self.lines.extend(lines)
+
+    def cycle(self) -> None:
+        if not self.fast:
+            self.emit("cpu.increment_cycle_count()")
+
+    def zn(self, v: str) -> None:
+        self.emit(f"r._nz = {v}")
+
+    def next_byte(self, var: str) -> None:
+        self.emit(f"{var} = read(r.pc)", "r.pc = (r.pc + 1) & 0xFFFF")
+
+    def next_word(self, var: str) -> None:
+        self.next_byte("lo")
+        self.next_byte("hi")
+        self.emit(f"{var} = (hi << 8) + lo")
+
+    def indexed(self, index: str) -> None:
+        """Index `o`, mirroring :py:meth:`py65emu.cpu.CPU.ax_a` & co."""
+        self.emit(f"a = o + r.{index}")
+        if self.opcode in ALWAYS_INDEX_CYCLE[self.mode]:
+            self.cycle()
+        else:
+            self.emit("if o & 0xFF00 != a & 0xFF00:")
+            self.emit("    cpu.cc_extra = (cpu.cc_extra + 1) & 0xFF")
+        self.emit("a &= 0xFFFF")
+
+    def address(self) -> str:
+        """
+        Emit the addressing mode, mirroring the `*_a`-methods on
+        :py:class:`py65emu.cpu.CPU`
+
+        :rtype: str
+        :return: Variable holding the address, or the immediate value
+        """
+        match self.mode:
+            case "im":
+                self.next_byte("v")
+                return "v"
+            case "z":
+                self.next_byte("a")
+            case "zx" | "zy":
+                self.cycle()
+                self.next_byte("a")
+                self.emit(f"a = (a + r.{self.mode[1]}) & 0xFF")
+            case "rel":
+                self.next_byte("d")
+                self.emit("a = (r.pc + (d & 0x7F) - (d & 0x80)) & 0xFFFF")
+            case "a":
+                self.next_word("a")
+            case "ax" | "ay":
+                self.next_word("o")
+                self.indexed(self.mode[1])
+            case "i":
+                self.next_word("i")
+                self.emit(
+                    "j = i - 0xFF if i & 0xFF == 0xFF else i + 1",
+                    "a = ((read(j) << 8) + read(i)) & 0xFFFF",
+                )
+            case "ix":
+                self.cycle()
+                self.next_byte("i")
+                self.emit(
+                    "i = (i + r.x) & 0xFF",
+                    "a = ((read((i + 1) & 0xFF) << 8) + read(i)) & 0xFFFF",
+                )
+            case "iy":
+                self.next_byte("i")
+                self.emit("o = (read((i + 1) & 0xFF) << 8) + read(i)")
+                self.indexed("y")
+            case _:
+                raise ValueError(
+                    f"Opcode ${self.opcode:0>2x} needs an operand "
+                    f"in address mode {self.mode!r}"
+                )
+        return "a"
+
+    def operand(self) -> str:
+        """
+        Emit the operand, mirroring :py:meth:`py65emu.operation.Operation.bind`
+
+        :rtype: str
+        :return: Expression for the operand
+        """
+        if self.config:
+            return repr(self.config)
+
+        a = self.address()
+        if self.type == "v" and self.mode != "im":
+            self.emit(f"v = read({a})")
+            return "v"
+        return a
+
+    def body(self, opname: str) -> None:
+        config = self.config
+        match opname:
+            case "B":
+                assert isinstance(config, tuple)
+                flag, value = config
+                self.address()
+                self.emit(
+                    f"if {BRANCH_TESTS[str(flag), bool(value)]}:",
+                    "    cpu.cc_extra = (cpu.cc_extra + 1) & 0xFF",
+                    "    if a & 0xFF00 != r.pc & 0xFF00:",
+                    "        cpu.cc_extra = (cpu.cc_extra + 1) & 0xFF",
+                    "    r.pc = a",
+                )
+            case "SE" | "CL":
+                flag = str(config)
+                if flag in ("C", "V"):
+                    value = "True" if opname == "SE" else "False"
+                    self.emit(f"r._{flag.lower()} = {value}")
+                elif opname == "SE":
+                    self.emit(f"r._p |= 0x{FLAGS[flag]:0>2X}")
+                else:
+                    self.emit(f"r._p &= 0x{0xFF ^ FLAGS[flag]:0>2X}")
+                self.cycle()
+            case "P":
+                assert isinstance(config, tuple)
+                action, register = config
+                self.cycle()
+                if action == "PH":
+                    value = "r.p | 0x30" if register == "p" else "r.a"
+                    self.emit(f"cpu.stackPush({value})")
+                    return
+                self.emit(f"r.{register} = cpu.stackPop()")
+                if register == "a":
+                    self.zn("r.a")
+                else:
+                    self.emit("r.p = (r.p & 0xEF) | 0x20")
+                self.cycle()
+            case "T":
+                assert isinstance(config, tuple)
+                source, destination = config
+                self.cycle()
+                self.emit(f"r.{destination} = r.{source}")
+                if destination != "s":
+                    self.zn(f"r.{destination}")
+            case "INX" | "INY" | "DEX" | "DEY":
+                register = opname[2].lower()
+                sign = "+" if opname[0] == "I" else "-"
+                self.emit(f"r.{register} = (r.{register} {sign} 1) & 0xFF")
+                self.zn(f"r.{register}")
+                self.cycle()
+            case "NOP":
+                self.operand()
+                if self.mode != "im":
+                    self.cycle()
+            case "LDA" | "LDX" | "LDY":
+                register = opname[2].lower()
+                self.emit(f"r.{register} = {self.operand()}")
+                self.zn(f"r.{register}")
+            case "STA" | "STX" | "STY":
+                a = self.operand()
+                self.emit(f"write({a}, r.{opname[2].lower()})")
+            case "AND" | "ORA" | "EOR":
+                operator = {"AND": "&", "ORA": "|", "EOR": "^"}[opname]
+                self.emit(f"r.a = r.a {operator} {self.operand()}")
+                self.zn("r.a")
+            case "BIT":
+                v = self.operand()
+                self.emit(
+                    f"r.p = (r.p & 0x3D) | ({v} & 0xC0)"
+                    f" | (0x02 if r.a & {v} == 0 else 0)"
+                )
+            case "CMP" | "CPX" | "CPY":
+                register = {"CMP": "a", "CPX": "x", "CPY": "y"}[opname]
+                v = self.operand()
+                self.emit(
+                    f"o = (r.{register} - {v}) & 0xFF",
+                    "r._nz = o",
+                    f"r._c = r.{register} >= {v}",
+                )
+            case "JMP":
+                self.emit(f"r.pc = {self.operand()}")
+
+    def read_modify_write(self, opname: str) -> None:
+        """
+        Emit a read-modify-write operation on memory, reading and writing
+        once. Mirrors the flags of :py:meth:`py65emu.cpu.CPU.ASL` & co.
+        """
+        a = self.address()
+        self.emit(f"v = read({a})")
+        step, then = READ_MODIFY_WRITE[opname]
+        match step:
+            case "ASL":
+                self.emit(
+                    "n = (v << 1) & 0xFF",
+                    "r._nz = n",
+                    "r._c = v >> 7",
+                    # CPU.ASL writes the unmasked shifted value
+                    f"write({a}, v << 1)",
+                )
+            case "LSR":
+                self.emit(
+                    "n = v >> 1",
+                    "r._nz = n",
+                    "r._c = v & 0x01",
+                    f"write({a}, n)",
+                )
+            case "ROL":
+                self.emit(
+                    "n = ((v << 1) + (1 if r._c else 0)) & 0xFF",
+                    "r._nz = n",
+                    "r._c = v >> 7",
+                    f"write({a}, n)",
+                )
+            case "ROR":
+                self.emit(
+                    "n = (v >> 1) + (0x80 if r._c else 0)",
+                    "r._nz = n",
+                    "r._c = v & 0x01",
+                    f"write({a}, n)",
+                )
+            case _:  # INC, DEC
+                sign = "+" if step == "INC" else "-"
+                self.emit(
+                    f"n = (v {sign} 1) & 0xFF",
+                    f"write({a}, n)",
+                )
+                self.zn("n")
+
+        if then in ("ORA", "AND", "EOR", "CMP"):
+            # The result is read back, like the generic methods do
+            self.emit(f"v = read({a})")
+            if then == "CMP":
+                self.emit(
+                    "o = (r.a - v) & 0xFF",
+                    "r._nz = o",
+                    "r._c = r.a >= v",
+                )
+            else:
+                operator = {"AND": "&", "ORA": "|", "EOR": "^"}[then]
+                self.emit(f"r.a = r.a {operator} v")
+                self.zn("r.a")
+        elif then is not None:
+            self.emit(f"cpu.{then}(read({a}))")
+
+    def source(self, opname: str) -> str:
+        """
+        :param str opname: Method name for the mnemonic, see
+                           :py:attr:`py65emu.operation.Operation.opname`
+        :rtype: str
+        :return: Source of the handler function
+        """
+        if opname in SIMPLE:
+            self.body(opname)
+        elif (
+            self.fast
+            and opname in READ_MODIFY_WRITE
+            and not self.config
+        ):
+            self.read_modify_write(opname)
+        else:
+            self.emit(f"cpu.{opname}({self.operand()})")
+
+        if not self.lines:
+            self.emit("pass")
+
+        header = [
+            f"def op_{self.opcode:0>2x}(cpu):",
+            f"    # {self.name} {self.mode}",
+        ]
+        if any("r." in line for line in self.lines):
+            header.append("    r = cpu.r")
+        if any("read(" in line for line in self.lines):
+            header.append(
+                "    read = "
+                + ("cpu.mmu.cpu_read" if self.fast else "cpu.readByte")
+            )
+        if any("write(" in line for line in self.lines):
+            header.append(
+                "    write = "
+                + ("cpu.mmu.cpu_write" if self.fast else "cpu.writeByte")
+            )
+        return "\n".join(header + [f"    {line}" for line in self.lines])
+
+
+def generate(
+    instructions: Mapping[int, InstructionType],
+    profile: str = "exact"
+) -> str:
+    """
+    Generate a module with one specialized handler per opcode
+
+    :param instructions: Instruction set, see
+                         :py:meth:`py65emu.operation.OpCodes.instructions`
+    :param str profile: One of :py:data:`PROFILES`
+    :type instructions: Mapping[int, InstructionType]
+    :rtype: str
+    :return: Module source, defining `HANDLERS`
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown profile {profile!r}")
+
+    functions = [
+        _Function(opcode, *config, profile=profile).source(
+            get_opname(config[0])
+        )
+        for opcode, config in sorted(instructions.items())
+    ]
+    handlers = [
+        f"    op_{opcode:0>2x}," if opcode in instructions else "    None,"
+        for opcode in range(0x100)
+    ]
+    return "\n".join([
+        f"# Generated by py65emu.codegen (version {VERSION:d}, "
+        f"{profile} profile), do not edit",
+        "",
+        "",
+        "\n\n\n".join(functions),
+        "",
+        "",
+        "HANDLERS = (",
+        *handlers,
+        ")",
+        "",
+    ])
+
+
+def cache_dir() -> str:
+    """
+    Directory holding the generated modules. `$PY65EMU_CACHE_DIR` if set,
+    otherwise `py65emu` in `$XDG_CACHE_HOME` (or `~/.cache`), with a
+    subdirectory per :py:data:`VERSION`.
+
+    :rtype: str
+    :return: Path to the cache directory
+    """
+    root = os.environ.get("PY65EMU_CACHE_DIR") or os.path.join(
+        os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+        "py65emu"
+    )
+    return os.path.join(root, f"codegen-{VERSION:d}")
+
+
+@functools.cache
+def generator_digest() -> str:
+    """
+    Digest of the source of this module, so any change to the generator
+    invalidates the cached modules without a :py:data:`VERSION` bump
+
+    :rtype: str
+    :return: Hex digest, of an empty source if it isn't available
+    """
+    try:
+        source = inspect.getsource(sys.modules[__name__])
+    except (OSError, TypeError):
+        # Installed without sources, only VERSION tells versions apart
+        source = ""
+    return hashlib.sha256(source.encode()).hexdigest()
+
+
+def key(
+    instructions: Mapping[int, InstructionType],
+    profile: str = "exact"
+) -> str:
+    """
+    Digest of everything the generated code depends on: the instruction
+    set, the profile and the generator itself
+
+    :param instructions: Instruction set
+    :param str profile: One of :py:data:`PROFILES`
+    :type instructions: Mapping[int, InstructionType]
+    :rtype: str
+    :return: Hex digest
+    """
+    table = repr((
+        VERSION,
+        generator_digest(),
+        profile,
+        sorted(instructions.items()),
+        sorted((k, sorted(v)) for k, v in ALWAYS_INDEX_CYCLE.items()),
+    ))
+    return hashlib.sha256(table.encode()).hexdigest()[:16]
+
+
+def load(
+    instructions: Mapping[int, InstructionType],
+    directory: str | None = None,
+    profile: str = "exact"
+) -> Handlers:
+    """
+    Specialized handlers for the instruction set, generated on first use
+    and cached on disk. Later calls, also from other processes, import the
+    cached module (and its bytecode) instead of generating it again. If the
+    cache can't be written the module is compiled in memory. The handlers
+    of an immutable instruction set, like
+    :py:data:`py65emu.operation.INSTRUCTIONS`, are remembered by identity,
+    so later calls skip computing the :py:func:`key`.
+
+    :param instructions: Instruction set, see
+                         :py:meth:`py65emu.operation.OpCodes.instructions`
+    :param directory: Cache directory, defaults to :py:func:`cache_dir`
+    :param str profile: One of :py:data:`PROFILES`
+    :type instructions: Mapping[int, InstructionType]
+    :type directory: str | None
+    :rtype: Handlers
+    :return: Handler by opcode
+    """
+    memo = (id(instructions), profile, directory)
+    entry = _memo.get(memo)
+    if entry is not None and entry[0] is instructions:
+        return entry[1]
+
+    handlers = _load(instructions, directory, profile)
+    if isinstance(instructions, MappingProxyType):
+        _memo[memo] = (instructions, handlers)
+    return handlers
+
+
+def _load(
+    instructions: Mapping[int, InstructionType],
+    directory: str | None,
+    profile: str
+) -> Handlers:
+    name = f"opcodes_{profile}_{key(instructions, profile)}"
+    path = os.path.join(directory or cache_dir(), f"{name}.py")
+    if path in _loaded:
+        return _loaded[path]
+
+    if not os.path.exists(path):
+        source = generate(instructions, profile)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write next to the target and rename, so a concurrent
+            # process never imports a partial module
+            temporary = f"{path}.{os.getpid():d}.tmp"
+            with open(temporary, "w") as f:
+                f.write(source)
+            os.replace(temporary, path)
+        except OSError:
+            namespace: dict = {}
+            exec(compile(source, f"<{name}>", "exec"), namespace)
+            _loaded[path] = namespace["HANDLERS"]
+            return _loaded[path]
+
+    spec = importlib.util.spec_from_file_location(name, path)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    _loaded[path] = module.HANDLERS
+    return _loaded[path]
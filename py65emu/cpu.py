@@ -1,10 +1,26 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
+import copy
 import math
+import operator
 from enum import Enum
+from typing import Callable, Iterable, NamedTuple
+from py65emu import arithmetic, codegen
 from py65emu.mmu import Memory
-from py65emu.operation import Operation, OpCodes
+from py65emu.operation import ALWAYS_INDEX_CYCLE, Operation, OpCodes
 from py65emu.debug import Disassembly
+from py65emu.fusion import (
+    FUSIONS,
+    MAX_PREFIX_BYTES,
+    MAX_PREFIX_CYCLES,
+    FusedHandler
+)
+from py65emu.translate import (
+    BlockCache,
+    CompiledLoop,
+    LoopCache,
+    TranslatedBlock
+)
 
 
 class FlagBit(Enum):
@@ -88,6 +104,82 @@ class FlagBit(Enum):
     """
 
 
+FLAG_N = FlagBit.N.value
+FLAG_V = FlagBit.V.value
+FLAG_U = FlagBit.U.value
+FLAG_B = FlagBit.B.value
+FLAG_D = FlagBit.D.value
+FLAG_I = FlagBit.I.value
+FLAG_Z = FlagBit.Z.value
+FLAG_C = FlagBit.C.value
+
+FLAG_MASKS: dict[str, int] = {flag.name: flag.value for flag in FlagBit}
+"""Bit mask of each flag in :py:attr:`Registers.p`, by name"""
+
+
+IDLE_LOOP_BYTES = 8
+"""Largest distance of a backward jump checked for an idle loop"""
+
+
+class StopReason(Enum):
+    """
+    Why :py:meth:`py65emu.cpu.CPU.run` returned
+    """
+
+    CYCLES = "cycles"
+    """The cycle budget was used up"""
+
+    INSTRUCTIONS = "instructions"
+    """The instruction budget was used up"""
+
+    HALTED = "halted"
+    """The CPU is halted, i.e. a `KIL` was executed"""
+
+    PC = "pc"
+    """The program counter reached the stop address"""
+
+    IDLE = "idle"
+    """
+    The CPU is in a loop it can't leave without an interrupt, and no budget
+    was given
+    """
+
+    PREDICATE = "predicate"
+    """The predicate given to :py:meth:`py65emu.cpu.CPU.run_until` held"""
+
+
+class RunResult(NamedTuple):
+    """
+    Summary returned by :py:meth:`py65emu.cpu.CPU.run`
+    """
+
+    cycles: int
+    """Number of cycles executed during the run"""
+
+    instructions: int
+    """Number of instructions executed during the run"""
+
+    reason: StopReason
+    """Why the run stopped"""
+
+
+def flag_mask(flag: FlagBit | int | str) -> int:
+    """
+    Bit mask of a flag
+
+    :param flag: One of `N`, `V`, `U`, `B`, `D`, `I`, `Z`, `C`
+    :type flag: FlagBit or int or str
+    :rtype: int
+    :return: Bit mask in :py:attr:`Registers.p`
+    :raises: KeyError, ValueError
+    """
+    if isinstance(flag, FlagBit):
+        return flag.value
+    elif isinstance(flag, str):
+        return FlagBit[flag].value
+    return FlagBit(flag).value
+
+
 class Registers:
     """
     CPU registers
@@ -97,6 +189,8 @@ class Registers:
     algorithms must make efficient use of both registers and memory.
     """
 
+    __slots__ = ("a", "x", "y", "s", "pc", "_p", "_nz", "_c", "_v")
+
     a: int
     """
     Accumulator - 8 bit
@@ -162,18 +256,21 @@ class Registers:
     returning from a subroutine or interrupt.
     """
 
-    p: int
+    _p: int
+    """`U`, `B`, `D` and `I` flags, the others are kept below"""
+
+    _nz: int
+    """
+    Result `N` and `Z` are derived from, see :py:meth:`.ZN`. `Z` is set
+    if the low byte is 0, `N` if bit 7 or 8 is set. Bit 8 only comes from
+    writing :py:attr:`.p` with both flags set.
     """
-    Flag Pointer - 8 bit - N|V|1|B|D|I|Z|C
 
-    As instructions are executed a set of processor flags are set or clear to
-    record the results of the operation. This flags and some additional control
-    flags are held in a special status register. Each flag has a single bit
-    within the register.
+    _c: bool | int
+    """Carry, 0 or 1, or a bool"""
 
-    Instructions exist to test the values of the various bits, to set or clear
-    some of them and to push or pull the entire set to or from the stack.
-    """
+    _v: bool | int
+    """Overflow, set if true"""
 
     def __init__(self, pc: int = 0x0000):
         """Init Registers
@@ -200,6 +297,42 @@ class Registers:
         self.pc = pc         # Program Counter
         self.p = 0b00100100  # Flag Pointer - N|V|1|B|D|I|Z|C
 
+    @property
+    def p(self) -> int:
+        """
+        Flag Pointer - 8 bit - N|V|1|B|D|I|Z|C
+
+        As instructions are executed a set of processor flags are set or clear
+        to record the results of the operation. This flags and some
+        additional control flags are held in a special status register. Each
+        flag has a single bit within the register.
+
+        Instructions exist to test the values of the various bits, to set or
+        clear some of them and to push or pull the entire set to or from the
+        stack.
+
+        The CPU only records the result of most operations, reading the
+        register computes `N`, `Z`, `C` and `V` from them.
+        """
+        nz = self._nz
+        return (
+            self._p
+            | (FLAG_N if nz & 0x180 else 0)
+            | (0 if nz & 0xFF else FLAG_Z)
+            | (FLAG_V if self._v else 0)
+            | (FLAG_C if self._c else 0)
+        )
+
+    @p.setter
+    def p(self, value: int) -> None:
+        self._p = value & 0x3C
+        if value & FLAG_Z:
+            self._nz = 0x100 if value & FLAG_N else 0
+        else:
+            self._nz = value & FLAG_N or 1
+        self._c = value & FLAG_C
+        self._v = value & FLAG_V
+
     def getFlag(self, flag: FlagBit | int | str) -> bool:
         """Get flag value
 
@@ -208,14 +341,7 @@ class Registers:
         :rtype: bool
         :return: Whether the flag is set or not
         """
-        if isinstance(flag, FlagBit):
-            pass
-        elif isinstance(flag, str):
-            flag = FlagBit[flag]
-        elif isinstance(flag, int):
-            flag = FlagBit(flag)
-
-        return bool(self.p & flag.value)
+        return self._get_flag(flag_mask(flag))
 
     def setFlag(
         self,
@@ -229,17 +355,7 @@ class Registers:
         :type flag: FlagBit or int or str
         :param bool | int v: Flag is set or not
         """
-        if isinstance(flag, FlagBit):
-            pass
-        elif isinstance(flag, str):
-            flag = FlagBit[flag]
-        elif isinstance(flag, int):
-            flag = FlagBit(flag)
-
-        if v > 0:
-            self.p = self.p | flag.value
-        else:
-            self.clearFlag(flag)
+        self._set_flag(flag_mask(flag), v > 0)
 
     def clearFlag(self, flag: FlagBit | int | str) -> None:
         """Clear flag value
@@ -247,43 +363,94 @@ class Registers:
         :param flag: One of `N`, `V`, `B`, `D`, `I`, `Z`, `C`
         :type flag: FlagBit or int or str
         """
-        if isinstance(flag, FlagBit):
-            pass
-        elif isinstance(flag, str):
-            flag = FlagBit[flag]
-        elif isinstance(flag, int):
-            flag = FlagBit(flag)
-
-        self.p = self.p & ~flag.value
-        # self.p = self.p & (255 - flag)
+        self._clear_flag(flag_mask(flag))
 
     def clearFlags(self) -> None:
         """Clear all flag values
         """
         self.p = 0
 
+    def _get_flag(self, mask: int) -> bool:
+        """
+        Get flag value, used by the CPU instead of :py:meth:`.getFlag`.
+        Reads the field holding the flag, without assembling :py:attr:`p`.
+
+        :param int mask: Bit mask of the flag, e.g. :py:data:`FLAG_C`
+        :rtype: bool
+        :return: Whether the flag is set or not
+        """
+        if mask == FLAG_C:
+            return bool(self._c)
+        if mask == FLAG_V:
+            return bool(self._v)
+        if mask == FLAG_Z:
+            return not self._nz & 0xFF
+        if mask == FLAG_N:
+            return bool(self._nz & 0x180)
+        return self._p & mask != 0
+
+    def _set_flag(self, mask: int, v: bool | int = True) -> None:
+        """
+        Set flag value, used by the CPU instead of :py:meth:`.setFlag`.
+        Updates the field holding the flag, without assembling
+        :py:attr:`p`.
+
+        :param int mask: Bit mask of the flag, e.g. :py:data:`FLAG_C`
+        :param bool | int v: Flag is set or not
+        """
+        if mask == FLAG_C:
+            self._c = bool(v)
+        elif mask == FLAG_V:
+            self._v = bool(v)
+        elif mask == FLAG_Z or mask == FLAG_N:
+            # Rebuild the recorded result from the two flags
+            n = bool(self._nz & 0x180)
+            z = not self._nz & 0xFF
+            if mask == FLAG_Z:
+                z = bool(v)
+            else:
+                n = bool(v)
+            if z:
+                self._nz = 0x100 if n else 0
+            else:
+                self._nz = 0x80 if n else 1
+        elif v:
+            self._p |= mask
+        else:
+            self._p &= ~mask
+
+    def _clear_flag(self, mask: int) -> None:
+        """
+        Clear flag value, used by the CPU instead of :py:meth:`.clearFlag`
+
+        :param int mask: Bit mask of the flag, e.g. :py:data:`FLAG_C`
+        """
+        self._set_flag(mask, False)
+
     def ZN(self, v) -> None:
         """
         | The criteria for Z and N flags are standard.
         | Z gets set if the value is zero and
         | N gets set to the same value as bit 7 of the value.
 
-        :param int v: Value
+        Only records the value, see :py:attr:`.p`
+
+        :param int v: 8 bit value
         """
-        self.setFlag(FlagBit.Z, v == 0)
-        self.setFlag(FlagBit.N, v & 0x80)
+        self._nz = v
 
     @property
     def flags(self) -> str:
+        p = self.p
         return "{0:s}{1:s}{2:s}{3:s}{4:s}{5:s}{6:s}{7:s}".format(
-            "N" if self.getFlag(FlagBit.N) else ".",
-            "V" if self.getFlag(FlagBit.V) else ".",
-            "U" if self.getFlag(FlagBit.U) else ".",
-            "B" if self.getFlag(FlagBit.B) else ".",
-            "D" if self.getFlag(FlagBit.D) else ".",
-            "I" if self.getFlag(FlagBit.I) else ".",
-            "Z" if self.getFlag(FlagBit.Z) else ".",
-            "C" if self.getFlag(FlagBit.C) else ".",
+            "N" if p & FLAG_N else ".",
+            "V" if p & FLAG_V else ".",
+            "U" if p & FLAG_U else ".",
+            "B" if p & FLAG_B else ".",
+            "D" if p & FLAG_D else ".",
+            "I" if p & FLAG_I else ".",
+            "Z" if p & FLAG_Z else ".",
+            "C" if p & FLAG_C else ".",
         )
 
     def __repr__(self) -> str:
@@ -330,6 +497,13 @@ class CPU:
         magic: int = 0xEE,
         disable_bcd: bool = False,
         debug: bool = False,
+        translate: bool = False,
+        fuse: bool = False,
+        skip_idle: bool = True,
+        specialize: bool = False,
+        table_cycles: bool = False,
+        profile: str = "exact",
+        compile_loops: bool = False,
     ):
         """
         Initialize CPU
@@ -343,10 +517,44 @@ class CPU:
         :param magic: A value needed for the illegal opcodes, XAA. This value
                       differs between different versions, even of the same
                       CPU. The default is 0xee
+        :param disable_bcd: Ignore the decimal flag in `ADC` and `SBC`
+        :param debug: Print each executed instruction
+        :param translate: Let :py:meth:`.run` execute straight-line code
+                          through a :py:class:`py65emu.translate.BlockCache`
+        :param fuse: Let :py:meth:`.run` execute common instruction
+                     sequences as one handler, see
+                     :py:data:`py65emu.fusion.FUSIONS`
+        :param skip_idle: Let :py:meth:`.run` fast-forward through loops
+                          that don't change anything, see
+                          :py:meth:`._idle_loop`
+        :param specialize: Execute each opcode through a handler generated
+                           for it, see :py:func:`py65emu.codegen.load`
+        :param table_cycles: Charge each instruction the cycles from the
+                             instruction table, plus page crossing and
+                             branch penalties, instead of counting every
+                             memory access
+        :param profile: `exact` reproduces every memory access, including
+                        the dummy ones, and the interrupt bookkeeping on
+                        every cycle. `fast` installs generated handlers
+                        that only keep the architectural results and
+                        implies `table_cycles`. See
+                        :py:data:`py65emu.codegen.PROFILES`
+        :param compile_loops: Let :py:meth:`.run` compile hot inner loops
+                              through a
+                              :py:class:`py65emu.translate.LoopCache`
         :type mmu: Memory | None
         :type pc: int | None
         :type stack_page: int
         :type magic: int
+        :type disable_bcd: bool
+        :type debug: bool
+        :type translate: bool
+        :type fuse: bool
+        :type skip_idle: bool
+        :type specialize: bool
+        :type table_cycles: bool
+        :type profile: str
+        :type compile_loops: bool
         """
         self.mmu: Memory = mmu
 
@@ -380,8 +588,43 @@ class CPU:
             pass
 
         self.debug = debug
-        self.opcodes = OpCodes(self)
+        if profile not in codegen.PROFILES:
+            raise ValueError(f"Unknown profile {profile!r}")
+        self.profile = profile
+        self.table_cycles = table_cycles or profile == "fast"
+        if self.table_cycles:
+            # Plain memory accesses, the cycles are charged per instruction
+            self.readByte = mmu.cpu_read  # type: ignore[method-assign]
+            self.writeByte = mmu.cpu_write  # type: ignore[method-assign]
+            self.increment_cycle_count = (  # type: ignore[method-assign]
+                self._skip_cycle_count
+            )
+
+        # Built once per process and shared by every CPU, the handlers
+        # take the CPU they execute on
+        self.opcodes = OpCodes.shared(type(self))
+        if specialize or profile != "exact":
+            self.opcodes = OpCodes.shared(
+                type(self),
+                codegen.load(self.opcodes.instructions(), profile=profile)
+            )
         self.op = None
+        self.running = True
+
+        self.blocks: BlockCache | None = None
+        if translate:
+            self.blocks = BlockCache(self)
+
+        self.loops: LoopCache | None = None
+        if compile_loops:
+            self.loops = LoopCache(self)
+
+        self.fusions: dict[int, FusedHandler] | None = (
+            FUSIONS if fuse else None
+        )
+
+        self.skip_idle = skip_idle
+        self._idle_probe: tuple | None = None
 
     def reset(self) -> None:
         """Reset everything (CPU, Memory, ...)"""
@@ -396,8 +639,43 @@ class CPU:
         self.cc_extra = 0
         self.cc_total = 7  # Reset takes 7 cycles
 
+        if self.blocks is not None:
+            self.blocks.flush()
+        if self.loops is not None:
+            self.loops.flush()
+
         self.running = True
 
+    def fork(self) -> "CPU":
+        """
+        An independent copy of the CPU, in the same state, running on a
+        copy of the memory, see :py:meth:`py65emu.mmu.MMU.fork`. Useful to
+        try several inputs from one point, or to keep checkpoints, without
+        copying the whole memory each time.
+
+        The new CPU starts with empty translation and loop caches.
+
+        :rtype: CPU
+        :return: The new CPU
+        """
+        cpu = copy.copy(self)
+        cpu.mmu = mmu = self.mmu.fork()
+        cpu.r = copy.copy(self.r)
+        if self.table_cycles:
+            cpu.readByte = mmu.cpu_read  # type: ignore[method-assign]
+            cpu.writeByte = mmu.cpu_write  # type: ignore[method-assign]
+            cpu.increment_cycle_count = (  # type: ignore[method-assign]
+                cpu._skip_cycle_count
+            )
+
+        if self.blocks is not None:
+            cpu.blocks = BlockCache(cpu, self.blocks.threshold)
+        if self.loops is not None:
+            cpu.loops = LoopCache(cpu, self.loops.threshold)
+            cpu.loops.io = bytearray(self.loops.io)
+        cpu._idle_probe = None
+        return cpu
+
     def step(self) -> None:
         """Execute the operation"""
         self.cc = 0
@@ -406,6 +684,397 @@ class CPU:
         opcode = self.nextByte()
         self._run_operation(opcode)
 
+    def run(
+        self,
+        max_cycles: int | None = None,
+        max_instructions: int | None = None,
+        stop_pc: int | None = None,
+    ) -> RunResult:
+        """
+        Execute instructions, the same way as repeatedly calling
+        :py:meth:`.step` would, until one of the following happens:
+
+        * At least `max_cycles` cycles have been executed
+        * `max_instructions` instructions have been executed
+        * The CPU halts (:py:meth:`.KIL`, :py:attr:`.running` is False)
+        * The program counter is `stop_pc`, before executing it
+        * No budget was given and the CPU is stuck in an idle loop
+
+        The conditions are checked before each instruction, so the cycle
+        budget can be exceeded by the last instruction executed.
+
+        Loops that only read memory, and end up in the same state on every
+        iteration (`JMP *`, `wait: LDA $2002 / BPL wait` while nothing
+        changes $2002), are detected after a few iterations. The remaining
+        iterations up to the budget are skipped in one go, just adding
+        their cycles to :py:attr:`.cc_total`.
+
+        >>> result = cpu.run(max_cycles=1_000_000, stop_pc=0xC66E)
+        >>> result.reason
+        <StopReason.PC: 'pc'>
+
+        :param max_cycles: Cycle budget. (Default: None, unlimited)
+        :param max_instructions: Instruction budget.
+                                 (Default: None, unlimited)
+        :param stop_pc: Stop when the program counter reaches this address.
+                        (Default: None)
+        :type max_cycles: int | None
+        :type max_instructions: int | None
+        :type stop_pc: int | None
+        :rtype: RunResult
+        :return: Number of cycles and instructions executed, and why the
+                 run stopped
+        """
+        return self.run_until(
+            pcs=None if stop_pc is None else (stop_pc,),
+            max_cycles=max_cycles,
+            max_instructions=max_instructions,
+        )
+
+    def run_until(
+        self,
+        pcs: Iterable[int] | None = None,
+        predicate: Callable[["CPU"], bool] | None = None,
+        max_cycles: int | None = None,
+        max_instructions: int | None = None,
+        every: int | None = None,
+        watch: Iterable[int] | None = None,
+    ) -> RunResult:
+        """
+        Like :py:meth:`.run`, but stops at any of several addresses, or once
+        `predicate` returns True.
+
+        The addresses are kept in a set, so checking them costs the same
+        for any number of them. The predicate is more expensive and isn't
+        called before each instruction, only at these points:
+
+        * Every `every` instructions
+        * After an instruction (or a translated block, a compiled loop or a
+          fused sequence) wrote to a page holding one of the `watch`
+          addresses. This uses the write counters of the memory
+          (:py:attr:`py65emu.mmu.Memory.generations`)
+
+        >>> result = cpu.run_until(
+        ...     pcs={0xC66E, 0xC000},
+        ...     predicate=lambda c: c.mmu.cpu_read(0x0002) != 0,
+        ...     watch=[0x0002],
+        ...     max_cycles=1_000_000,
+        ... )
+
+        :param pcs: Stop when the program counter reaches one of these
+                    addresses. (Default: None)
+        :param predicate: Stop when it returns True for the CPU.
+                          (Default: None)
+        :param max_cycles: Cycle budget. (Default: None, unlimited)
+        :param max_instructions: Instruction budget.
+                                 (Default: None, unlimited)
+        :param every: Call `predicate` every this many instructions.
+                      (Default: None, only for `watch`)
+        :param watch: Call `predicate` after writes to these addresses.
+                      (Default: None)
+        :type pcs: Iterable[int] | None
+        :type predicate: Callable[[CPU], bool] | None
+        :type max_cycles: int | None
+        :type max_instructions: int | None
+        :type every: int | None
+        :type watch: Iterable[int] | None
+        :rtype: RunResult
+        :return: Number of cycles and instructions executed, and why the
+                 run stopped
+        :raises ValueError: If `watch` is given for a memory without
+                            :py:attr:`py65emu.mmu.Memory.generations`, or
+                            `predicate` without `every` and `watch`
+        """
+        cycle_limit = math.inf if max_cycles is None else max_cycles
+        instruction_limit = (
+            math.inf if max_instructions is None else max_instructions
+        )
+
+        stops = frozenset(pcs or ())
+        # Addresses from which a fused sequence would run past a stop
+        near_stops = frozenset(
+            (pc - offset) & 0xFFFF
+            for pc in stops
+            for offset in range(1, MAX_PREFIX_BYTES + 1)
+        )
+        # Whether a stop lies inside a translated block or loop, by block
+        crosses_stop: dict[TranslatedBlock | CompiledLoop, bool] = {}
+
+        interval = math.inf
+        generations: list[int] = []
+        watched: Callable[[list[int]], object] | None = None
+        if predicate is not None:
+            if every is None and watch is None:
+                raise ValueError("predicate needs every or watch")
+            if every is not None:
+                interval = every
+            if watch is not None:
+                memory_generations = self._generations
+                if memory_generations is None:
+                    raise ValueError("watch needs a memory with generations")
+                generations = memory_generations
+                watched = operator.itemgetter(
+                    *sorted({(addr >> 8) & 0xFF for addr in watch})
+                )
+        check_at = interval
+        seen = None if watched is None else watched(generations)
+
+        r = self.r
+        opcodes = self.opcodes
+        ops = opcodes.ops
+        readByte = self.readByte
+        table_cycles = self.table_cycles
+        exact = self.profile == "exact"
+        debug = self.debug is True
+        blocks = self.blocks if not debug else None
+        loops = self.loops if not debug else None
+        fusions = self.fusions if not debug else None
+        # Fused handlers read ahead, which has side effects on I/O pages
+        io = getattr(self.mmu, "io", bytes(0x100))
+
+        # Only short backward jumps are checked for idle loops
+        window = (
+            IDLE_LOOP_BYTES
+            if self.skip_idle and not debug and self._generations is not None
+            else -1
+        )
+        self._idle_probe = None
+        previous = -1
+
+        cycles = 0
+        instructions = 0
+
+        while True:
+            pc = r.pc
+            if not self.running:
+                reason = StopReason.HALTED
+                break
+            if pc in stops:
+                reason = StopReason.PC
+                break
+            if cycles >= cycle_limit:
+                reason = StopReason.CYCLES
+                break
+            if instructions >= instruction_limit:
+                reason = StopReason.INSTRUCTIONS
+                break
+            if predicate is not None:
+                if instructions >= check_at:
+                    check_at = instructions + interval
+                    if predicate(self):
+                        reason = StopReason.PREDICATE
+                        break
+                if watched is not None and watched(generations) != seen:
+                    seen = watched(generations)
+                    if predicate(self):
+                        reason = StopReason.PREDICATE
+                        break
+
+            if pc <= previous <= pc + window:
+                loop = self._idle_loop(pc, cycles, instructions)
+                if loop is not None:
+                    loop_cycles, loop_instructions = loop
+                    # Iterations keeping the run within its budget
+                    skip = math.inf
+                    if max_cycles is not None:
+                        skip = (max_cycles - cycles - 1) // loop_cycles
+                    if max_instructions is not None:
+                        skip = min(
+                            skip,
+                            (max_instructions - instructions)
+                            // loop_instructions
+                        )
+                    if check_at != math.inf:
+                        skip = min(
+                            skip,
+                            (check_at - instructions) // loop_instructions
+                        )
+                    if skip == math.inf:
+                        reason = StopReason.IDLE
+                        break
+
+                    n = int(skip)
+                    self.cc_total += n * loop_cycles
+                    cycles += n * loop_cycles
+                    instructions += n * loop_instructions
+                    continue
+
+            if (
+                loops is not None
+                and pc <= previous
+                and not (
+                    self.trigger_nmi
+                    or self.trigger_irq
+                    or self._previous_interrupt
+                )
+            ):
+                compiled = loops.lookup(pc)
+                if compiled is not None and stops:
+                    crosses = crosses_stop.get(compiled)
+                    if crosses is None:
+                        crosses = not stops.isdisjoint(
+                            range(pc + 1, compiled.end)
+                        )
+                        crosses_stop[compiled] = crosses
+                    if crosses:
+                        compiled = None
+                if compiled is not None:
+                    # Iterations keeping the run within its budget
+                    iterations = math.inf
+                    if max_cycles is not None:
+                        iterations = (
+                            (max_cycles - cycles) // compiled.max_cycles
+                        )
+                    if max_instructions is not None:
+                        iterations = min(
+                            iterations,
+                            (max_instructions - instructions)
+                            // compiled.length
+                        )
+                    if check_at != math.inf:
+                        iterations = min(
+                            iterations,
+                            (check_at - instructions) // compiled.length
+                        )
+
+                    n, cc = compiled.fn(self, iterations)
+                    if n:
+                        # No interrupt was pending on any of its cycles
+                        self._interrupt = False
+                        self.cc_total += cc
+                        cycles += cc
+                        instructions += n
+                        previous = pc
+                        continue
+            previous = pc
+
+            if blocks is not None and not (
+                self.trigger_nmi
+                or self.trigger_irq
+                or self._previous_interrupt
+            ):
+                block = blocks.lookup(pc)
+                if block is not None and stops:
+                    crosses = crosses_stop.get(block)
+                    if crosses is None:
+                        crosses = crosses_stop[block] = not stops.isdisjoint(
+                            range(pc + 1, block.end)
+                        )
+                    if crosses:
+                        block = None
+                if (
+                    block is not None
+                    and instructions + block.length <= instruction_limit
+                    and cycles + block.max_cycles <= cycle_limit
+                ):
+                    n, cc = block.fn(self)
+                    # No interrupt was pending on any of its cycles
+                    self._interrupt = False
+                    self.cc_total += cc
+                    cycles += cc
+                    instructions += n
+                    continue
+
+            if debug:
+                self.step()
+                cycles += self.cc
+                instructions += 1
+                continue
+
+            self.cc = 0
+            self.cc_extra = 0
+
+            opcode = readByte(pc)
+            r.pc = (pc + 1) & 0xFFFF
+
+            if (
+                fusions is not None
+                and opcode in fusions
+                and not (self.trigger_nmi or self.trigger_irq)
+                and instructions + 3 <= instruction_limit
+                and cycles + MAX_PREFIX_CYCLES < cycle_limit
+                and pc not in near_stops
+                and not (
+                    io[pc >> 8] or io[((pc + MAX_PREFIX_BYTES) >> 8) & 0xFF]
+                )
+            ):
+                fused = fusions[opcode](self, pc, opcode)
+                if fused is not None:
+                    n, cc = fused
+                    self._interrupt = False
+                    self.cc_total += cc
+                    cycles += cc
+                    instructions += n
+                    continue
+
+            op = ops[opcode]
+            if op is None:
+                op = opcodes[opcode]  # Raises UndefinedOperation
+            self.op = op
+            op.handler(self)
+
+            if table_cycles:
+                cc = op.cycles + self.cc_extra
+                if exact:
+                    self._update_interrupt()
+            else:
+                cc = self.cc + self.cc_extra
+            self.cc = cc
+            self.cc_total += cc
+            cycles += cc
+            instructions += 1
+
+            if self._previous_interrupt:
+                self.handle_interrupt()
+
+        return RunResult(cycles, instructions, reason)
+
+    def _idle_loop(
+        self,
+        head: int,
+        cycles: int,
+        instructions: int
+    ) -> tuple[int, int] | None:
+        """
+        Called by :py:meth:`.run` each time the program jumps a few bytes
+        back to `head`. Compares the registers with those of the previous
+        time, and once they are equal, remembers the memory write counters
+        (:py:attr:`py65emu.mmu.Memory.generations`). If the next iteration
+        again ends in the same state without any writes, every following
+        iteration will be identical as well, until an interrupt arrives.
+
+        :param int head: Address jumped to
+        :param int cycles: Cycles executed so far by :py:meth:`.run`
+        :param int instructions: Instructions executed so far by
+                                 :py:meth:`.run`
+        :rtype: tuple[int, int] | None
+        :return: Cycles and instructions of one iteration of an idle loop,
+                 or None
+        """
+        if self.trigger_nmi or self.trigger_irq:
+            self._idle_probe = None
+            return None
+
+        r = self.r
+        state = (head, r.a, r.x, r.y, r.s, r.p)
+        probe = self._idle_probe
+        if probe is None or probe[0] != state:
+            self._idle_probe = (state, None, cycles, instructions)
+            return None
+
+        _, written, start_cycles, start_instructions = probe
+        generations = tuple(self._generations or ())
+        if written != generations:
+            self._idle_probe = (state, generations, cycles, instructions)
+            return None
+
+        self._idle_probe = None
+        return cycles - start_cycles, instructions - start_instructions
+
+    @property
+    def _generations(self) -> list[int] | None:
+        return getattr(self.mmu, "generations", None)
+
     def execute(self, instruction: list[int]) -> None:
         """
         Execute a single instruction independent of the program in memory.
@@ -429,13 +1098,17 @@ class CPU:
         :rtype: None
         :return: None
         """
-        self.op = self.opcodes[opcode]
+        self.op = op = self.opcodes[opcode]
 
         if self.debug is True:
-            dasm = Disassembly(self.op, *self.op.get_operands())
+            dasm = Disassembly(self, op, *op.get_operands(self))
 
-        self.op.execute()
+        op.handler(self)
 
+        if self.table_cycles:
+            self.cc = op.cycles
+            if self.profile == "exact":
+                self._update_interrupt()
         self.cc += self.cc_extra
 
         if self.debug is True:
@@ -578,7 +1251,7 @@ class CPU:
         :return: BCD coded value
 
         """
-        return int(math.floor(v / 10)) * 16 + (v % 10)
+        return (v // 10) * 16 + (v % 10)
 
     def signedHex(self, v: int, bits: int = 8) -> int:
         """
@@ -617,7 +1290,21 @@ class CPU:
         self._previousInterrupt = self._interrupt
         self._interrupt = (
             self.trigger_nmi or
-            (self.trigger_irq and self.r.getFlag(FlagBit.I) is False)
+            (self.trigger_irq and not self.r._p & FLAG_I)
+        )
+
+    def _skip_cycle_count(self, cycles: int = 1) -> None:
+        """
+        Replaces :py:meth:`.increment_cycle_count` with `table_cycles`
+        """
+
+    def _update_interrupt(self) -> None:
+        """
+        Interrupt bookkeeping of :py:meth:`.increment_cycle_count`, done
+        once per instruction with `table_cycles`
+        """
+        self._interrupt = self.trigger_nmi or (
+            self.trigger_irq and not self.r._p & FLAG_I
         )
 
     def increment_extra_cycle(self, cycles: int = 1) -> None:
@@ -667,13 +1354,13 @@ class CPU:
         self.increment_cycle_count()
 
         if irq_type == "BRK":
-            self.stackPush(self.r.p | FlagBit.B.value)
+            self.stackPush(self.r.p | FLAG_B)
         else:
             self.stackPush(self.r.p)
 
         self.increment_cycle_count()
 
-        self.r.setFlag("I")
+        self.r._set_flag(FLAG_I)
         self.r.pc = self.interruptAddress(irq_type)
 
     def process_nmi(self) -> None:
@@ -693,7 +1380,7 @@ class CPU:
         .. seealso::
            :py:meth:`.breakOperation`
         """
-        if self.r.getFlag(FlagBit.I):
+        if self.r._p & FLAG_I:
             return None
         self.r.pc -= 1
         self.breakOperation("IRQ")
@@ -838,10 +1525,7 @@ class CPU:
         o = self.nextWord()
         a = o + self.r.x
 
-        special_op = [
-            0x1E, 0x1F, 0x3E, 0x3F, 0x5E, 0x5F, 0x7E,
-            0x7F, 0x9D, 0x9F, 0xDE, 0xDF, 0xFE, 0xFF
-        ]
+        special_op = ALWAYS_INDEX_CYCLE["ax"]
         if o & 0xFF00 != a & 0xFF00 and (
             self.op and self.op.opcode not in special_op
         ):
@@ -873,7 +1557,7 @@ class CPU:
         o = self.nextWord()
         a = o + self.r.y
 
-        special_op = [0x1B, 0x3B, 0x5B, 0x7B, 0x99, 0xDB, 0xFB]
+        special_op = ALWAYS_INDEX_CYCLE["ay"]
         if o & 0xFF00 != a & 0xFF00 and (
             self.op and self.op.opcode not in special_op
         ):
@@ -962,7 +1646,7 @@ class CPU:
         o = (self.readByte((i + 1) & 0xFF) << 8) + self.readByte(i)
         a = o + self.r.y
 
-        special_op = [0x13, 0x33, 0x53, 0x73, 0x91, 0xD3, 0xF3]
+        special_op = ALWAYS_INDEX_CYCLE["iy"]
         if o & 0xFF00 != a & 0xFF00 and (
             self.op and self.op.opcode not in special_op
         ):
@@ -1082,23 +1766,15 @@ class CPU:
 
         :param int v2: 8 bit value
         """
-        v1 = self.r.a
-
-        if self.r.getFlag("D") and self.bcd_disabled is False:  # decimal mode
-            d1 = self.fromBCD(v1)
-            d2 = self.fromBCD(v2)
-            r = d1 + d2 + self.r.getFlag("C")
-            self.r.a = self.toBCD(r % 100)
-
-            self.r.setFlag("C", r > 99)
+        r = self.r
+        if r._p & FLAG_D and self.bcd_disabled is False:  # decimal mode
+            table = arithmetic.decimal().adc
         else:
-            r = v1 + v2 + self.r.getFlag("C")
-            self.r.a = r & 0xFF
+            table = arithmetic.binary().adc
 
-            self.r.setFlag("C", r > 0xFF)
-
-        self.r.ZN(self.r.a)
-        self.r.setFlag("V", ((~(v1 ^ v2)) & (v1 ^ r) & 0x80))
+        entry = table[(0x10000 if r._c else 0) | r.a << 8 | v2]
+        r.a = entry & 0xFF
+        r.p = r._p | entry >> 8
 
     def AND(self, v: int) -> None:
         """
@@ -1113,7 +1789,7 @@ class CPU:
         :param int v: 8 bit value
         """
         self.r.a = (self.r.a & v) & 0xFF
-        self.r.ZN(self.r.a)
+        self.r._nz = self.r.a
 
     def ASL(self, a: str | int) -> None:
         """
@@ -1136,8 +1812,8 @@ class CPU:
             self.writeByte(a, v)
 
         v = v << 1
-        self.r.setFlag("C", v > 0xFF)
-        self.r.ZN(v & 0xFF)
+        self.r._c = v > 0xFF
+        self.r._nz = v & 0xFF
 
         if isinstance(a, str):
             self.r.a = v & 0xFF
@@ -1160,9 +1836,11 @@ class CPU:
 
         :param int v: 8 bit value
         """
-        self.r.setFlag("Z", self.r.a & v == 0)
-        self.r.setFlag("N", v & 0x80)
-        self.r.setFlag("V", v & 0x40)
+        self.r.p = (
+            (self.r.p & 0x3D)
+            | (v & (FLAG_N | FLAG_V))
+            | (FLAG_Z if self.r.a & v == 0 else 0)
+        )
 
     def B(self, v: tuple[str, bool]) -> None:
         """
@@ -1194,7 +1872,20 @@ class CPU:
         """
 
         pc_rel = self.rel_a()
-        if self.r.getFlag(v[0]) is v[1]:
+
+        # Test the recorded results, without assembling the flag register
+        flag, value = v
+        r = self.r
+        if flag == "Z":
+            taken = not r._nz & 0xFF
+        elif flag == "N":
+            taken = r._nz & 0x180 != 0
+        elif flag == "C":
+            taken = bool(r._c)
+        else:
+            taken = bool(r._v)
+
+        if taken is value:
             self.increment_extra_cycle()
 
             if pc_rel & 0xFF00 != self.r.pc & 0xFF00:
@@ -1223,9 +1914,8 @@ class CPU:
         :param int v: 8 bit value
         """
         o = (r - v) & 0xFF
-        self.r.setFlag("Z", (o & 0xFF) == 0)
-        self.r.setFlag("C", r >= v)
-        self.r.setFlag("N", o & 0x80)
+        self.r._nz = o
+        self.r._c = r >= v
 
     def CMP(self, v: int) -> None:
         """
@@ -1291,7 +1981,7 @@ class CPU:
         self.writeByte(a, v & 0xFF)
         v = (v - 1) & 0xFF
         self.writeByte(a, v)
-        self.r.ZN(v)
+        self.r._nz = v
 
     def DEX(self, _) -> None:
         """
@@ -1306,7 +1996,7 @@ class CPU:
         :param int _: Ignored
         """
         self.r.x = (self.r.x - 1) & 0xFF
-        self.r.ZN(self.r.x)
+        self.r._nz = self.r.x
         self.increment_cycle_count()
 
     def DEY(self, _) -> None:
@@ -1322,7 +2012,7 @@ class CPU:
         :param int _: Ignored
         """
         self.r.y = (self.r.y - 1) & 0xFF
-        self.r.ZN(self.r.y)
+        self.r._nz = self.r.y
         self.increment_cycle_count()
 
     def EOR(self, v: int) -> None:
@@ -1338,7 +2028,7 @@ class CPU:
         :param int v: 8 bit value
         """
         self.r.a = self.r.a ^ v
-        self.r.ZN(self.r.a)
+        self.r._nz = self.r.a
 
     """Flag Instructions."""
 
@@ -1357,9 +2047,9 @@ class CPU:
         +------+------+------------------------+-----------+---------------+
 
         :param v: One of `D`, `I`, `C`
-        :type v: FlagBit or int or str
+        :type v: str
         """
-        self.r.setFlag(v)
+        self.r._set_flag(FLAG_MASKS[v])
         self.increment_cycle_count()
 
     def CL(self, v: str) -> None:
@@ -1379,9 +2069,9 @@ class CPU:
         +------+------+--------------------------+-----------+---------------+
 
         :param v: One of `V`, `D`, `I`, `C`
-        :type v: FlagBit or int or str
+        :type v: str
         """
-        self.r.clearFlag(v)
+        self.r._clear_flag(FLAG_MASKS[v])
         self.increment_cycle_count()
 
     def INC(self, a: int) -> None:
@@ -1400,7 +2090,7 @@ class CPU:
         self.writeByte(a, v & 0xFF)
         v = (v + 1) & 0xFF
         self.writeByte(a, v)
-        self.r.ZN(v)
+        self.r._nz = v
 
     def INX(self, _) -> None:
         """
@@ -1415,7 +2105,7 @@ class CPU:
         :param int _: Ignored
         """
         self.r.x = (self.r.x + 1) & 0xFF
-        self.r.ZN(self.r.x)
+        self.r._nz = self.r.x
         self.increment_cycle_count()
 
     def INY(self, _) -> None:
@@ -1431,7 +2121,7 @@ class CPU:
         :param int _: Ignored
         """
         self.r.y = (self.r.y + 1) & 0xFF
-        self.r.ZN(self.r.y)
+        self.r._nz = self.r.y
         self.increment_cycle_count()
 
     def JMP(self, a: int) -> None:
@@ -1483,7 +2173,7 @@ class CPU:
         :param int v: 8 bit value
         """
         self.r.a = v
-        self.r.ZN(self.r.a)
+        self.r._nz = self.r.a
 
     def LDX(self, v: int) -> None:
         """
@@ -1498,7 +2188,7 @@ class CPU:
         :param int v: 8 bit value
         """
         self.r.x = v
-        self.r.ZN(self.r.x)
+        self.r._nz = self.r.x
 
     def LDY(self, v: int) -> None:
         """
@@ -1513,7 +2203,7 @@ class CPU:
         :param int v: 8 bit value
         """
         self.r.y = v
-        self.r.ZN(self.r.y)
+        self.r._nz = self.r.y
 
     def LSR(self, a: str | int) -> None:
         """
@@ -1535,9 +2225,9 @@ class CPU:
             v = self.readByte(a)
             self.writeByte(a, v)
 
-        self.r.setFlag("C", v & 0x01)
+        self.r._c = v & 0x01
         v = v >> 1
-        self.r.ZN(v)
+        self.r._nz = v
 
         if isinstance(a, str):
             self.r.a = v
@@ -1604,7 +2294,7 @@ class CPU:
         :param int v: 8 bit value
         """
         self.r.a = self.r.a | v
-        self.r.ZN(self.r.a)
+        self.r._nz = self.r.a
 
     def P(self, v: tuple[str, str]) -> None:
         """
@@ -1647,10 +2337,10 @@ class CPU:
             setattr(self.r, r, self.stackPop())
 
             if r == "a":
-                self.r.ZN(self.r.a)
+                self.r._nz = self.r.a
             elif r == "p":
-                self.r.clearFlag(FlagBit.B)
-                self.r.setFlag(FlagBit.U)
+                self.r._clear_flag(FLAG_B)
+                self.r._set_flag(FLAG_U)
                 # self.r.p = self.r.p | 0b00100000
 
             self.increment_cycle_count()
@@ -1675,9 +2365,9 @@ class CPU:
             v_old = self.readByte(a)
             self.writeByte(a, v_old)
 
-        v_new = ((v_old << 1) + self.r.getFlag("C")) & 0xFF
-        self.r.setFlag("C", v_old & 0x80)
-        self.r.ZN(v_new)
+        v_new = ((v_old << 1) + self.r._c) & 0xFF
+        self.r._c = v_old >> 7
+        self.r._nz = v_new
 
         if isinstance(a, str):
             self.r.a = v_new
@@ -1704,9 +2394,9 @@ class CPU:
             v_old = self.readByte(a)
             self.writeByte(a, v_old)
 
-        v_new = ((v_old >> 1) + self.r.getFlag("C") * 0x80) & 0xFF
-        self.r.setFlag("C", v_old & 0x01)
-        self.r.ZN(v_new)
+        v_new = ((v_old >> 1) + self.r._c * 0x80) & 0xFF
+        self.r._c = v_old & 0x01
+        self.r._nz = v_new
         if isinstance(a, str):
             self.r.a = v_new
         else:
@@ -1727,7 +2417,7 @@ class CPU:
         :param int _: Ignored
         """
         self.r.p = self.stackPop()
-        self.r.setFlag(FlagBit.U)
+        self.r._set_flag(FLAG_U)
         self.increment_cycle_count()
 
         self.r.pc = self.stackPopWord()
@@ -1762,24 +2452,15 @@ class CPU:
 
         :param int v2: 8 bit value
         """
-        v1 = self.r.a
-        if self.r.getFlag("D") and self.bcd_disabled is False:
-            d1 = self.fromBCD(v1)
-            d2 = self.fromBCD(v2)
-            r = d1 - d2 - (not self.r.getFlag("C"))
-            self.r.a = self.toBCD(r % 100)
+        r = self.r
+        if r._p & FLAG_D and self.bcd_disabled is False:  # decimal mode
+            table = arithmetic.decimal().sbc
         else:
-            """
-            r = v1 + (v2 ^ 0xFF) + self.r.getFlag("C")
-
-            self.r.a = r & 0xFF
-            """
-            r = v1 - v2 - (not self.r.getFlag('C'))
-            self.r.a = r & 0xff
+            table = arithmetic.binary().sbc
 
-        self.r.setFlag("C", r >= 0)
-        self.r.setFlag("V", ((v1 ^ v2) & (v1 ^ r) & 0x80))
-        self.r.ZN(self.r.a)
+        entry = table[(0x10000 if r._c else 0) | r.a << 8 | v2]
+        r.a = entry & 0xFF
+        r.p = r._p | entry >> 8
 
     def STA(self, a: int) -> None:
         """
@@ -1855,7 +2536,7 @@ class CPU:
         self.increment_cycle_count()
         setattr(self.r, d, getattr(self.r, s))
         if d != "s":
-            self.r.ZN(getattr(self.r, d))
+            self.r._nz = getattr(self.r, d)
 
     # endregion Instructions Mnemonics
 
@@ -1898,7 +2579,7 @@ class CPU:
         :param int v: 8 bit value
         """
         self.AND(v)
-        self.r.setFlag("C", self.r.getFlag("N"))
+        self.r._c = self.r.a >> 7
 
     def AAX(self, a: int) -> None:  # SAX, AXS
         """
@@ -1936,10 +2617,12 @@ class CPU:
 
         :param int v: 8 bit value
         """
-        self.r.a = (self.r.getFlag('C') << 7) | (((self.r.a & v) & 0xFF) >> 1)
-        self.r.setFlag("C", self.r.a & 0x40)
-        self.r.setFlag("V", bool(self.r.a & 0x40) ^ bool(self.r.a & 0x20))
-        self.r.ZN(self.r.a)
+        self.r.a = (
+            (self.r._c << 7) | (((self.r.a & v) & 0xFF) >> 1)
+        )
+        self.r._c = (self.r.a >> 6) & 0x01
+        self.r._v = bool(self.r.a & 0x40) ^ bool(self.r.a & 0x20)
+        self.r._nz = self.r.a
         # self.AND(v)
         # self.ROR("a")
 
@@ -1962,8 +2645,8 @@ class CPU:
         :param int v: 8 bit value
         """
         self.r.a = (((self.r.a & v) & 0xFF) >> 1)
-        self.r.setFlag("C", self.r.a & 0x0001)
-        self.r.ZN(self.r.a)
+        self.r._c = self.r.a & 0x0001
+        self.r._nz = self.r.a
         # self.AND(v)
         # self.LSR("a")
 
@@ -1995,7 +2678,7 @@ class CPU:
         value = (self.r.a ^ self.magic) & v
         self.r.a = value
         self.r.x = value
-        self.r.ZN(value)
+        self.r._nz = value
 
     def AXA(self, a: int) -> None:  # SHA
         """
@@ -2061,8 +2744,8 @@ class CPU:
         o = self.r.a & self.r.x
         self.r.x = (o - v) & 0xFF
 
-        self.r.setFlag("C", v <= o)
-        self.r.ZN(self.r.x)
+        self.r._c = v <= o
+        self.r._nz = self.r.x
 
     def DCP(self, a: int) -> None:  # DCM
         """
@@ -2139,7 +2822,7 @@ class CPU:
         :param int v: 8 bit value
         """
         self.r.a = self.r.x = self.r.s = self.r.s & v
-        self.r.ZN(self.r.a)
+        self.r._nz = self.r.a
 
     def LAX(self, v: int) -> None:
         """
@@ -2157,7 +2840,7 @@ class CPU:
         """
         self.r.a = v & 0xFF
         self.r.x = v & 0xFF
-        self.r.ZN(self.r.a)
+        self.r._nz = self.r.a
 
     def RLA(self, a: int) -> None:
         """
@@ -2345,7 +3028,7 @@ class CPU:
         :param int v: 8 bit value
         """
         self.r.a = (self.r.a | self.magic) & self.r.x & v
-        self.r.ZN(self.r.a)
+        self.r._nz = self.r.a
 
     def XAS(self, a: int) -> None:  # SHS, TAS
         """
@@ -13,6 +13,7 @@ class Disassembly:
 
     def __init__(
         self,
+        cpu: "CPU",
         op: "Operation",
         pc: int,
         hi: int = 0x00,
@@ -21,11 +22,13 @@ class Disassembly:
         """
         Init Disassembly Method
 
+        :param CPU cpu: CPU Object, for the effective addresses
         :param Operation op: Operation to disassemble
         :param int pc: Current programcounter
         :param int hi: Hi-byte of memory. (Default: `0x00`)
         :param int lo: Lo-byte of memory. (Default: `0x00`)
         """
+        self.cpu = cpu
         self.op = op
         self.pc = pc
         self.hi = hi
@@ -51,21 +54,21 @@ class Disassembly:
             case "z":
                 return prefix + f"${self.lo:0>2x} "
             case "zx":
-                addr = (self.lo + self.op.cpu.r.x) & 0xFFFF
+                addr = (self.lo + self.cpu.r.x) & 0xFFFF
                 return prefix + f"${self.lo:0>2x}, X [${addr:0>4x}]"
             case "zy":
-                addr = (self.lo + self.op.cpu.r.y) & 0xFFFF
+                addr = (self.lo + self.cpu.r.y) & 0xFFFF
                 return prefix + f"${self.lo:0>2x}, Y [${addr:0>4x}]"
             case "a":
                 return prefix + f"${self.hi:0>2x}{self.lo:0>2x} "
             case "ax":
-                addr = (self.as_word() + self.op.cpu.r.x) & 0xFFFF
+                addr = (self.as_word() + self.cpu.r.x) & 0xFFFF
                 return prefix + (
                     f"${self.hi:0>2x}{self.lo:0>2x}, "
                     f"X [${addr:0>4x}]"
                 )
             case "ay":
-                addr = (self.as_word() + self.op.cpu.r.y) & 0xFFFF
+                addr = (self.as_word() + self.cpu.r.y) & 0xFFFF
                 return prefix + (
                     f"${self.hi:0>2x}{self.lo:0>2x}, "
                     f"Y [${addr:0>4x}]"
@@ -73,16 +76,16 @@ class Disassembly:
             case "i":
                 return prefix + f"(${self.hi:0>2x}{self.lo:0>2x}) "
             case "ix":
-                loc_addr = (self.lo + self.op.cpu.r.x) & 0xFFFF
-                addr = self.op.cpu.mmu.cpu_readWord(loc_addr) & 0xFFFF
+                loc_addr = (self.lo + self.cpu.r.x) & 0xFFFF
+                addr = self.cpu.mmu.cpu_readWord(loc_addr) & 0xFFFF
                 return prefix + f"(${self.lo:0>2x}, X) [${addr:0>4x}]"
             case "iy":
-                loc_addr = self.op.cpu.mmu.cpu_readWord(self.lo) & 0xFFFF
-                addr = loc_addr + self.op.cpu.r.y
+                loc_addr = self.cpu.mmu.cpu_readWord(self.lo) & 0xFFFF
+                addr = loc_addr + self.cpu.r.y
                 return prefix + f"(${self.lo:0>2x}), Y [${addr:0>4x}]"
             case _:  # Actually: self.op.mode == 'rel'
                 addr = (
-                    (self.pc + 1) + self.op.cpu.fromTwosCom(self.lo)
+                    (self.pc + 1) + self.cpu.fromTwosCom(self.lo)
                 ) & 0xFFFF
                 return prefix + f"${self.lo:0>2x} [${addr:0>4x}] "
 
@@ -126,16 +129,18 @@ class Debug:
         lo = 0x00
 
         op = self.cpu.opcodes[opcode]
-        if op.bytes == 2:
+        size = self.cpu.opcodes.tables.bytes[opcode]
+        if size == 2:
             lo = self.cpu.mmu.cpu_read(addr)
             addr += 1
-        elif op.bytes == 3:
+        elif size == 3:
             lo = self.cpu.mmu.cpu_read(addr)
             addr += 1
             hi = self.cpu.mmu.cpu_read(addr)
             addr += 1
 
         assembly = Disassembly(
+            cpu=self.cpu,
             op=op,
             pc=addr_org,
             hi=hi,
@@ -160,17 +165,15 @@ class Debug:
         stop_offset = stop | 0x000F
 
         offset_length = math.ceil((stop_offset - start_offset) / 16)
+        data = self.cpu.mmu.read_range(start_offset, offset_length * 0x10)
 
         memory = []
 
         for multiplier in range(offset_length):
-            offset = start_offset + (multiplier * 0x0010)
-
-            value = [offset,]
-            for addr in range(0x10):
-                value += self.cpu.mmu.cpu_read(offset + addr),
-
-            memory.append(tuple(value))
+            offset = multiplier * 0x0010
+            memory.append(
+                (start_offset + offset, *data[offset:offset + 0x10])
+            )
         return memory
 
     def _disassemble_params(
@@ -0,0 +1,236 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from typing import Callable, TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from py65emu.cpu import CPU, Registers
+
+
+FusedHandler = Callable[["CPU", int, int], tuple[int, int] | None]
+"""
+Executes a fused instruction sequence, given the address and the already
+fetched opcode of its first instruction. Returns the number of
+instructions and cycles executed, or None when the following instructions
+don't match and nothing was executed.
+"""
+
+MAX_PREFIX_CYCLES = 6
+"""Most cycles taken by the instructions preceding the last fused one"""
+
+MAX_PREFIX_BYTES = 3
+"""Largest offset from the first fused instruction to the last one"""
+
+BRANCH_OPCODES: dict[int, Callable[["Registers"], object]] = {
+    0x10: lambda r: not r._nz & 0x180,  # BPL
+    0x30: lambda r: r._nz & 0x180,  # BMI
+    0x50: lambda r: not r._v,  # BVC
+    0x70: lambda r: r._v,  # BVS
+    0x90: lambda r: not r._c,  # BCC
+    0xB0: lambda r: r._c,  # BCS
+    0xD0: lambda r: r._nz & 0xFF,  # BNE
+    0xF0: lambda r: not r._nz & 0xFF,  # BEQ
+}
+"""
+Test whether to branch, by branch opcode. Reads the fields the flag is
+derived from, see :py:attr:`py65emu.cpu.Registers.p`
+"""
+
+LOADS: dict[int, tuple[int, int]] = {
+    0xA9: (2, 2),  # LDA #$BB
+    0xA5: (2, 3),  # LDA $LL
+    0xAD: (3, 4),  # LDA $LLHH
+}
+"""Bytes and cycles of each `LDA` that can be fused with a store"""
+
+STORES: dict[int, tuple[int, int]] = {
+    0x85: (2, 3),  # STA $LL
+    0x8D: (3, 4),  # STA $LLHH
+}
+"""Bytes and cycles of each `STA` that can be fused with a load"""
+
+STEPS: dict[int, tuple[str, int]] = {
+    0xCA: ("x", -1),  # DEX
+    0x88: ("y", -1),  # DEY
+    0xE8: ("x", 1),  # INX
+    0xC8: ("y", 1),  # INY
+}
+"""Register and step of each increment/decrement"""
+
+COMPARES: dict[int, str] = {
+    0xC9: "a",  # CMP #$BB
+    0xE0: "x",  # CPX #$BB
+    0xC0: "y",  # CPY #$BB
+}
+"""Register of each immediate compare"""
+
+
+def _branch(cpu: "CPU", pc: int, opcode: int, cycles: int) -> int:
+    """
+    Execute the branch at `pc` as the last fused instruction
+
+    :param CPU cpu: CPU
+    :param int pc: Address of the branch
+    :param int opcode: The branch opcode
+    :param int cycles: Cycles taken by the preceding instructions
+    :rtype: int
+    :return: Cycles of the whole sequence
+    """
+    r = cpu.r
+    offset = cpu.mmu.cpu_read((pc + 1) & 0xFFFF)
+    following = (pc + 2) & 0xFFFF
+    extra = 0
+    if BRANCH_OPCODES[opcode](r):
+        target = (following + (offset & 0x7F) - (offset & 0x80)) & 0xFFFF
+        extra = 2 if target & 0xFF00 != following & 0xFF00 else 1
+        r.pc = target
+    else:
+        r.pc = following
+
+    cpu.op = cpu.opcodes.ops[opcode]
+    cpu.cc_extra = extra
+    cpu.cc = 2 + extra
+    return cycles + 2 + extra
+
+
+def load_store(cpu: "CPU", pc: int, opcode: int) -> tuple[int, int] | None:
+    """`LDA #$BB`, `LDA $LL` or `LDA $LLHH` followed by `STA $LL(HH)`"""
+    read = cpu.mmu.cpu_read
+    load_bytes, load_cycles = LOADS[opcode]
+    store_pc = (pc + load_bytes) & 0xFFFF
+    try:
+        store = read(store_pc)
+        store_bytes, store_cycles = STORES[store]
+    except (IndexError, KeyError):
+        return None
+
+    lo = read((pc + 1) & 0xFFFF)
+    if load_bytes == 3:
+        v = read((read((pc + 2) & 0xFFFF) << 8) + lo)
+    elif load_cycles == 3:
+        v = read(lo)
+    else:
+        v = lo
+
+    ea = read((store_pc + 1) & 0xFFFF)
+    if store_bytes == 3:
+        ea += read((store_pc + 2) & 0xFFFF) << 8
+
+    r = cpu.r
+    r.a = v
+    r._nz = v
+    r.pc = (store_pc + store_bytes) & 0xFFFF
+    cpu.op = cpu.opcodes.ops[store]
+    cpu.mmu.cpu_write(ea, v)
+
+    cpu.cc_extra = 0
+    cpu.cc = store_cycles
+    return 2, load_cycles + store_cycles
+
+
+def copy_indirect(
+    cpu: "CPU",
+    pc: int,
+    opcode: int
+) -> tuple[int, int] | None:
+    """`LDA ($LL),Y` followed by `STA ($LL),Y`"""
+    read = cpu.mmu.cpu_read
+    try:
+        if read((pc + 2) & 0xFFFF) != 0x91:
+            return None
+    except IndexError:
+        return None
+
+    r = cpu.r
+    y = r.y
+
+    i = read((pc + 1) & 0xFFFF)
+    o = (read((i + 1) & 0xFF) << 8) + read(i)
+    cycles = 6 if (o & 0xFF) + y > 0xFF else 5
+    v = read((o + y) & 0xFFFF)
+
+    i = read((pc + 3) & 0xFFFF)
+    o = (read((i + 1) & 0xFF) << 8) + read(i)
+
+    r.a = v
+    r._nz = v
+    r.pc = (pc + 4) & 0xFFFF
+    cpu.op = cpu.opcodes.ops[0x91]
+    cpu.mmu.cpu_write((o + y) & 0xFFFF, v)
+
+    cpu.cc_extra = 0
+    cpu.cc = 6
+    return 2, cycles + 6
+
+
+def compare_branch(
+    cpu: "CPU",
+    pc: int,
+    opcode: int
+) -> tuple[int, int] | None:
+    """`CMP #$BB`, `CPX #$BB` or `CPY #$BB` followed by a branch"""
+    read = cpu.mmu.cpu_read
+    try:
+        branch = read((pc + 2) & 0xFFFF)
+    except IndexError:
+        return None
+    if branch not in BRANCH_OPCODES:
+        return None
+
+    r = cpu.r
+    register = getattr(r, COMPARES[opcode])
+    v = read((pc + 1) & 0xFFFF)
+    o = (register - v) & 0xFF
+    r._nz = o
+    r._c = register >= v
+
+    return 2, _branch(cpu, (pc + 2) & 0xFFFF, branch, 2)
+
+
+def step_branch(
+    cpu: "CPU",
+    pc: int,
+    opcode: int
+) -> tuple[int, int] | None:
+    """
+    `DEX`, `DEY`, `INX` or `INY` followed by a branch, or by a compare
+    of the same register and a branch
+    """
+    read = cpu.mmu.cpu_read
+    register, step = STEPS[opcode]
+    following = (pc + 1) & 0xFFFF
+    try:
+        branch = read(following)
+        if branch in BRANCH_OPCODES:
+            compare = None
+        elif COMPARES.get(branch) == register:
+            compare = read((pc + 2) & 0xFFFF)
+            branch = read((pc + 3) & 0xFFFF)
+            if branch not in BRANCH_OPCODES:
+                return None
+        else:
+            return None
+    except IndexError:
+        return None
+
+    r = cpu.r
+    v = (getattr(r, register) + step) & 0xFF
+    setattr(r, register, v)
+
+    if compare is None:
+        r._nz = v
+        return 2, _branch(cpu, following, branch, 2)
+
+    o = (v - compare) & 0xFF
+    r._nz = o
+    r._c = v >= compare
+    return 3, _branch(cpu, (pc + 3) & 0xFFFF, branch, 4)
+
+
+FUSIONS: dict[int, FusedHandler] = {
+    **{opcode: load_store for opcode in LOADS},
+    0xB1: copy_indirect,
+    **{opcode: compare_branch for opcode in COMPARES},
+    **{opcode: step_branch for opcode in STEPS},
+}
+"""Fused handler by the opcode of the first instruction"""
@@ -1,7 +1,46 @@
 import array
+import copy
 import io
+import itertools
+import mmap
+import operator
+import os
 from abc import ABC, abstractmethod
-from typing import Sequence
+from typing import Callable, Iterator, NamedTuple, Sequence
+
+
+Buffer = bytes | bytearray | memoryview | array.array | mmap.mmap
+"""Backing memory of a :py:class:`Bank`, any object exporting bytes"""
+
+
+def _view(data: Buffer | Sequence[int]) -> memoryview:
+    """
+    Bytes of `data` without copying them, if possible
+
+    :param data: Bytes or unsigned 8 bit integers
+    :type data: Buffer | Sequence[int]
+    :rtype: memoryview
+    """
+    if isinstance(
+        data, (bytes, bytearray, memoryview, array.array, mmap.mmap)
+    ):
+        return memoryview(data).cast("B")
+    return memoryview(bytes(data))
+
+
+def _pages(start: int, end: int) -> range:
+    """
+    Pages of the address space with an address in [start, end)
+
+    :param int start: First address
+    :param int end: Address after the last one
+    :rtype: range
+    """
+    start = max(start, 0)
+    end = min(end, 0x10000)
+    if start >= end:
+        return range(0)
+    return range(start >> 8, ((end - 1) >> 8) + 1)
 
 
 class MemoryRangeError(ValueError):
@@ -13,12 +52,19 @@ class ReadOnlyError(TypeError):
 
 
 class Block:
+    shared: bool = False
+    """
+    Whether the memory may also belong to a block of a fork, see
+    :py:meth:`MMU.fork`. It is copied before the first write.
+    """
+
     def __init__(
         self,
         start: int,
         length: int,
         readonly: bool,
-        default: int = 0
+        default: int = 0,
+        generations: list[int] | None = None
     ):
         """
         :param int start: The starting address for this block
@@ -26,16 +72,98 @@ class Block:
         :param bool readOnly: Whether this block should be read only
                               (such as ROM) (default False)
         :param int default: Default value to initialize the block with
+        :param generations: Write counters, one per 256 byte page of the
+                            address space, to update on writes. Shared
+                            between all blocks of a :py:class:`MMU`.
+                            (Default: a list of its own)
+        :type generations: list[int] | None
         """
         self.start = start
         self.length = length
         self.readonly = readonly
         self.default = default
-        self._memory = array.array("B", [default] * length)
+        self.generations = (
+            [0] * 0x100 if generations is None else generations
+        )
+        self._memory: array.array | memoryview = (
+            array.array("B", [default]) * length
+        )
 
     def reset(self) -> None:
         if not self.readonly:
-            self._memory = array.array("B", [self.default] * self.length)
+            self._memory = array.array("B", [self.default]) * self.length
+            self.shared = False
+            self.touch()
+
+    def fork(
+        self,
+        generations: list[int],
+        memo: dict[int, memoryview] | None = None
+    ) -> "Block":
+        """
+        A copy of the block sharing its memory, both are marked
+        :py:attr:`shared`.
+
+        :param generations: Write counters of the new block
+        :param memo: Backing memories already copied for this fork, by
+                     the identity of the original, see :py:meth:`Bank.fork`
+        :type generations: list[int]
+        :type memo: dict[int, memoryview] | None
+        :rtype: Block
+        :return: The new block
+        """
+        block = copy.copy(self)
+        block.generations = generations
+        self.shared = block.shared = True
+        return block
+
+    def _own(self) -> None:
+        """Copy shared memory before it is written"""
+        if self.shared:
+            memory = array.array("B")
+            memory.frombytes(self._memory)
+            self._memory = memory
+            self.shared = False
+
+    def load(self, index: int, data: memoryview) -> None:
+        """
+        Copy `data` into the block, even if it is readonly.
+
+        :param int index: Position, relative to the block, of the first
+                          byte
+        :param memoryview data: Bytes to copy
+        :raises ReadOnlyError: If the memory itself can't be written
+        :raises IndexError: If data doesn't fit in the block
+        """
+        if index < 0 or index + len(data) > self.length:
+            raise IndexError(
+                "Range [${index:0>4x}] - [${end:0>4x}] is outside of memory "
+                "range ([${start:0>4x}] - [${length:0>4x}])".format(
+                    index=index,
+                    end=index + len(data),
+                    start=0x0,
+                    length=self.length
+                )
+            )
+
+        if self.shared:
+            self._own()
+        memory = memoryview(self._memory)
+        if memory.readonly:
+            raise ReadOnlyError(
+                "Memory of 0x{s.start:0>4x} - 0x{s.end:0>4x} can't be "
+                "written".format(s=self)
+            )
+        memory[index:index + len(data)] = data
+        for page in _pages(self.start + index, self.start + index + len(data)):
+            self.generations[page] += 1
+
+    def touch(self) -> None:
+        """
+        Increase the write counter of every page the block covers.
+        """
+        for page in range(self.start >> 8, ((self.end - 1) >> 8) + 1):
+            self.generations[page & 0xFF] += 1
 
     @property
     def end(self) -> int:
@@ -70,7 +198,10 @@ class Block:
                 )
             )
 
+        if self.shared:
+            self._own()
         self._memory[index] = value
+        self.generations[((self.start + index) >> 8) & 0xFF] += 1
 
     def __getitem__(self, index: int) -> int:
         """
@@ -146,7 +277,306 @@ class Block:
         return self[addr - self.start]
 
 
+class Handler(Block):
+    def __init__(
+        self,
+        start: int,
+        length: int,
+        read: Callable[[int], int],
+        write: Callable[[int, int], None] | None = None,
+        generations: list[int] | None = None
+    ):
+        """
+        An address range without memory of its own, every access calls a
+        function instead. Used for memory mapped I/O.
+
+        Reading a device can change its state, so reads increase the write
+        counter of the page as well. This keeps the CPU from taking a loop
+        polling the device for an idle loop.
+
+        :param int start: The starting address of the range
+        :param int length: The length of the range in bytes
+        :param read: Called with the address on reads, returns the value
+        :type read: Callable[[int], int]
+        :param write: Called with the address and value on writes. (Default:
+                      None, the range is read only)
+        :type write: Callable[[int, int], None] | None
+        :param generations: Write counters, see :py:class:`Block`
+        :type generations: list[int] | None
+        """
+        self.start = start
+        self.length = length
+        self.readonly = write is None
+        self.default = 0
+        self.generations = (
+            [0] * 0x100 if generations is None else generations
+        )
+        self.read = read
+        self.write = write
+        self._memory = array.array("B")
+
+    def reset(self) -> None:
+        pass
+
+    def fork(
+        self,
+        generations: list[int],
+        memo: dict[int, memoryview] | None = None
+    ) -> "Block":
+        """
+        A copy of the range calling the same functions, the device is
+        shared.
+
+        :param generations: Write counters of the new range
+        :param memo: Unused, see :py:meth:`Block.fork`
+        :type generations: list[int]
+        :type memo: dict[int, memoryview] | None
+        :rtype: Block
+        :return: The new range
+        """
+        handler = copy.copy(self)
+        handler.generations = generations
+        return handler
+
+    def load(self, index: int, data: memoryview) -> None:
+        """
+        Pass each byte to the write function.
+
+        :param int index: Position, relative to the range, of the first
+                          byte
+        :param memoryview data: Bytes to write
+        :raises ReadOnlyError: If the range has no write function
+        :raises IndexError: If data doesn't fit in the range
+        """
+        for i, value in enumerate(data, index):
+            self[i] = value
+
+    def __setitem__(self, index: int, value: int) -> None:
+        """
+        Pass a write, relative to the range, to the write function.
+
+        :param int index: Position to write to
+        :param int value: Value to write
+        :raises ReadOnlyError: If the range has no write function
+        :raises IndexError: If address is out of bounds for the range
+        """
+        if index < 0 or index >= self.length:
+            raise IndexError(
+                "Index [${index:0>4x}] is outside of memory range "
+                "([${start:0>4x}] - [${length:0>4x}])".format(
+                    index=index,
+                    start=0x0,
+                    length=self.length
+                )
+            )
+        if self.write is None:
+            raise ReadOnlyError(
+                "Memory section is readonly "
+                "(0x{s.start:0>4x} - 0x{s.end:0>4x})".format(s=self)
+                )
+
+        addr = self.start + index
+        self.write(addr, value)
+        self.generations[(addr >> 8) & 0xFF] += 1
+
+    def __getitem__(self, index: int) -> int:
+        """
+        Pass a read, relative to the range, to the read function.
+
+        :param int index: Position to read from
+        :raises IndexError: If address is out of bounds for the range
+        :rtype: int
+        :return: Value of address (8 bit)
+        """
+        if index < 0 or index >= self.length:
+            raise IndexError(
+                "Index [${index:0>4x}] is outside of memory range "
+                "([${start:0>4x}] - [${length:0>4x}])".format(
+                    index=index,
+                    start=0x0,
+                    length=self.length
+                )
+            )
+
+        addr = self.start + index
+        self.generations[(addr >> 8) & 0xFF] += 1
+        return self.read(addr) & 0xFF
+
+    def __repr__(self) -> str:
+        return "<Handler 0x{s.start:0>4x} - 0x{s.end:0>4x}>".format(s=self)
+
+
+class Bank(Block):
+    def __init__(
+        self,
+        start: int,
+        length: int,
+        data: Buffer,
+        readonly: bool = True,
+        offset: int = 0,
+        control: Callable[[int, int], None] | None = None,
+        generations: list[int] | None = None
+    ):
+        """
+        A window on a larger backing memory, like a cartridge ROM, that can
+        be moved at runtime. The block reads and writes a slice of the
+        backing memory, nothing is copied when it is moved.
+
+        :param int start: The starting address of the window
+        :param int length: The length of the window in bytes
+        :param data: Backing memory, at least `length` bytes
+        :type data: Buffer
+        :param bool readonly: Whether the window is read only. (Default
+                              True)
+        :param int offset: Offset in `data` of the first byte of the
+                           window. (Default 0)
+        :param control: Called with the address and value on writes to a
+                        read only window instead of raising, for mappers
+                        controlled by writes to the ROM area. (Default
+                        None)
+        :type control: Callable[[int, int], None] | None
+        :param generations: Write counters, see :py:class:`Block`
+        :type generations: list[int] | None
+        :raises ReadOnlyError: If the window is writeable but `data` isn't
+        """
+        self.start = start
+        self.length = length
+        self.readonly = readonly
+        self.default = 0
+        self.generations = (
+            [0] * 0x100 if generations is None else generations
+        )
+        self.control = control
+        self.data = memoryview(data).cast("B")
+        if not readonly and self.data.readonly:
+            raise ReadOnlyError("Writeable window on read only data")
+        self.offset = 0
+        self.map(offset)
+
+    @property
+    def banks(self) -> int:
+        """Number of windows fitting in the backing memory"""
+        return len(self.data) // self.length
+
+    def map(self, offset: int) -> None:
+        """
+        Move the window to another offset of the backing memory.
+
+        :param int offset: Offset in :py:attr:`.data` of the first byte of
+                           the window
+        :raises MemoryRangeError: If the window doesn't fit in the backing
+                                  memory at that offset
+        """
+        if offset < 0 or offset + self.length > len(self.data):
+            raise MemoryRangeError(
+                "Offset 0x{offset:0>4x} is outside of the backing memory "
+                "(0x{size:0>4x} bytes)".format(
+                    offset=offset, size=len(self.data)
+                )
+            )
+
+        self.offset = offset
+        self._memory = self.data[offset:offset + self.length]
+        # Code seen through the window changed
+        self.touch()
+
+    def select(self, bank: int) -> None:
+        """
+        Map bank number `bank`, the backing memory split in windows of
+        :py:attr:`length` bytes. Numbers past the last bank wrap around,
+        like the unused bits of a mapper register.
+
+        :param int bank: Bank number
+        """
+        self.map((bank % self.banks) * self.length)
+
+    def fork(
+        self,
+        generations: list[int],
+        memo: dict[int, memoryview] | None = None
+    ) -> "Block":
+        """
+        A copy of the window, mapped at the same offset, that can be moved
+        on its own. Read only backing memory is shared, writeable backing
+        memory is copied, once per fork for the windows on the same
+        object. A :py:attr:`control` function keeps working on the bank it
+        was written for.
+
+        :param generations: Write counters of the new window
+        :param memo: Backing memories already copied for this fork, by
+                     the identity of the original
+        :type generations: list[int]
+        :type memo: dict[int, memoryview] | None
+        :rtype: Block
+        :return: The new window
+        """
+        bank = copy.copy(self)
+        bank.generations = generations
+        if not self.readonly:
+            memo = {} if memo is None else memo
+            # Windows on all of the same object keep sharing it
+            whole = self.data.nbytes == memoryview(self.data.obj).nbytes
+            key = id(self.data.obj) if whole else id(self.data)
+            if key not in memo:
+                memo[key] = memoryview(bytearray(self.data))
+            bank.data = memo[key]
+            bank._memory = bank.data[bank.offset:bank.offset + bank.length]
+        return bank
+
+    def reset(self) -> None:
+        """Zero the currently mapped bytes of a writeable window"""
+        if not self.readonly:
+            self.data[self.offset:self.offset + self.length] = bytes(
+                self.length
+            )
+            self.touch()
+
+    def set(self, addr: int, value: int) -> None:
+        """
+        Set value, by the address in the block. Writes to a read only
+        window with a :py:attr:`control` function are passed to it.
+
+        :param int addr: Address to write to
+        :param int value: Value to write
+        :raises ReadOnlyError: If block is readonly and has no control
+        :raises IndexError: If address is out of bounds for block
+        """
+        if self.readonly and self.control is not None:
+            if addr < self.start or addr >= self.end:
+                raise IndexError(
+                    "Address 0x{addr:0>4x} is outside of memory range "
+                    "(0x{s.start:0>4x} - 0x{s.end:0>4x})".format(
+                        addr=addr, s=self
+                    )
+                )
+            self.control(addr, value)
+            return
+
+        super().set(addr, value)
+
+    def __repr__(self) -> str:
+        return (
+            "<Bank 0x{s.start:0>4x} - 0x{s.end:0>4x} "
+            "at 0x{s.offset:0>5x}>".format(s=self)
+        )
+
+
 class Memory(ABC):
+    generations: list[int]
+    """
+    Write counter for each 256 byte page, increased on every write to the
+    page. Caches of decoded code compare them before reusing an entry.
+    Implementations that don't track writes leave this undefined.
+    """
+
+    io: bytearray
+    """
+    Non-zero for each 256 byte page with side effects on access, like
+    memory mapped I/O. Code on those pages isn't translated, fused or
+    compiled, and compiled loops don't access them. Implementations without
+    such pages leave this undefined.
+    """
+
     @abstractmethod
     def reset(self) -> None:
         """
@@ -196,6 +626,82 @@ class Memory(ABC):
         high = self.cpu_read(addr + 1)
         return (high << 8) + low
 
+    def read_range(self, start: int, length: int) -> memoryview:
+        """
+        Return `length` bytes starting at `start`, across blocks.
+        Implementations return a read only view on their memory where
+        possible, it follows later writes.
+
+        :param int start: First address
+        :param int length: Number of bytes
+        :raises IndexError: If an address is out of bounds
+        :rtype: memoryview
+        :return: The bytes
+        """
+        return memoryview(
+            bytes(self.cpu_read(addr) for addr in range(start, start + length))
+        )
+
+    def write_range(self, start: int, data: Buffer | Sequence[int]) -> None:
+        """
+        Write `data` starting at `start`, across blocks, like
+        :py:meth:`cpu_write` does for each byte.
+
+        :param int start: First address
+        :param data: Bytes or unsigned 8 bit integers
+        :type data: Buffer | Sequence[int]
+        :raises ReadOnlyError: If an address is read only
+        :raises IndexError: If an address is out of bounds
+        """
+        for addr, value in enumerate(_view(data), start):
+            self.cpu_write(addr, value)
+
+    def load(self, addr: int, data: Buffer | Sequence[int]) -> None:
+        """
+        Load a program, or any other data, at `addr`. Unlike
+        :py:meth:`write_range` this writes to read only memory as well,
+        where the implementation allows it.
+
+        :param int addr: First address
+        :param data: Bytes or unsigned 8 bit integers
+        :type data: Buffer | Sequence[int]
+        :raises ReadOnlyError: If an address can't be written at all
+        :raises IndexError: If an address is out of bounds
+        """
+        self.write_range(addr, data)
+
+    def fork(self) -> "Memory":
+        """
+        An independent copy of the memory, for running a forked
+        :py:class:`py65emu.cpu.CPU`. Implementations share what they can
+        until it is written.
+
+        :rtype: Memory
+        :return: The new memory
+        """
+        return copy.deepcopy(self)
+
+
+class Snapshot(NamedTuple):
+    """
+    Contents of the writeable memory of an :py:class:`MMU`, see
+    :py:meth:`MMU.snapshot`. Only the pages changed since
+    :py:attr:`previous` are stored, the others are found in the earlier
+    snapshots.
+    """
+
+    generations: tuple[int, ...]
+    """Write counters of the pages when the snapshot was taken"""
+
+    pages: dict[int, tuple[tuple[int, bytes], ...]]
+    """
+    Stored pages, each as the address and bytes of the parts of the blocks
+    on it
+    """
+
+    previous: "Snapshot | None"
+    """Snapshot this one is relative to, None if all pages are stored"""
+
 
 class MMU(Memory):
     def __init__(self, blocks: Sequence[tuple] = []):
@@ -210,6 +716,21 @@ class MMU(Memory):
         # have different properties.  Stored as dict of "start", "length",
         # "readonly" and "memory"
         self.blocks: list[Block] = []
+        self.generations = [0] * 0x100
+        self.io = bytearray(0x100)
+
+        # Page table, the block covering all of a 256 byte page, or None
+        # when the page is unmapped or shared by several blocks. Pages
+        # of read only blocks are None in the write table.
+        self.pages: list[Block | None] = [None] * 0x100
+        self._write_pages: list[Block | None] = [None] * 0x100
+        # Every block with an address in the page, searched by getBlock
+        # when the page table has no entry
+        self._page_blocks: list[list[Block]] = [[] for _ in range(0x100)]
+        # Non-zero for pages with writeable memory shared with a fork
+        self._cow = bytearray(0x100)
+        # Write counters at the last clear_dirty
+        self._clean = list(self.generations)
 
         for b in blocks:
             if isinstance(b, tuple):
@@ -219,9 +740,182 @@ class MMU(Memory):
         """
         In all writeable blocks reset all values to zero.
         """
-        for b in self.blocks:
+        for b in self._all_blocks():
             b.reset()
 
+    @property
+    def dirty(self) -> bytearray:
+        """
+        Non-zero for each 256 byte page written since the last call to
+        :py:meth:`clear_dirty`. Derived from :py:attr:`generations`, so
+        writes cost nothing extra. Pages with I/O handlers count reads as
+        well.
+
+        :rtype: bytearray
+        """
+        return bytearray(map(operator.ne, self.generations, self._clean))
+
+    def clear_dirty(self) -> None:
+        """Mark every page as unchanged"""
+        self._clean = list(self.generations)
+
+    def snapshot(self, previous: Snapshot | None = None) -> Snapshot:
+        """
+        Save the writeable memory. With a `previous` snapshot of this
+        memory only the pages written since are copied, which makes taking
+        one every frame cheap. Without one every page is copied, take one
+        now and then to bound the chain :py:meth:`restore` walks.
+
+        Read only memory and I/O handlers are not part of the snapshot,
+        nor is which bank a window maps, only the bytes it shows.
+
+        :param previous: Snapshot to store the changes against
+        :type previous: Snapshot | None
+        :rtype: Snapshot
+        :return: The new snapshot
+        """
+        generations = tuple(self.generations)
+        if previous is None:
+            changed: Sequence[int] = range(0x100)
+        else:
+            changed = list(itertools.compress(
+                range(0x100),
+                map(operator.ne, generations, previous.generations)
+            ))
+
+        pages = {}
+        for page in changed:
+            base = page << 8
+            parts = []
+            for b in self._page_blocks[page]:
+                if b.readonly or isinstance(b, Handler):
+                    continue
+                start = max(b.start, base)
+                end = min(b.end, base + 0x100)
+                parts.append((start, bytes(
+                    memoryview(b._memory)[start - b.start:end - b.start]
+                )))
+            if parts:
+                pages[page] = tuple(parts)
+
+        return Snapshot(generations, pages, previous)
+
+    def restore(self, snapshot: Snapshot) -> None:
+        """
+        Write the memory saved in `snapshot`, and in the snapshots it is
+        relative to, back. Only pages of the current memory that were
+        written since the snapshot are copied.
+
+        :param Snapshot snapshot: Snapshot of this memory
+        """
+        changed = set(itertools.compress(
+            range(0x100),
+            map(operator.ne, self.generations, snapshot.generations)
+        ))
+
+        s: Snapshot | None = snapshot
+        while changed and s is not None:
+            for page in changed & s.pages.keys():
+                for start, data in s.pages[page]:
+                    self._load(start, memoryview(data), True)
+            changed -= s.pages.keys()
+            s = s.previous
+
+    def _all_blocks(self) -> list[Block]:
+        """
+        :rtype: list[Block]
+        :return: The blocks, and the pages copied from them after a fork
+        """
+        blocks = {id(b): b for b in self.blocks}
+        for page_blocks in self._page_blocks:
+            for b in page_blocks:
+                blocks.setdefault(id(b), b)
+        return list(blocks.values())
+
+    def fork(self) -> "MMU":
+        """
+        A copy of the memory that shares the contents of every block with
+        this one. A page is copied when it is first written, by either
+        memory, so forking costs the same whatever the size of the RAM and
+        variants differing in a few bytes only hold those pages twice.
+
+        Handlers are copied, but keep calling the same device functions.
+        Bank windows are mapped independently, writeable backing memory is
+        copied, see :py:meth:`Bank.fork`. Written pages no longer show in
+        the blocks in :py:attr:`blocks` of either memory, read them with
+        :py:meth:`cpu_read` or :py:meth:`read_range`.
+
+        :rtype: MMU
+        :return: The new memory
+        """
+        child = copy.copy(self)
+        child.generations = list(self.generations)
+        child.io = bytearray(self.io)
+
+        memo: dict[int, memoryview] = {}
+        forks = {
+            id(b): b.fork(child.generations, memo)
+            for b in self._all_blocks()
+        }
+        child.blocks = [forks[id(b)] for b in self.blocks]
+        child.pages = [
+            None if b is None else forks[id(b)] for b in self.pages
+        ]
+        child._page_blocks = [
+            [forks[id(b)] for b in blocks] for blocks in self._page_blocks
+        ]
+
+        # Writes to shared pages take the slow path, which copies them
+        self._cow = bytearray(
+            any(b.shared and not b.readonly for b in blocks)
+            for blocks in self._page_blocks
+        )
+        self._write_pages = [
+            None if b is None or b.shared else b for b in self._write_pages
+        ]
+        child._cow = bytearray(self._cow)
+        child._write_pages = [
+            None if b is None else forks[id(b)] for b in self._write_pages
+        ]
+        return child
+
+    def _unshare(self, page: int) -> None:
+        """
+        Give the page memory of its own, copied from the shared blocks.
+
+        :param int page: Page number
+        """
+        base = page << 8
+        blocks = self._page_blocks[page]
+        for i, b in enumerate(blocks):
+            if not b.shared:
+                continue
+
+            start = max(b.start, base)
+            end = min(b.end, base + 0x100)
+            own = Block(
+                start=start,
+                length=end - start,
+                readonly=b.readonly,
+                default=b.default,
+                generations=self.generations
+            )
+            own._memory = array.array("B")
+            own._memory.frombytes(
+                memoryview(b._memory)[start - b.start:end - b.start]
+            )
+
+            blocks[i] = own
+            if self.pages[page] is b:
+                self.pages[page] = own
+
+        # Back on the fast path, also when a reset already gave the block
+        # memory of its own
+        block = self.pages[page]
+        if block is not None and not block.readonly:
+            self._write_pages[page] = block
+        self._cow[page] = 0
+
     def addBlock(
         self,
         start: int,
@@ -251,23 +945,16 @@ class MMU(Memory):
         :type value: TextIO | list[int]
         """
 
-        for b in self.blocks:
-            if (
-                start + length > b.start
-                and start + length < b.start + b.length
-            ) or (
-                b.start + b.length > start
-                and b.start + b.length < start + length
-            ):
-                raise MemoryRangeError()
+        self._check_overlap(start, length)
 
         newBlock = Block(
             start=start,
             length=length,
-            readonly=readonly
+            readonly=readonly,
+            generations=self.generations
         )
-
-        # raise TypeError(type(value))
+        # The pages changed contents, even when no value is loaded
+        newBlock.touch()
 
         if (
             isinstance(value, list) or
@@ -275,17 +962,195 @@ class MMU(Memory):
             isinstance(value, str) or
             isinstance(value, array.array)
         ):
-            for i in range(len(value)):
-                newBlock[i + valueOffset] = value[i]
-                # newBlock.set(i + valueOffset, value[i])
+            newBlock.load(valueOffset, _view(value))
         elif isinstance(value, io.BufferedIOBase):
-            a = array.array("B")
-            a.frombytes(value.read())
-            for i in range(len(a)):
-                newBlock[i + valueOffset] = a[i]
-                # newBlock.set(i + valueOffset, a[i])
+            newBlock.load(valueOffset, memoryview(value.read()))
 
         self.blocks.append(newBlock)
+        self._map(newBlock)
+
+    def addHandler(
+        self,
+        start: int,
+        length: int,
+        read_fn: Callable[[int], int],
+        write_fn: Callable[[int, int], None] | None = None
+    ) -> Handler:
+        """
+        Attach a device to an address range, reads and writes in the range
+        call `read_fn` and `write_fn` with the absolute address. The range
+        must not overlap any block, the pages it covers are marked in
+        :py:attr:`.io`. Accesses to other pages don't get any slower.
+
+        Compiled loops of a :py:class:`py65emu.cpu.CPU` created before
+        don't know about the range, tell them with
+        :py:meth:`py65emu.translate.LoopCache.add_io`.
+
+        :param int start: The starting address of the range
+        :param int length: The length of the range in bytes
+        :param read_fn: Returns the value at an address
+        :type read_fn: Callable[[int], int]
+        :param write_fn: Writes a value to an address. (Default: None, the
+                         range is read only)
+        :type write_fn: Callable[[int, int], None] | None
+        :raises MemoryRangeError: If the range overlaps a block
+        :rtype: Handler
+        :return: The added range
+        """
+        self._check_overlap(start, length)
+
+        handler = Handler(
+            start=start,
+            length=length,
+            read=read_fn,
+            write=write_fn,
+            generations=self.generations
+        )
+        handler.touch()
+        for page in _pages(start, start + length):
+            self.io[page] = 1
+
+        self.blocks.append(handler)
+        self._map(handler)
+        return handler
+
+    def addBank(
+        self,
+        start: int,
+        length: int,
+        data: Buffer,
+        readonly: bool = True,
+        offset: int = 0,
+        control: Callable[[int, int], None] | None = None
+    ) -> Bank:
+        """
+        Add a window on a larger backing memory, for bank switching. The
+        window is looked up through the page table like any block, moving
+        it with :py:meth:`Bank.map` or :py:meth:`Bank.select` replaces the
+        slice it reads from, without copying, and only touches the write
+        counters of its pages.
+
+        The switch is usually triggered by a write to a mapper register,
+        either a handler (see :py:meth:`.addHandler`) or the `control`
+        function of a read only window.
+
+        :param int start: The starting address of the window
+        :param int length: The length of the window in bytes
+        :param data: Backing memory, at least `length` bytes
+        :type data: Buffer
+        :param bool readonly: Whether the window is read only. (Default
+                              True)
+        :param int offset: Offset in `data` of the first byte of the
+                           window. (Default 0)
+        :param control: Called with the address and value on writes to a
+                        read only window. (Default None)
+        :type control: Callable[[int, int], None] | None
+        :raises MemoryRangeError: If the window overlaps a block
+        :rtype: Bank
+        :return: The added window
+        """
+        self._check_overlap(start, length)
+
+        bank = Bank(
+            start=start,
+            length=length,
+            data=data,
+            readonly=readonly,
+            offset=offset,
+            control=control,
+            generations=self.generations
+        )
+
+        self.blocks.append(bank)
+        self._map(bank)
+        return bank
+
+    def addROM(
+        self,
+        start: int,
+        value: str | os.PathLike | io.BufferedIOBase | Buffer,
+        valueOffset: int = 0,
+        length: int | None = None
+    ) -> Bank:
+        """
+        Add a read only block that reads straight from `value`, nothing is
+        copied. Files are mapped into memory, so loading takes the same
+        time whatever their size and processes running the same ROM share
+        its pages in the page cache.
+
+        :param int start: The starting address of the block of memory
+        :param value: The ROM, a path or binary file to map from its
+                      beginning, or the bytes
+        :type value: str | os.PathLike | io.BufferedIOBase | Buffer
+        :param int valueOffset: Offset in `value` of the byte at `start`,
+                                to skip a file header. (Default 0)
+        :param length: The length of the block in bytes. (Default: up to
+                       the end of `value`)
+        :type length: int | None
+        :raises MemoryRangeError: If the block overlaps a block or doesn't
+                                  fit in `value`
+        :rtype: Bank
+        :return: The added block, its :py:attr:`Bank.data` is `value`
+        """
+        if isinstance(value, (str, os.PathLike)):
+            with open(value, "rb") as fp:
+                data: Buffer = mmap.mmap(
+                    fp.fileno(), 0, access=mmap.ACCESS_READ
+                )
+        elif isinstance(value, io.BufferedIOBase):
+            try:
+                data = mmap.mmap(value.fileno(), 0, access=mmap.ACCESS_READ)
+            except OSError:
+                # Not backed by a file, like io.BytesIO. Read from the
+                # beginning too, whatever was already read
+                value.seek(0)
+                data = value.read()
+        else:
+            data = value
+
+        if length is None:
+            length = len(data) - valueOffset
+
+        return self.addBank(start, length, data, offset=valueOffset)
+
+    def _check_overlap(self, start: int, length: int) -> None:
+        """
+        :param int start: The starting address of a new block
+        :param int length: The length of the new block in bytes
+        :raises MemoryRangeError: If the range overlaps an existing block
+        """
+        end = start + length
+        candidates = [
+            b
+            for page in _pages(start, end)
+            for b in self._page_blocks[page]
+        ]
+        if end > 0x10000:
+            # Blocks past the address space aren't in the page lists
+            candidates += [b for b in self.blocks if b.end > 0x10000]
+        for b in candidates:
+            if start < b.end and b.start < end:
+                raise MemoryRangeError(
+                    "Block 0x{start:0>4x} - 0x{end:0>4x} overlaps "
+                    "0x{b.start:0>4x} - 0x{b.end:0>4x}".format(
+                        start=start, end=end, b=b
+                    )
+                )
+
+    def _map(self, block: Block) -> None:
+        """
+        Add a block to the page table.
+
+        :param Block block: Block to add
+        """
+        for page in _pages(block.start, block.end):
+            self._page_blocks[page].append(block)
+            if isinstance(block, Handler):
+                continue
+            if block.start <= page << 8 and block.end >= (page + 1) << 8:
+                self.pages[page] = block
+                if not block.readonly:
+                    self._write_pages[page] = block
 
     def getBlock(self, addr: int) -> Block:
         """
@@ -293,8 +1158,15 @@ class MMU(Memory):
 
         :param int addr: Memory address to locate
         """
+        if 0 <= addr < 0x10000:
+            block = self.pages[addr >> 8]
+            if block is not None:
+                return block
+            blocks = self._page_blocks[addr >> 8]
+        else:
+            blocks = self.blocks
 
-        for b in self.blocks:
+        for b in blocks:
             if addr >= b.start and addr < b.start + b.length:
                 return b
 
@@ -309,8 +1181,16 @@ class MMU(Memory):
         :raises ReadOnlyError: If block is readonly
         :raises IndexError: If address is out of bounds for block
         """
-        b = self.getBlock(addr)
-        b.set(addr, value & 0xFF)
+        if 0 <= addr < 0x10000:
+            b = self._write_pages[addr >> 8]
+            if b is not None:
+                b._memory[addr - b.start] = value & 0xFF
+                self.generations[addr >> 8] += 1
+                return
+            if self._cow[addr >> 8]:
+                self._unshare(addr >> 8)
+
+        self.getBlock(addr).set(addr, value & 0xFF)
 
     def cpu_read(self, addr: int) -> int:
         """
@@ -322,5 +1202,313 @@ class MMU(Memory):
         :rtype: int
         :return: Value at address (8 bit)
         """
-        b = self.getBlock(addr)
-        return b.get(addr)
+        if 0 <= addr < 0x10000:
+            b = self.pages[addr >> 8]
+            if b is not None:
+                return b._memory[addr - b.start]
+
+        return self.getBlock(addr).get(addr)
+
+    def _spans(
+        self,
+        start: int,
+        length: int
+    ) -> Iterator[tuple[Block, int, int]]:
+        """
+        Split a range by block
+
+        :param int start: First address
+        :param int length: Number of bytes
+        :raises IndexError: If an address isn't in any block
+        :rtype: Iterator[tuple[Block, int, int]]
+        :return: Block, position in the block and length of each part
+        """
+        addr = start
+        end = start + length
+        while addr < end:
+            block = self.getBlock(addr)
+            n = min(end, block.end) - addr
+            yield block, addr - block.start, n
+            addr += n
+
+    def read_range(self, start: int, length: int) -> memoryview:
+        """
+        Return `length` bytes starting at `start`, across blocks. A range
+        in one block is a read only view on its memory, which stops
+        following writes once the memory is forked. I/O handlers are read
+        byte by byte.
+
+        :param int start: First address
+        :param int length: Number of bytes
+        :raises IndexError: If an address isn't in any block
+        :rtype: memoryview
+        :return: The bytes
+        """
+        parts = list(self._spans(start, length))
+        if len(parts) == 1 and not isinstance(parts[0][0], Handler):
+            block, index, n = parts[0]
+            return memoryview(block._memory)[index:index + n].toreadonly()
+
+        result = bytearray()
+        for block, index, n in parts:
+            if isinstance(block, Handler):
+                result += bytes(block[i] for i in range(index, index + n))
+            else:
+                result += memoryview(block._memory)[index:index + n]
+        return memoryview(result)
+
+    def write_range(self, start: int, data: Buffer | Sequence[int]) -> None:
+        """
+        Write `data` starting at `start`, across blocks. Nothing is written
+        if any address is read only.
+
+        :param int start: First address
+        :param data: Bytes or unsigned 8 bit integers
+        :type data: Buffer | Sequence[int]
+        :raises ReadOnlyError: If an address is read only
+        :raises IndexError: If an address isn't in any block
+        """
+        self._load(start, _view(data), False)
+
+    def load(self, addr: int, data: Buffer | Sequence[int]) -> None:
+        """
+        Load `data` at `addr`, across blocks, read only blocks included.
+        Nothing is written if an address is in a block that can't be
+        written at all, like a mapped file or a handler without a write
+        function.
+
+        :param int addr: First address
+        :param data: Bytes or unsigned 8 bit integers
+        :type data: Buffer | Sequence[int]
+        :raises ReadOnlyError: If an address can't be written
+        :raises IndexError: If an address isn't in any block
+        """
+        self._load(addr, _view(data), True)
+
+    def _load(self, start: int, data: memoryview, force: bool) -> None:
+        for page in _pages(start, start + len(data)):
+            if self._cow[page]:
+                self._unshare(page)
+
+        parts = list(self._spans(start, len(data)))
+        for block, _, _ in parts:
+            if (
+                (block.readonly and (not force or isinstance(block, Handler)))
+                or memoryview(block._memory).readonly
+            ):
+                raise ReadOnlyError(
+                    "Memory section is readonly "
+                    "(0x{s.start:0>4x} - 0x{s.end:0>4x})".format(s=block)
+                )
+
+        offset = 0
+        for block, index, n in parts:
+            block.load(index, data[offset:offset + n])
+            offset += n
+
+
+class FlatMemory(Memory):
+    def __init__(self, blocks: Sequence[tuple] = []):
+        """
+        The whole 64 KiB address space in one bytearray, a read is a single
+        index operation. Takes the same 5-tuples as :py:class:`MMU`, (start,
+        length, readonly, value, valueOffset), to mark read only ranges and
+        load their initial values. Addresses not covered by a block are
+        writeable, the parts of a block past `$FFFF` are dropped.
+
+        See `addBlock` for details about the parameters.
+        """
+        self._memory = bytearray(0x10000)
+        # Non zero for every read only address
+        self._readonly = bytearray(0x10000)
+        self.generations = [0] * 0x100
+        # Ranges of the blocks, to reject overlapping ones like MMU
+        self._ranges: list[tuple[int, int]] = []
+
+        for b in blocks:
+            if isinstance(b, tuple):
+                self.addBlock(*b)
+
+    def reset(self) -> None:
+        """
+        Reset all writeable addresses to zero.
+        """
+        memory = self._memory
+        readonly = self._readonly
+        self._memory = bytearray(
+            v if ro else 0 for v, ro in zip(memory, readonly)
+        )
+        for page in range(0x100):
+            self.generations[page] += 1
+
+    def fork(self) -> "FlatMemory":
+        """
+        A copy of the memory. Copying 64 KiB is cheaper than tracking
+        shared pages on every write.
+
+        :rtype: FlatMemory
+        :return: The new memory
+        """
+        child = copy.copy(self)
+        child._memory = bytearray(self._memory)
+        child._readonly = bytearray(self._readonly)
+        child.generations = list(self.generations)
+        child._ranges = list(self._ranges)
+        return child
+
+    def addBlock(
+        self,
+        start: int,
+        length: int,
+        readonly: bool = False,
+        value: list | tuple | io.BufferedIOBase | None = None,
+        valueOffset: int = 0
+    ) -> None:
+        """
+        Load the initial value of a range and mark it read only, see
+        :py:meth:`MMU.addBlock`.
+
+        :param int start: The starting address of the block of memory
+        :param int length: The length of the block in bytes
+        :param bool readOnly: Whether the block should be read only
+                              (such as ROM) (default False)
+        :param value: The intial value for the block of memory. Used for
+                      loading program data. (Default None)
+        :param int valueOffset: Offset in the block of the first byte of
+                                `value`. (Default 0)
+        :type value: TextIO | list[int]
+        :raises MemoryRangeError: If the block starts outside of the
+                                  address space, or overlaps another one
+        :raises IndexError: If `value` doesn't fit in the block
+        """
+        if start < 0 or start > 0xFFFF or length < 0:
+            raise MemoryRangeError()
+        for b_start, b_end in self._ranges:
+            if start < b_end and b_start < start + length:
+                raise MemoryRangeError(
+                    "Block 0x{start:0>4x} - 0x{end:0>4x} overlaps "
+                    "0x{b_start:0>4x} - 0x{b_end:0>4x}".format(
+                        start=start,
+                        end=start + length,
+                        b_start=b_start,
+                        b_end=b_end
+                    )
+                )
+
+        data: bytes | None = None
+        if isinstance(value, io.BufferedIOBase):
+            data = value.read()
+        elif isinstance(value, str):
+            data = value.encode("latin-1")
+        elif value is not None:
+            data = bytes(value)
+
+        end = min(start + length, 0x10000)
+        self._memory[start:end] = bytes(end - start)
+        if data is not None:
+            if valueOffset < 0 or valueOffset + len(data) > length:
+                raise IndexError(
+                    "Value is outside of memory range "
+                    "(0x{start:0>4x} - 0x{end:0>4x})".format(
+                        start=start, end=start + length
+                    )
+                )
+            first = start + valueOffset
+            size = max(min(len(data), end - first), 0)
+            self._memory[first:first + size] = data[:size]
+
+        self._readonly[start:end] = (b"\x01" if readonly else b"\x00") * (
+            end - start
+        )
+        self._ranges.append((start, start + length))
+
+        # The pages changed contents, even when no value is loaded
+        for page in _pages(start, end):
+            self.generations[page] += 1
+
+    def cpu_write(self, addr: int, value: int) -> None:
+        """
+        Write a value to the given address if it is writeable.
+
+        :param int index: Address/Position to write to
+        :param int value: Value to write
+        :raises ReadOnlyError: If the address is read only
+        :raises IndexError: If address is outside of the address space
+        """
+        if addr < 0:
+            raise IndexError("Unable to locate position %{:0>4x}".format(addr))
+        if self._readonly[addr]:
+            raise ReadOnlyError(
+                "Memory address 0x{:0>4x} is readonly".format(addr)
+            )
+
+        self._memory[addr] = value & 0xFF
+        self.generations[addr >> 8] += 1
+
+    def cpu_read(self, addr: int) -> int:
+        """
+        Return the value at the address.
+
+        :param int index: Address to read from
+        :raises IndexError: If address is outside of the address space
+        :rtype: int
+        :return: Value at address (8 bit)
+        """
+        if addr < 0:
+            raise IndexError("Unable to locate position %{:0>4x}".format(addr))
+        return self._memory[addr]
+
+    def _check_range(self, start: int, length: int) -> None:
+        if start < 0 or length < 0 or start + length > 0x10000:
+            raise IndexError(
+                "Range 0x{start:0>4x} - 0x{end:0>4x} is outside of the "
+                "address space".format(start=start, end=start + length)
+            )
+
+    def read_range(self, start: int, length: int) -> memoryview:
+        """
+        Return a read only view on `length` bytes starting at `start`.
+
+        :param int start: First address
+        :param int length: Number of bytes
+        :raises IndexError: If the range is outside of the address space
+        :rtype: memoryview
+        :return: The bytes
+        """
+        self._check_range(start, length)
+        return memoryview(self._memory)[start:start + length].toreadonly()
+
+    def write_range(self, start: int, data: Buffer | Sequence[int]) -> None:
+        """
+        Write `data` starting at `start`. Nothing is written if any address
+        is read only.
+
+        :param int start: First address
+        :param data: Bytes or unsigned 8 bit integers
+        :type data: Buffer | Sequence[int]
+        :raises ReadOnlyError: If an address is read only
+        :raises IndexError: If the range is outside of the address space
+        """
+        view = _view(data)
+        self._check_range(start, len(view))
+        addr = self._readonly.find(1, start, start + len(view))
+        if addr >= 0:
+            raise ReadOnlyError(
+                "Memory address 0x{:0>4x} is readonly".format(addr)
+            )
+        self.load(start, view)
+
+    def load(self, addr: int, data: Buffer | Sequence[int]) -> None:
+        """
+        Load `data` at `addr`, read only addresses included.
+
+        :param int addr: First address
+        :param data: Bytes or unsigned 8 bit integers
+        :type data: Buffer | Sequence[int]
+        :raises IndexError: If the range is outside of the address space
+        """
+        view = _view(data)
+        self._check_range(addr, len(view))
+        self._memory[addr:addr + len(view)] = view
+        for page in _pages(addr, addr + len(view)):
+            self.generations[page] += 1
@@ -1,5 +1,6 @@
-import functools
-from typing import TYPE_CHECKING
+import copy
+from types import MappingProxyType
+from typing import Callable, Mapping, NamedTuple, Sequence, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from py65emu.cpu import CPU
@@ -9,14 +10,436 @@ InstructionConfigType = int | str | tuple[str, str | bool]
 InstructionType = tuple[str, str, int, str, InstructionConfigType | None]
 
 
+ALWAYS_INDEX_CYCLE: dict[str, frozenset[int]] = {
+    "ax": frozenset({
+        0x1E, 0x1F, 0x3E, 0x3F, 0x5E, 0x5F, 0x7E,
+        0x7F, 0x9D, 0x9F, 0xDE, 0xDF, 0xFE, 0xFF
+    }),
+    "ay": frozenset({0x1B, 0x3B, 0x5B, 0x7B, 0x99, 0xDB, 0xFB}),
+    "iy": frozenset({0x13, 0x33, 0x53, 0x73, 0x91, 0xD3, 0xF3}),
+}
+"""
+Opcodes, per indexed address mode, that always spend the extra indexing
+cycle (stores and read-modify-write operations) instead of only when the
+index crosses a page boundary.
+"""
+
+
+def get_opname(name: str) -> str:
+    """
+    Name of the CPU method implementing a mnemonic. Related mnemonics share
+    a method, which takes the operation configuration to tell them apart.
+
+    :param str name: Operation mnemonic
+    :rtype: str
+    :return: Method name
+    """
+    if name in ["BPL", "BMI", "BVC", "BVS", "BCC", "BCS", "BNE", "BEQ"]:
+        return "B"
+    elif name in ["CLC", "CLI", "CLV", "CLD"]:
+        return "CL"
+    elif name in ["SEC", "SEI", "SED"]:
+        return "SE"
+    elif name in ["PHA", "PLA", "PHP", "PLP"]:
+        return "P"
+    elif name in ["TAX", "TXA", "TAY", "TYA", "TXS", "TSX"]:
+        return "T"
+    elif name in ["SKB", "IGN"]:
+        return "NOP"
+    return name
+
+
+INSTRUCTIONS: Mapping[int, InstructionType] = MappingProxyType({
+    # region Instructions 0x0"
+    0x00: ("BRK", "imp", 7, "v", 1),
+    0x01: ("ORA", "ix", 6, "v", None),
+    0x02: ("KIL", "imp", 1, "v", 1),
+    0x03: ("SLO", "ix", 8, "a", None),
+    0x04: ("IGN", "z", 3, "a", None),
+    0x05: ("ORA", "z", 3, "v", None),
+    0x06: ("ASL", "z", 5, "a", None),
+    0x07: ("SLO", "z", 5, "a", None),
+    0x08: ("PHP", "imp", 3, "a", ("PH", "p")),
+    0x09: ("ORA", "im", 2, "v", None),
+    0x0A: ("ASL", "acc", 2, "a", "a"),
+    0x0B: ("AAC", "im", 2, "v", None),  # ANC
+    0x0C: ("IGN", "a", 4, "a", None),
+    0x0D: ("ORA", "a", 4, "v", None),
+    0x0E: ("ASL", "a", 6, "a", None),
+    0x0F: ("SLO", "a", 6, "a", None),
+    # endregion Instructions 0x0
+
+    # region Instructions 0x1
+    0x10: ("BPL", "rel", 2, "v", ("N", False)),
+    0x11: ("ORA", "iy", 5, "v", None),
+    0x12: ("KIL", "imp", 1, "v", 1),
+    0x13: ("SLO", "iy", 8, "a", None),
+    0x14: ("IGN", "zx", 4, "a", None),
+    0x15: ("ORA", "zx", 4, "v", None),
+    0x16: ("ASL", "zx", 6, "a", None),
+    0x17: ("SLO", "zx", 6, "a", None),
+    0x18: ("CLC", "im", 2, "v", "C"),
+    0x19: ("ORA", "ay", 4, "v", None),
+    0x1A: ("NOP", "imp", 2, "v", 1),
+    0x1B: ("SLO", "ay", 7, "a", None),
+    0x1C: ("IGN", "ax", 4, "a", None),
+    0x1D: ("ORA", "ax", 4, "v", None),
+    0x1E: ("ASL", "ax", 7, "a", None),
+    0x1F: ("SLO", "ax", 7, "a", None),
+    # endregion Instructions 0x1
+
+    # region Instructions 0x2
+    0x20: ("JSR", "a", 6, "a", None),
+    0x21: ("AND", "ix", 6, "v", None),
+    0x22: ("KIL", "imp", 1, "v", 1),
+    0x23: ("RLA", "ix", 8, "a", None),
+    0x24: ("BIT", "z", 3, "v", None),
+    0x25: ("AND", "z", 3, "v", None),
+    0x26: ("ROL", "z", 5, "a", None),
+    0x27: ("RLA", "z", 5, "a", None),
+    0x28: ("PLP", "imp", 4, "a", ("PL", "p")),
+    0x29: ("AND", "im", 2, "v", None),
+    0x2A: ("ROL", "acc", 2, "a", "a"),
+    0x2B: ("AAC", "im", 2, "v", None),  # ANC
+    0x2C: ("BIT", "a", 4, "v", None),
+    0x2D: ("AND", "a", 4, "v", None),
+    0x2E: ("ROL", "a", 6, "a", None),
+    0x2F: ("RLA", "a", 6, "a", None),
+    # endregion Instructions 0x2
+
+    # region Instructions 0x3
+    0x30: ("BMI", "rel", 2, "v", ("N", True)),
+    0x31: ("AND", "iy", 5, "v", None),
+    0x32: ("KIL", "imp", 1, "v", 1),
+    0x33: ("RLA", "iy", 8, "a", None),
+    0x34: ("IGN", "zx", 4, "a", None),
+    0x35: ("AND", "zx", 4, "v", None),
+    0x36: ("ROL", "zx", 6, "a", None),
+    0x37: ("RLA", "zx", 6, "a", None),
+    0x38: ("SEC", "imp", 2, "v", "C"),
+    0x39: ("AND", "ay", 4, "v", None),
+    0x3A: ("NOP", "imp", 2, "v", 1),
+    0x3B: ("RLA", "ay", 7, "a", None),
+    0x3C: ("IGN", "ax", 4, "a", None),
+    0x3D: ("AND", "ax", 4, "v", None),
+    0x3E: ("ROL", "ax", 7, "a", None),
+    0x3F: ("RLA", "ax", 7, "a", None),
+    # endregion Instructions 0x3
+
+    # region Instructions 0x4
+    0x40: ("RTI", "imp", 6, "a", 1),
+    0x41: ("EOR", "ix", 6, "v", None),
+    0x42: ("KIL", "imp", 1, "v", 1),
+    0x43: ("SRE", "ix", 8, "a", None),
+    0x44: ("IGN", "z", 3, "a", None),
+    0x45: ("EOR", "z", 3, "v", None),
+    0x46: ("LSR", "z", 5, "a", None),
+    0x47: ("SRE", "z", 5, "a", None),
+    0x48: ("PHA", "imp", 3, "a", ("PH", "a")),
+    0x49: ("EOR", "im", 2, "v", None),
+    0x4A: ("LSR", "acc", 2, "a", "a"),
+    0x4B: ("ASR", "im", 2, "v", None),  # ALR
+    0x4C: ("JMP", "a", 3, "a", None),
+    0x4D: ("EOR", "a", 4, "v", None),
+    0x4E: ("LSR", "a", 6, "a", None),
+    0x4F: ("SRE", "a", 6, "a", None),
+    # endregion Instructions 0x4
+
+    # region Instructions 0x5
+    0x50: ("BVC", "rel", 2, "v", ("V", False)),
+    0x51: ("EOR", "iy", 5, "v", None),
+    0x52: ("KIL", "imp", 1, "v", 1),
+    0x53: ("SRE", "iy", 8, "a", None),
+    0x54: ("IGN", "zx", 4, "a", None),
+    0x55: ("EOR", "zx", 4, "v", None),
+    0x56: ("LSR", "zx", 6, "a", None),
+    0x57: ("SRE", "zx", 6, "a", None),
+    0x58: ("CLI", "im", 2, "v", "I"),
+    0x59: ("EOR", "ay", 4, "v", None),
+    0x5A: ("NOP", "imp", 2, "v", 1),
+    0x5B: ("SRE", "ay", 7, "a", None),
+    0x5C: ("IGN", "ax", 4, "a", None),
+    0x5D: ("EOR", "ax", 4, "v", None),
+    0x5E: ("LSR", "ax", 7, "a", None),
+    0x5F: ("SRE", "ax", 7, "a", None),
+    # endregion Instructions 0x5
+
+    # region Instructions 0x6
+    0x60: ("RTS", "imp", 6, "a", 1),
+    0x61: ("ADC", "ix", 6, "v", None),
+    0x62: ("KIL", "imp", 1, "v", 1),
+    0x63: ("RRA", "ix", 8, "a", None),
+    0x64: ("IGN", "z", 3, "a", None),
+    0x65: ("ADC", "z", 3, "v", None),
+    0x66: ("ROR", "z", 5, "a", None),
+    0x67: ("RRA", "z", 5, "a", None),
+    0x68: ("PLA", "imp", 4, "a", ("PL", "a")),
+    0x69: ("ADC", "im", 2, "v", None),
+    0x6A: ("ROR", "acc", 2, "a", "a"),
+    0x6B: ("ARR", "im", 2, "v", None),
+    0x6C: ("JMP", "i", 5, "a", None),
+    0x6D: ("ADC", "a", 4, "v", None),
+    0x6E: ("ROR", "a", 6, "a", None),
+    0x6F: ("RRA", "a", 6, "a", None),
+    # endregion Instructions 0x6
+
+    # region Instructions 0x7
+    0x70: ("BVS", "rel", 2, "v", ("V", True)),
+    0x71: ("ADC", "iy", 5, "v", None),
+    0x72: ("KIL", "imp", 1, "v", 1),
+    0x73: ("RRA", "iy", 8, "a", None),
+    0x74: ("IGN", "zx", 4, "a", None),
+    0x75: ("ADC", "zx", 4, "v", None),
+    0x76: ("ROR", "zx", 6, "a", None),
+    0x77: ("RRA", "zx", 6, "a", None),
+    0x78: ("SEI", "imp", 2, "v", "I"),
+    0x79: ("ADC", "ay", 4, "v", None),
+    0x7A: ("NOP", "imp", 2, "v", 1),
+    0x7B: ("RRA", "ay", 7, "a", None),
+    0x7C: ("IGN", "ax", 4, "a", None),
+    0x7D: ("ADC", "ax", 4, "v", None),
+    0x7E: ("ROR", "ax", 7, "a", None),
+    0x7F: ("RRA", "ax", 7, "a", None),
+    # endregion Instructions 0x7
+
+    # region Instructions 0x8
+    0x80: ("SKB", "im", 2, "v", None),
+    0x81: ("STA", "ix", 6, "a", None),
+    0x82: ("SKB", "im", 2, "v", None),
+    0x83: ("AAX", "ix", 6, "a", None),  # SAX
+    0x84: ("STY", "z", 3, "a", None),
+    0x85: ("STA", "z", 3, "a", None),
+    0x86: ("STX", "z", 3, "a", None),
+    0x87: ("AAX", "z", 3, "a", None),  # SAX
+    0x88: ("DEY", "imp", 2, "a", 1),
+    0x89: ("SKB", "im", 2, "v", None),
+    0x8A: ("TXA", "imp", 2, "a", ('x', 'a')),
+    0x8B: ("XAA", "im", 2, "v", None),
+    0x8C: ("STY", "a", 4, "a", None),
+    0x8D: ("STA", "a", 4, "a", None),
+    0x8E: ("STX", "a", 4, "a", None),
+    0x8F: ("AAX", "a", 4, "a", None),  # SAX
+    # endregion Instructions 0x8
+
+    # region Instructions 0x9
+    0x90: ("BCC", "rel", 2, "v", ("C", False)),
+    0x91: ("STA", "iy", 6, "a", None),
+    0x92: ("KIL", "imp", 1, "v", 1),
+    0x93: ("AXA", "iy", 6, "a", None),  # SHA
+    0x94: ("STY", "zx", 4, "a", None),
+    0x95: ("STA", "zx", 4, "a", None),
+    0x96: ("STX", "zy", 4, "a", None),
+    0x97: ("AAX", "zy", 4, "a", None),  # SAX
+    0x98: ("TYA", "imp", 2, "a", ('y', 'a')),
+    0x99: ("STA", "ay", 5, "a", None),
+    0x9A: ("TXS", "imp", 2, "a", ('x', 's')),
+    0x9B: ("XAS", "ay", 5, "a", None),  # SHS, TAS
+    0x9C: ("SYA", "ax", 5, "a", None),
+    0x9D: ("STA", "ax", 5, "a", None),
+    0x9E: ("SXA", "ay", 5, "a", None),
+    0x9F: ("AXA", "ay", 5, "a", None),  # SHA
+    # endregion Instructions 0x9
+
+    # region Instructions 0xA
+    0xA0: ("LDY", "im", 2, "v", None),
+    0xA1: ("LDA", "ix", 6, "v", None),
+    0xA2: ("LDX", "im", 2, "v", None),
+    0xA3: ("LAX", "ix", 6, "v", None),
+    0xA4: ("LDY", "z", 3, "v", None),
+    0xA5: ("LDA", "z", 3, "v", None),
+    0xA6: ("LDX", "z", 3, "v", None),
+    0xA7: ("LAX", "z", 3, "v", None),
+    0xA8: ("TAY", "imp", 2, "a", ('a', 'y')),
+    0xA9: ("LDA", "im", 2, "v", None),
+    0xAA: ("TAX", "imp", 2, "a", ('a', 'x')),
+    0xAB: ("ATX", "im", 2, "v", None),  #
+    0xAC: ("LDY", "a", 4, "v", None),
+    0xAD: ("LDA", "a", 4, "v", None),
+    0xAE: ("LDX", "a", 4, "v", None),
+    0xAF: ("LAX", "a", 4, "v", None),
+    # endregion Instructions 0xA
+
+    # region Instructions 0xB
+    0xB0: ("BCS", "rel", 2, "v", ("C", True)),
+    0xB1: ("LDA", "iy", 5, "v", None),
+    0xB2: ("KIL", "imp", 1, "v", 1),
+    0xB3: ("LAX", "iy", 5, "v", None),
+    0xB4: ("LDY", "zx", 4, "v", None),
+    0xB5: ("LDA", "zx", 4, "v", None),
+    0xB6: ("LDX", "zy", 4, "v", None),
+    0xB7: ("LAX", "zy", 4, "v", None),
+    0xB8: ("CLV", "imp", 2, "v", "V"),
+    0xB9: ("LDA", "ay", 4, "v", None),
+    0xBA: ("TSX", "imp", 2, "a", ('s', 'x')),
+    0xBB: ("LAR", "ay", 4, "v", None),
+    0xBC: ("LDY", "ax", 4, "v", None),
+    0xBD: ("LDA", "ax", 4, "v", None),
+    0xBE: ("LDX", "ay", 4, "v", None),
+    0xBF: ("LAX", "ay", 4, "v", None),
+    # endregion Instructions 0xB
+
+    # region Instructions 0xC
+    0xC0: ("CPY", "im", 2, "v", None),
+    0xC1: ("CMP", "ix", 6, "v", None),
+    0xC2: ("SKB", "im", 2, "v", None),
+    0xC3: ("DCP", "ix", 8, "a", None),
+    0xC4: ("CPY", "z", 3, "v", None),
+    0xC5: ("CMP", "z", 3, "v", None),
+    0xC6: ("DEC", "z", 5, "a", None),
+    0xC7: ("DCP", "z", 5, "a", None),
+    0xC8: ("INY", "imp", 2, "a", 1),
+    0xC9: ("CMP", "im", 2, "v", None),
+    0xCA: ("DEX", "imp", 2, "a", 1),
+    0xCB: ("AXS", "im", 2, "v", None),  # SBX
+    0xCC: ("CPY", "a", 4, "v", None),
+    0xCD: ("CMP", "a", 4, "v", None),
+    0xCE: ("DEC", "a", 6, "a", None),
+    0xCF: ("DCP", "a", 6, "a", None),
+    # endregion Instructions 0xC
+
+    # region Instructions 0xD
+    0xD0: ("BNE", "rel", 2, "v", ("Z", False)),
+    0xD1: ("CMP", "iy", 5, "v", None),
+    0xD2: ("KIL", "imp", 1, "v", 1),
+    0xD3: ("DCP", "iy", 8, "a", None),
+    0xD4: ("IGN", "zx", 4, "a", None),
+    0xD5: ("CMP", "zx", 4, "v", None),
+    0xD6: ("DEC", "zx", 6, "a", None),
+    0xD7: ("DCP", "zx", 6, "a", None),
+    0xD8: ("CLD", "imp", 2, "v", "D"),
+    0xD9: ("CMP", "ay", 4, "v", None),
+    0xDA: ("NOP", "imp", 2, "v", 1),
+    0xDB: ("DCP", "ay", 7, "a", None),
+    0xDC: ("IGN", "ax", 4, "a", None),
+    0xDD: ("CMP", "ax", 4, "v", None),
+    0xDE: ("DEC", "ax", 7, "a", None),
+    0xDF: ("DCP", "ax", 7, "a", None),
+    # endregion Instructions 0xD
+
+    # region Instructions 0xE
+    0xE0: ("CPX", "im", 2, "v", None),
+    0xE1: ("SBC", "ix", 6, "v", None),
+    0xE2: ("SKB", "im", 2, "v", None),
+    0xE3: ("ISC", "ix", 8, "a", None),
+    0xE4: ("CPX", "z", 3, "v", None),
+    0xE5: ("SBC", "z", 3, "v", None),
+    0xE6: ("INC", "z", 5, "a", None),
+    0xE7: ("ISC", "z", 5, "a", None),
+    0xE8: ("INX", "imp", 2, "a", 1),
+    0xE9: ("SBC", "im", 2, "v", None),
+    0xEA: ("NOP", "imp", 2, "v", 1),
+    0xEB: ("SBC", "im", 2, "v", None),  # USBC
+    0xEC: ("CPX", "a", 4, "v", None),
+    0xED: ("SBC", "a", 4, "v", None),
+    0xEE: ("INC", "a", 6, "a", None),
+    0xEF: ("ISC", "a", 6, "a", None),
+    # endregion Instructions 0xE
+
+    # region Instructions 0xF
+    0xF0: ("BEQ", "rel", 2, "v", ("Z", True)),
+    0xF1: ("SBC", "iy", 5, "v", None),
+    0xF2: ("KIL", "imp", 1, "v", 1),
+    0xF3: ("ISC", "iy", 8, "a", None),
+    0xF4: ("IGN", "zx", 4, "a", None),
+    0xF5: ("SBC", "zx", 4, "v", None),
+    0xF6: ("INC", "zx", 6, "a", None),
+    0xF7: ("ISC", "zx", 6, "a", None),
+    0xF8: ("SED", "imp", 2, "v", "D"),
+    0xF9: ("SBC", "ay", 4, "v", None),
+    0xFA: ("NOP", "imp", 2, "v", 1),
+    0xFB: ("ISC", "ay", 7, "a", None),
+    0xFC: ("IGN", "ax", 4, "a", None),
+    0xFD: ("SBC", "ax", 4, "v", None),
+    0xFE: ("INC", "ax", 7, "a", None),
+    0xFF: ("ISC", "ax", 7, "a", None),
+    # endregion Instructions 0xF
+})
+"""
+6502 instruction set (incl. illegal instructions), by opcode. See
+:py:class:`OpCodes` for the fields.
+"""
+
+MODE_BYTES: Mapping[str, int] = MappingProxyType({
+    "acc": 1, "imp": 1,
+    "im": 2, "z": 2, "zx": 2, "zy": 2, "ix": 2, "iy": 2, "rel": 2,
+    "a": 3, "ax": 3, "ay": 3, "i": 3,
+})
+"""Number of bytes an instruction occupies, by address mode"""
+
+
+def get_amode(mode: str, type: str) -> str:
+    """
+    Name of the CPU method for an address mode. Operations acting on
+    values use the method returning the value, the others the one returning
+    the address.
+
+    :param str mode: Address mode
+    :param str type: Address mode type, `v` or `a`
+    :rtype: str
+    :return: Method name
+    """
+    if type == "v":
+        return mode
+    return "{}_a".format(mode)
+
+
+class Tables(NamedTuple):
+    """
+    Instruction metadata in tuples indexed by opcode, `None` for undefined
+    opcodes
+    """
+
+    names: tuple[str | None, ...]
+    """Operation mnemonics"""
+
+    modes: tuple[str | None, ...]
+    """Address modes"""
+
+    cycles: tuple[int | None, ...]
+    """Base number of cycles"""
+
+    bytes: tuple[int | None, ...]
+    """Instruction lengths in bytes"""
+
+    amodes: tuple[str | None, ...]
+    """Method names for the address modes"""
+
+    opnames: tuple[str | None, ...]
+    """Method names for the mnemonics"""
+
+
+def build_tables(instructions: Mapping[int, InstructionType]) -> Tables:
+    """
+    Build the metadata tables for an instruction set
+
+    :param instructions: Instruction set
+    :type instructions: Mapping[int, InstructionType]
+    :rtype: Tables
+    :return: Metadata indexed by opcode
+    """
+    rows = [instructions.get(opcode) for opcode in range(0x100)]
+    return Tables(
+        names=tuple(row and row[0] for row in rows),
+        modes=tuple(row and row[1] for row in rows),
+        cycles=tuple(row and row[2] for row in rows),
+        bytes=tuple(row and MODE_BYTES[row[1]] for row in rows),
+        amodes=tuple(row and get_amode(row[1], row[3]) for row in rows),
+        opnames=tuple(row and get_opname(row[0]) for row in rows),
+    )
+
+
+TABLES = build_tables(INSTRUCTIONS)
+"""Metadata of :py:data:`INSTRUCTIONS`"""
+
+
+_shared: "dict[tuple, tuple[object, OpCodes]]" = {}
+
+
 class UndefinedOperation(LookupError):
     pass
 
 
 class Operation:
-    cpu: "CPU"
-    """CPU Object"""
-
     opcode: int
     """Opcode"""
 
@@ -34,9 +457,24 @@ class Operation:
     config: InstructionConfigType | None = None
     """Operation configuration"""
 
+    bytes: int
+    """Number of bytes the operation occupies"""
+
+    amode: str
+    """Method name for the address mode"""
+
+    opname: str
+    """Method name for the mnemonic"""
+
+    handler: Callable[["CPU"], None]
+    """
+    Operation with mnemonic and addressing mode, or configuration, bound.
+    Takes the CPU to execute on
+    """
+
     def __init__(
         self,
-        cpu: "CPU",
+        cpu: "type[CPU]",
         opcode: int,
         name: str,
         mode: str,
@@ -47,15 +485,15 @@ class Operation:
         """
         Operation Object
 
-        :param CPU cpu: CPU Object
+        :param cpu: CPU class to resolve the methods on
         :param int opcode: Opcode
         :param str name: Operation mnemonic
         :param str mode: Address mode for operation
         :param int cycles: No. of cycles operation should take
         :param str type: Address mode type
         :param InstructionConfigType config: Operation configuration
+        :type cpu: type[CPU]
         """
-        self.cpu: "CPU" = cpu
         self.opcode = opcode
         self.name = name
         self.mode = mode
@@ -63,25 +501,58 @@ class Operation:
         self.config = config
         self._type = type
 
+        self.bytes = MODE_BYTES[mode]
+        self.amode = self._get_amode()
+        self.opname = self._get_opname()
+        self.handler = self.bind(cpu)
+
     def target(self, config: InstructionConfigType) -> InstructionConfigType:
         """Wrapper method to return static configuration"""
         return config
 
-    def execute(self) -> None:
-        """Execute operation"""
+    def bind(self, cpu: "type[CPU]") -> Callable[["CPU"], None]:
+        """
+        Resolve the mnemonic method and the addressing mode method (or the
+        static configuration) on the CPU class once, and return a single
+        callable that executes the operation on the CPU it is given.
+
+        :param cpu: CPU class to resolve the methods on
+        :type cpu: type[CPU]
+        :rtype: Callable[[CPU], None]
+        :return: Callable executing the operation
+        """
+        op_f = getattr(cpu, self.opname)
+        config = self.config
+        if config:
+            def configured(cpu: "CPU") -> None:
+                op_f(cpu, config)
+
+            return configured
 
-        op_f = getattr(self.cpu, self.opname)
-        if self.config:
-            a_f = functools.partial(self.target, self.config)
-        else:
-            a_f = getattr(self.cpu, self.amode)
+        a_f = getattr(cpu, self.amode)
+
+        def handler(cpu: "CPU") -> None:
+            op_f(cpu, a_f(cpu))
+
+        return handler
+
+    def execute(self, cpu: "CPU") -> None:
+        """
+        Execute operation
 
-        op_f(a_f())
+        :param CPU cpu: CPU Object
+        """
+        self.handler(cpu)
 
-    def get_operands(self, addr: int | None = None) -> tuple[int, int, int]:
+    def get_operands(
+        self,
+        cpu: "CPU",
+        addr: int | None = None
+    ) -> tuple[int, int, int]:
         """
         Read operands from memory
 
+        :param CPU cpu: CPU Object
         :param addr: Address to read from, if None, read from CPU Register PC
         :type addr: int | None
         :rtype: tuple[int, int, int]
@@ -89,67 +560,23 @@ class Operation:
         """
 
         if addr is None:
-            addr = self.cpu.r.pc - 1
+            addr = cpu.r.pc - 1
 
         hi = 0x00
         lo = 0x00
         if self.bytes == 2:
-            lo = self.cpu.mmu.cpu_read(addr + 1)
+            lo = cpu.mmu.cpu_read(addr + 1)
         elif self.bytes == 3:
-            lo = self.cpu.mmu.cpu_read(addr + 1)
-            hi = self.cpu.mmu.cpu_read(addr + 2)
+            lo = cpu.mmu.cpu_read(addr + 1)
+            hi = cpu.mmu.cpu_read(addr + 2)
 
         return (addr, hi, lo)
 
-    @property
-    def bytes(self) -> int:
-        """
-        Number of bytes operation reads
-
-        :meta private:
-        """
-        if self.mode in ['acc', 'imp']:
-            return 1
-        elif self.mode in ['im', 'z', 'zx', 'zy', 'ix', 'iy', 'rel']:
-            return 2
-        else:  # ['a', 'ax', 'ay', 'i']:
-            return 3
-
-    @property
-    def amode(self) -> str:
-        """
-        Method name for Address Mode
-
-        :meta private:
-        """
-        if self._type == "v":
-            return self.mode
+    def _get_amode(self) -> str:
+        return get_amode(self.mode, self._type)
 
-        return "{}_a".format(self.mode)
-
-    @property
-    def opname(self) -> str:
-        """
-        Method name for mnemonic
-
-        :meta private:
-        """
-
-        if self.name in [
-            "BPL", "BMI", "BVC", "BVS", "BCC", "BCS", "BNE", "BEQ"
-        ]:
-            return "B"
-        elif self.name in ["CLC", "CLI", "CLV", "CLD"]:
-            return "CL"
-        elif self.name in ["SEC", "SEI", "SED"]:
-            return "SE"
-        elif self.name in ["PHA", "PLA", "PHP", "PLP"]:
-            return "P"
-        elif self.name in ["TAX", "TXA", "TAY", "TYA", "TXS", "TSX"]:
-            return "T"
-        elif self.name in ["SKB", "IGN"]:
-            return "NOP"
-        return self.name
+    def _get_opname(self) -> str:
+        return get_opname(self.name)
 
     def __repr__(self) -> str:
         prefix = f"{self.opcode:0>2X}: {self.name} "
@@ -214,18 +641,87 @@ class OpCodes:
 
     ops: list[Operation | None]
 
-    def __init__(self, cpu: "CPU"):
+    tables: Tables
+    """Metadata of the instruction set, indexed by opcode"""
+
+    def __init__(self, cpu: "type[CPU]"):
         """
-        Object to hold the instruction set
+        Object to hold the instruction set. The table holds no CPU state,
+        the handlers take the CPU they execute on, so a single table can be
+        shared by every CPU of the same class, see :py:meth:`.shared`
 
-        :param CPU cpu: CPU Object
+        :param cpu: CPU class to resolve the methods on
+        :type cpu: type[CPU]
         """
         self.cpu = cpu
         self.ops = [None] * 0x100
 
-        for opcode, config in self.instructions().items():
-            if opcode not in self.ops:
-                self.ops[opcode] = Operation(cpu, opcode, *config)
+        instructions = self.instructions()
+        self.tables = (
+            TABLES if instructions is INSTRUCTIONS
+            else build_tables(instructions)
+        )
+
+        # Indexed directly by opcode, so a lookup is a single list index.
+        # Undefined opcodes are left as `None`.
+        for opcode, config in instructions.items():
+            self.ops[opcode] = Operation(cpu, opcode, *config)
+
+    @classmethod
+    def shared(
+        cls,
+        cpu: "type[CPU]",
+        handlers: "Sequence[Callable[[CPU], None] | None] | None" = None
+    ) -> "OpCodes":
+        """
+        The table for the CPU class, and the handlers if given. Built on
+        the first call and returned again by every later call in the
+        process.
+
+        :param cpu: CPU class to resolve the methods on
+        :param handlers: Handler by opcode, see :py:meth:`.bind`. Tables
+                         are shared for the same sequence object, like the
+                         ones from :py:func:`py65emu.codegen.load`
+        :type cpu: type[CPU]
+        :type handlers: Sequence[Callable[[CPU], None] | None] | None
+        :rtype: OpCodes
+        :return: Shared table, must not be modified
+        """
+        # The handlers are told apart by identity, the tuples returned by
+        # codegen.load are the same object on every call
+        key = (cls, cpu, id(handlers))
+        entry = _shared.get(key)
+        if entry is not None and entry[0] is handlers:
+            return entry[1]
+
+        opcodes = cls(cpu)
+        if handlers is not None:
+            opcodes = opcodes.bind(handlers)
+        _shared[key] = (handlers, opcodes)
+        return opcodes
+
+    def bind(
+        self,
+        handlers: "Sequence[Callable[[CPU], None] | None]"
+    ) -> "OpCodes":
+        """
+        Copy of the table with the handler of each operation replaced, see
+        :py:func:`py65emu.codegen.load`. The table itself is left as is.
+
+        :param handlers: Handler by opcode, taking the CPU
+        :type handlers: Sequence[Callable[[CPU], None] | None]
+        :rtype: OpCodes
+        :return: New table
+        """
+        opcodes = copy.copy(self)
+        opcodes.ops = list(self.ops)
+        for opcode, handler in enumerate(handlers):
+            op = opcodes.ops[opcode]
+            if op is not None and handler is not None:
+                op = copy.copy(op)
+                op.handler = handler
+                opcodes.ops[opcode] = op
+        return opcodes
 
     def __getitem__(self, key: int) -> Operation:
         """
@@ -236,329 +732,23 @@ class OpCodes:
         :return: Operation object for Opcode
         :raises: UndefinedOperation
         """
-        op = next(
-            (
-                x for x in self.ops
-                if isinstance(x, Operation) and x.opcode == key
-            ),
-            None
-        )
+        try:
+            op = self.ops[key] if key >= 0 else None
+        except IndexError:
+            op = None
 
-        if isinstance(op, Operation):
+        if op is not None:
             return op
         raise UndefinedOperation(
             'Operation {0:d} ({0:0>2X}) not instantiated'.format(key)
         )
 
-    def instructions(self) -> dict[int, InstructionType]:
+    def instructions(self) -> Mapping[int, InstructionType]:
         """
-        Returns 6502 instruction set (incl. illegal instructions)
+        Returns 6502 instruction set (incl. illegal instructions), see
+        :py:data:`INSTRUCTIONS`. Override to change it.
 
-        :rtype: dict[int, InstructionType]
+        :rtype: Mapping[int, InstructionType]
         :returns: Full instruction set
         """
-        return {
-            # region Instructions 0x0"
-            0x00: ("BRK", "imp", 7, "v", 1),
-            0x01: ("ORA", "ix", 6, "v", None),
-            0x02: ("KIL", "imp", 1, "v", 1),
-            0x03: ("SLO", "ix", 8, "a", None),
-            0x04: ("IGN", "z", 3, "a", None),
-            0x05: ("ORA", "z", 3, "v", None),
-            0x06: ("ASL", "z", 5, "a", None),
-            0x07: ("SLO", "z", 5, "a", None),
-            0x08: ("PHP", "imp", 3, "a", ("PH", "p")),
-            0x09: ("ORA", "im", 2, "v", None),
-            0x0A: ("ASL", "acc", 2, "a", "a"),
-            0x0B: ("AAC", "im", 2, "v", None),  # ANC
-            0x0C: ("IGN", "a", 4, "a", None),
-            0x0D: ("ORA", "a", 4, "v", None),
-            0x0E: ("ASL", "a", 6, "a", None),
-            0x0F: ("SLO", "a", 6, "a", None),
-            # endregion Instructions 0x0
-
-            # region Instructions 0x1
-            0x10: ("BPL", "rel", 2, "v", ("N", False)),
-            0x11: ("ORA", "iy", 5, "v", None),
-            0x12: ("KIL", "imp", 1, "v", 1),
-            0x13: ("SLO", "iy", 8, "a", None),
-            0x14: ("IGN", "zx", 4, "a", None),
-            0x15: ("ORA", "zx", 4, "v", None),
-            0x16: ("ASL", "zx", 6, "a", None),
-            0x17: ("SLO", "zx", 6, "a", None),
-            0x18: ("CLC", "im", 2, "v", "C"),
-            0x19: ("ORA", "ay", 4, "v", None),
-            0x1A: ("NOP", "imp", 2, "v", 1),
-            0x1B: ("SLO", "ay", 7, "a", None),
-            0x1C: ("IGN", "ax", 4, "a", None),
-            0x1D: ("ORA", "ax", 4, "v", None),
-            0x1E: ("ASL", "ax", 7, "a", None),
-            0x1F: ("SLO", "ax", 7, "a", None),
-            # endregion Instructions 0x1
-
-            # region Instructions 0x2
-            0x20: ("JSR", "a", 6, "a", None),
-            0x21: ("AND", "ix", 6, "v", None),
-            0x22: ("KIL", "imp", 1, "v", 1),
-            0x23: ("RLA", "ix", 8, "a", None),
-            0x24: ("BIT", "z", 3, "v", None),
-            0x25: ("AND", "z", 3, "v", None),
-            0x26: ("ROL", "z", 5, "a", None),
-            0x27: ("RLA", "z", 5, "a", None),
-            0x28: ("PLP", "imp", 4, "a", ("PL", "p")),
-            0x29: ("AND", "im", 2, "v", None),
-            0x2A: ("ROL", "acc", 2, "a", "a"),
-            0x2B: ("AAC", "im", 2, "v", None),  # ANC
-            0x2C: ("BIT", "a", 4, "v", None),
-            0x2D: ("AND", "a", 4, "v", None),
-            0x2E: ("ROL", "a", 6, "a", None),
-            0x2F: ("RLA", "a", 6, "a", None),
-            # endregion Instructions 0x2
-
-            # region Instructions 0x3
-            0x30: ("BMI", "rel", 2, "v", ("N", True)),
-            0x31: ("AND", "iy", 5, "v", None),
-            0x32: ("KIL", "imp", 1, "v", 1),
-            0x33: ("RLA", "iy", 8, "a", None),
-            0x34: ("IGN", "zx", 4, "a", None),
-            0x35: ("AND", "zx", 4, "v", None),
-            0x36: ("ROL", "zx", 6, "a", None),
-            0x37: ("RLA", "zx", 6, "a", None),
-            0x38: ("SEC", "imp", 2, "v", "C"),
-            0x39: ("AND", "ay", 4, "v", None),
-            0x3A: ("NOP", "imp", 2, "v", 1),
-            0x3B: ("RLA", "ay", 7, "a", None),
-            0x3C: ("IGN", "ax", 4, "a", None),
-            0x3D: ("AND", "ax", 4, "v", None),
-            0x3E: ("ROL", "ax", 7, "a", None),
-            0x3F: ("RLA", "ax", 7, "a", None),
-            # endregion Instructions 0x3
-
-            # region Instructions 0x4
-            0x40: ("RTI", "imp", 6, "a", 1),
-            0x41: ("EOR", "ix", 6, "v", None),
-            0x42: ("KIL", "imp", 1, "v", 1),
-            0x43: ("SRE", "ix", 8, "a", None),
-            0x44: ("IGN", "z", 3, "a", None),
-            0x45: ("EOR", "z", 3, "v", None),
-            0x46: ("LSR", "z", 5, "a", None),
-            0x47: ("SRE", "z", 5, "a", None),
-            0x48: ("PHA", "imp", 3, "a", ("PH", "a")),
-            0x49: ("EOR", "im", 2, "v", None),
-            0x4A: ("LSR", "acc", 2, "a", "a"),
-            0x4B: ("ASR", "im", 2, "v", None),  # ALR
-            0x4C: ("JMP", "a", 3, "a", None),
-            0x4D: ("EOR", "a", 4, "v", None),
-            0x4E: ("LSR", "a", 6, "a", None),
-            0x4F: ("SRE", "a", 6, "a", None),
-            # endregion Instructions 0x4
-
-            # region Instructions 0x5
-            0x50: ("BVC", "rel", 2, "v", ("V", False)),
-            0x51: ("EOR", "iy", 5, "v", None),
-            0x52: ("KIL", "imp", 1, "v", 1),
-            0x53: ("SRE", "iy", 8, "a", None),
-            0x54: ("IGN", "zx", 4, "a", None),
-            0x55: ("EOR", "zx", 4, "v", None),
-            0x56: ("LSR", "zx", 6, "a", None),
-            0x57: ("SRE", "zx", 6, "a", None),
-            0x58: ("CLI", "im", 2, "v", "I"),
-            0x59: ("EOR", "ay", 4, "v", None),
-            0x5A: ("NOP", "imp", 2, "v", 1),
-            0x5B: ("SRE", "ay", 7, "a", None),
-            0x5C: ("IGN", "ax", 4, "a", None),
-            0x5D: ("EOR", "ax", 4, "v", None),
-            0x5E: ("LSR", "ax", 7, "a", None),
-            0x5F: ("SRE", "ax", 7, "a", None),
-            # endregion Instructions 0x5
-
-            # region Instructions 0x6
-            0x60: ("RTS", "imp", 6, "a", 1),
-            0x61: ("ADC", "ix", 6, "v", None),
-            0x62: ("KIL", "imp", 1, "v", 1),
-            0x63: ("RRA", "ix", 8, "a", None),
-            0x64: ("IGN", "z", 3, "a", None),
-            0x65: ("ADC", "z", 3, "v", None),
-            0x66: ("ROR", "z", 5, "a", None),
-            0x67: ("RRA", "z", 5, "a", None),
-            0x68: ("PLA", "imp", 4, "a", ("PL", "a")),
-            0x69: ("ADC", "im", 2, "v", None),
-            0x6A: ("ROR", "acc", 2, "a", "a"),
-            0x6B: ("ARR", "im", 2, "v", None),
-            0x6C: ("JMP", "i", 5, "a", None),
-            0x6D: ("ADC", "a", 4, "v", None),
-            0x6E: ("ROR", "a", 6, "a", None),
-            0x6F: ("RRA", "a", 6, "a", None),
-            # endregion Instructions 0x6
-
-            # region Instructions 0x7
-            0x70: ("BVS", "rel", 2, "v", ("V", True)),
-            0x71: ("ADC", "iy", 5, "v", None),
-            0x72: ("KIL", "imp", 1, "v", 1),
-            0x73: ("RRA", "iy", 8, "a", None),
-            0x74: ("IGN", "zx", 4, "a", None),
-            0x75: ("ADC", "zx", 4, "v", None),
-            0x76: ("ROR", "zx", 6, "a", None),
-            0x77: ("RRA", "zx", 6, "a", None),
-            0x78: ("SEI", "imp", 2, "v", "I"),
-            0x79: ("ADC", "ay", 4, "v", None),
-            0x7A: ("NOP", "imp", 2, "v", 1),
-            0x7B: ("RRA", "ay", 7, "a", None),
-            0x7C: ("IGN", "ax", 4, "a", None),
-            0x7D: ("ADC", "ax", 4, "v", None),
-            0x7E: ("ROR", "ax", 7, "a", None),
-            0x7F: ("RRA", "ax", 7, "a", None),
-            # endregion Instructions 0x7
-
-            # region Instructions 0x8
-            0x80: ("SKB", "im", 2, "v", None),
-            0x81: ("STA", "ix", 6, "a", None),
-            0x82: ("SKB", "im", 2, "v", None),
-            0x83: ("AAX", "ix", 6, "a", None),  # SAX
-            0x84: ("STY", "z", 3, "a", None),
-            0x85: ("STA", "z", 3, "a", None),
-            0x86: ("STX", "z", 3, "a", None),
-            0x87: ("AAX", "z", 3, "a", None),  # SAX
-            0x88: ("DEY", "imp", 2, "a", 1),
-            0x89: ("SKB", "im", 2, "v", None),
-            0x8A: ("TXA", "imp", 2, "a", ('x', 'a')),
-            0x8B: ("XAA", "im", 2, "v", None),
-            0x8C: ("STY", "a", 4, "a", None),
-            0x8D: ("STA", "a", 4, "a", None),
-            0x8E: ("STX", "a", 4, "a", None),
-            0x8F: ("AAX", "a", 4, "a", None),  # SAX
-            # endregion Instructions 0x8
-
-            # region Instructions 0x9
-            0x90: ("BCC", "rel", 2, "v", ("C", False)),
-            0x91: ("STA", "iy", 6, "a", None),
-            0x92: ("KIL", "imp", 1, "v", 1),
-            0x93: ("AXA", "iy", 6, "a", None),  # SHA
-            0x94: ("STY", "zx", 4, "a", None),
-            0x95: ("STA", "zx", 4, "a", None),
-            0x96: ("STX", "zy", 4, "a", None),
-            0x97: ("AAX", "zy", 4, "a", None),  # SAX
-            0x98: ("TYA", "imp", 2, "a", ('y', 'a')),
-            0x99: ("STA", "ay", 5, "a", None),
-            0x9A: ("TXS", "imp", 2, "a", ('x', 's')),
-            0x9B: ("XAS", "ay", 5, "a", None),  # SHS, TAS
-            0x9C: ("SYA", "ax", 5, "a", None),
-            0x9D: ("STA", "ax", 5, "a", None),
-            0x9E: ("SXA", "ay", 5, "a", None),
-            0x9F: ("AXA", "ay", 5, "a", None),  # SHA
-            # endregion Instructions 0x9
-
-            # region Instructions 0xA
-            0xA0: ("LDY", "im", 2, "v", None),
-            0xA1: ("LDA", "ix", 6, "v", None),
-            0xA2: ("LDX", "im", 2, "v", None),
-            0xA3: ("LAX", "ix", 6, "v", None),
-            0xA4: ("LDY", "z", 3, "v", None),
-            0xA5: ("LDA", "z", 3, "v", None),
-            0xA6: ("LDX", "z", 3, "v", None),
-            0xA7: ("LAX", "z", 3, "v", None),
-            0xA8: ("TAY", "imp", 2, "a", ('a', 'y')),
-            0xA9: ("LDA", "im", 2, "v", None),
-            0xAA: ("TAX", "imp", 2, "a", ('a', 'x')),
-            0xAB: ("ATX", "im", 2, "v", None),  #
-            0xAC: ("LDY", "a", 4, "v", None),
-            0xAD: ("LDA", "a", 4, "v", None),
-            0xAE: ("LDX", "a", 4, "v", None),
-            0xAF: ("LAX", "a", 4, "v", None),
-            # endregion Instructions 0xA
-
-            # region Instructions 0xB
-            0xB0: ("BCS", "rel", 2, "v", ("C", True)),
-            0xB1: ("LDA", "iy", 5, "v", None),
-            0xB2: ("KIL", "imp", 1, "v", 1),
-            0xB3: ("LAX", "iy", 5, "v", None),
-            0xB4: ("LDY", "zx", 4, "v", None),
-            0xB5: ("LDA", "zx", 4, "v", None),
-            0xB6: ("LDX", "zy", 4, "v", None),
-            0xB7: ("LAX", "zy", 4, "v", None),
-            0xB8: ("CLV", "imp", 2, "v", "V"),
-            0xB9: ("LDA", "ay", 4, "v", None),
-            0xBA: ("TSX", "imp", 2, "a", ('s', 'x')),
-            0xBB: ("LAR", "ay", 4, "v", None),
-            0xBC: ("LDY", "ax", 4, "v", None),
-            0xBD: ("LDA", "ax", 4, "v", None),
-            0xBE: ("LDX", "ay", 4, "v", None),
-            0xBF: ("LAX", "ay", 4, "v", None),
-            # endregion Instructions 0xB
-
-            # region Instructions 0xC
-            0xC0: ("CPY", "im", 2, "v", None),
-            0xC1: ("CMP", "ix", 6, "v", None),
-            0xC2: ("SKB", "im", 2, "v", None),
-            0xC3: ("DCP", "ix", 8, "a", None),
-            0xC4: ("CPY", "z", 3, "v", None),
-            0xC5: ("CMP", "z", 3, "v", None),
-            0xC6: ("DEC", "z", 5, "a", None),
-            0xC7: ("DCP", "z", 5, "a", None),
-            0xC8: ("INY", "imp", 2, "a", 1),
-            0xC9: ("CMP", "im", 2, "v", None),
-            0xCA: ("DEX", "imp", 2, "a", 1),
-            0xCB: ("AXS", "im", 2, "v", None),  # SBX
-            0xCC: ("CPY", "a", 4, "v", None),
-            0xCD: ("CMP", "a", 4, "v", None),
-            0xCE: ("DEC", "a", 6, "a", None),
-            0xCF: ("DCP", "a", 6, "a", None),
-            # endregion Instructions 0xC
-
-            # region Instructions 0xD
-            0xD0: ("BNE", "rel", 2, "v", ("Z", False)),
-            0xD1: ("CMP", "iy", 5, "v", None),
-            0xD2: ("KIL", "imp", 1, "v", 1),
-            0xD3: ("DCP", "iy", 8, "a", None),
-            0xD4: ("IGN", "zx", 4, "a", None),
-            0xD5: ("CMP", "zx", 4, "v", None),
-            0xD6: ("DEC", "zx", 6, "a", None),
-            0xD7: ("DCP", "zx", 6, "a", None),
-            0xD8: ("CLD", "imp", 2, "v", "D"),
-            0xD9: ("CMP", "ay", 4, "v", None),
-            0xDA: ("NOP", "imp", 2, "v", 1),
-            0xDB: ("DCP", "ay", 7, "a", None),
-            0xDC: ("IGN", "ax", 4, "a", None),
-            0xDD: ("CMP", "ax", 4, "v", None),
-            0xDE: ("DEC", "ax", 7, "a", None),
-            0xDF: ("DCP", "ax", 7, "a", None),
-            # endregion Instructions 0xD
-
-            # region Instructions 0xE
-            0xE0: ("CPX", "im", 2, "v", None),
-            0xE1: ("SBC", "ix", 6, "v", None),
-            0xE2: ("SKB", "im", 2, "v", None),
-            0xE3: ("ISC", "ix", 8, "a", None),
-            0xE4: ("CPX", "z", 3, "v", None),
-            0xE5: ("SBC", "z", 3, "v", None),
-            0xE6: ("INC", "z", 5, "a", None),
-            0xE7: ("ISC", "z", 5, "a", None),
-            0xE8: ("INX", "imp", 2, "a", 1),
-            0xE9: ("SBC", "im", 2, "v", None),
-            0xEA: ("NOP", "imp", 2, "v", 1),
-            0xEB: ("SBC", "im", 2, "v", None),  # USBC
-            0xEC: ("CPX", "a", 4, "v", None),
-            0xED: ("SBC", "a", 4, "v", None),
-            0xEE: ("INC", "a", 6, "a", None),
-            0xEF: ("ISC", "a", 6, "a", None),
-            # endregion Instructions 0xE
-
-            # region Instructions 0xF
-            0xF0: ("BEQ", "rel", 2, "v", ("Z", True)),
-            0xF1: ("SBC", "iy", 5, "v", None),
-            0xF2: ("KIL", "imp", 1, "v", 1),
-            0xF3: ("ISC", "iy", 8, "a", None),
-            0xF4: ("IGN", "zx", 4, "a", None),
-            0xF5: ("SBC", "zx", 4, "v", None),
-            0xF6: ("INC", "zx", 6, "a", None),
-            0xF7: ("ISC", "zx", 6, "a", None),
-            0xF8: ("SED", "imp", 2, "v", "D"),
-            0xF9: ("SBC", "ay", 4, "v", None),
-            0xFA: ("NOP", "imp", 2, "v", 1),
-            0xFB: ("ISC", "ay", 7, "a", None),
-            0xFC: ("IGN", "ax", 4, "a", None),
-            0xFD: ("SBC", "ax", 4, "v", None),
-            0xFE: ("INC", "ax", 7, "a", None),
-            0xFF: ("ISC", "ax", 7, "a", None),
-            # endregion Instructions 0xF
-        }
+        return INSTRUCTIONS
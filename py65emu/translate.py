@@ -0,0 +1,1118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from typing import Callable, Generic, Protocol, TYPE_CHECKING, TypeVar
+
+from py65emu import arithmetic
+from py65emu.operation import ALWAYS_INDEX_CYCLE, Operation
+
+if TYPE_CHECKING:
+    from py65emu.cpu import CPU
+
+
+NZ = tuple((v & 0x80) | (0x02 if v == 0 else 0x00) for v in range(0x100))
+"""N and Z flag bits for every 8 bit value"""
+
+BRANCHES: dict[str, tuple[int, bool]] = {
+    "BPL": (0x80, False),
+    "BMI": (0x80, True),
+    "BVC": (0x40, False),
+    "BVS": (0x40, True),
+    "BCC": (0x01, False),
+    "BCS": (0x01, True),
+    "BNE": (0x02, False),
+    "BEQ": (0x02, True),
+}
+"""Flag mask, and whether it should be set, for each branch mnemonic"""
+
+FLAGS = {"N": 0x80, "V": 0x40, "D": 0x08, "I": 0x04, "Z": 0x02, "C": 0x01}
+
+TRANSLATABLE = frozenset({
+    "LDA", "LDX", "LDY", "ADC", "SBC", "AND", "ORA", "EOR", "CMP", "CPX",
+    "CPY", "BIT", "STA", "STX", "STY", "INC", "DEC", "ASL", "LSR", "ROL",
+    "ROR", "INX", "INY", "DEX", "DEY", "TAX", "TAY", "TXA", "TYA", "TSX",
+    "TXS", "CLC", "SEC", "CLI", "SEI", "CLD", "SED", "CLV", "NOP", "SKB",
+    "IGN", "PHA", "PHP", "PLA", "PLP", "JMP", "JSR", "RTS",
+    *BRANCHES,
+})
+"""Mnemonics the translator generates code for"""
+
+TERMINATORS = frozenset({"JMP", "JSR", "RTS", *BRANCHES})
+"""Mnemonics ending a block"""
+
+STACK_OPERATIONS = frozenset({"PHA", "PHP", "PLA", "PLP"})
+"""Translatable mnemonics accessing the stack"""
+
+READS = frozenset({
+    "LDA", "LDX", "LDY", "ADC", "SBC", "AND", "ORA", "EOR", "CMP", "CPX",
+    "CPY", "BIT", "NOP", "SKB", "IGN",
+})
+"""Translatable mnemonics that don't write to their operand address"""
+
+
+def size(op: Operation) -> int:
+    """
+    Number of bytes the operation occupies when executed. Operations with a
+    static configuration don't read any operand, except for branches.
+
+    :param Operation op: Operation
+    :rtype: int
+    :return: Instruction length in bytes
+    """
+    if op.config and op.mode != "rel":
+        return 1
+    return op.bytes
+
+
+class TranslatedBlock:
+    """
+    A straight-line sequence of instructions compiled into one Python
+    function.
+    """
+
+    start: int
+    """Address of the first instruction"""
+
+    end: int
+    """Address following the last instruction"""
+
+    length: int
+    """Number of instructions"""
+
+    max_cycles: int
+    """Number of cycles the block takes, with every penalty applied"""
+
+    source: str
+    """Generated Python source"""
+
+    fn: Callable[["CPU"], tuple[int, int]]
+    """
+    Compiled block, returns the number of instructions and cycles executed.
+    Less than :py:attr:`.length` instructions run if the block stores to
+    its own code.
+    """
+
+    code: bytes
+    """The translated instruction bytes"""
+
+    checks: tuple[tuple[int, int], ...]
+    """
+    Page and its :py:attr:`py65emu.mmu.Memory.generations` value for each
+    page the block covers, at the time the code was read
+    """
+
+    def __init__(
+        self,
+        start: int,
+        end: int,
+        length: int,
+        max_cycles: int,
+        source: str,
+        fn: Callable[["CPU"], tuple[int, int]],
+        code: bytes = b"",
+        checks: tuple[tuple[int, int], ...] = (),
+    ):
+        self.start = start
+        self.end = end
+        self.length = length
+        self.max_cycles = max_cycles
+        self.source = source
+        self.fn = fn
+        self.code = code
+        self.checks = checks
+
+    def __repr__(self) -> str:
+        return (
+            f"<TranslatedBlock ${self.start:0>4x}-${self.end:0>4x} "
+            f"{self.length:d} instr.>"
+        )
+
+
+class _Emitter:
+    """
+    Generates the Python statements for a sequence of instructions.
+
+    Registers live in the locals `a`, `x`, `y`, `s` and `p` for the whole
+    block, `e` accumulates extra cycles (page crossings, taken branches).
+    An instruction storing to a computed address leaves the block when it
+    has written to the code following it, the global `end` is the address
+    following the block.
+    """
+
+    def __init__(self, cpu: "CPU", watch: bool):
+        """
+        :param CPU cpu: The CPU to translate code for
+        :param bool watch: Check stores for writes to translated code
+        """
+        self.cpu = cpu
+        self.watch = watch
+        self.stack = cpu.stack_page * 0x100
+        self.lines: list[str] = []
+        self.max_extra = 0
+        self.length = 0
+        self.cycles = 0
+        # Computed address the current instruction has stored to
+        self.target: str | None = None
+
+    def emit(self, *lines: str) -> None:
+        self.lines.extend(lines)
+
+    def zn(self, v: str) -> None:
+        self.emit(f"p = (p & 0x7D) | NZ[{v}]")
+
+    def carry(self, expr: str) -> None:
+        self.emit(f"p = (p & 0xFE) | (1 if {expr} else 0)")
+
+    def penalty(self, condition: str) -> None:
+        self.emit(f"if {condition}:", "    e += 1")
+        self.max_extra += 1
+
+    def address(self, op: Operation, lo: int, hi: int) -> str:
+        """
+        Emit the effective address calculation, mirroring the
+        `*_a`-methods on :py:class:`py65emu.cpu.CPU`
+
+        :rtype: str
+        :return: Expression for the effective address
+        """
+        word = (hi << 8) + lo
+        mode = op.mode
+        if mode == "z":
+            return f"0x{lo:0>2x}"
+        if mode == "zx":
+            return f"((0x{lo:0>2x} + x) & 0xFF)"
+        if mode == "zy":
+            return f"((0x{lo:0>2x} + y) & 0xFF)"
+        if mode == "a":
+            return f"0x{word:0>4x}"
+        if mode in ("ax", "ay"):
+            index = mode[1]
+            if op.opcode not in ALWAYS_INDEX_CYCLE[mode]:
+                self.penalty(f"{index} > 0x{0xFF - lo:0>2x}")
+            self.emit(f"ea = (0x{word:0>4x} + {index}) & 0xFFFF")
+            return "ea"
+        if mode == "ix":
+            self.emit(
+                f"t = (0x{lo:0>2x} + x) & 0xFF",
+                "ea = (read((t + 1) & 0xFF) << 8) + read(t)",
+            )
+            return "ea"
+        # mode == "iy"
+        self.emit(
+            f"t = (read(0x{(lo + 1) & 0xFF:0>2x}) << 8) + read(0x{lo:0>2x})"
+        )
+        if op.opcode not in ALWAYS_INDEX_CYCLE["iy"]:
+            self.penalty("(t & 0xFF) + y > 0xFF")
+        self.emit("ea = (t + y) & 0xFFFF")
+        return "ea"
+
+    def value(self, op: Operation, lo: int, hi: int) -> str:
+        """
+        Emit the operand read for operations acting on values
+
+        :rtype: str
+        :return: Expression for the operand value
+        """
+        if op.mode == "im":
+            return f"0x{lo:0>2x}"
+        self.emit(f"v = read({self.address(op, lo, hi)})")
+        return "v"
+
+    def instruction(self, op: Operation, pc: int, lo: int, hi: int) -> None:
+        """
+        Emit a single instruction
+
+        :param Operation op: Operation to emit
+        :param int pc: Address of the instruction
+        :param int lo: First operand byte
+        :param int hi: Second operand byte
+        """
+        name = op.name
+        following = (pc + size(op)) & 0xFFFF
+        mark = len(self.lines)
+        self.target = None
+
+        if name in ("LDA", "LDX", "LDY"):
+            register = name[2].lower()
+            self.emit(f"{register} = {self.value(op, lo, hi)}")
+            self.zn(register)
+        elif name in ("AND", "ORA", "EOR"):
+            operator = {"AND": "&", "ORA": "|", "EOR": "^"}[name]
+            self.emit(f"a = a {operator} {self.value(op, lo, hi)}")
+            self.zn("a")
+        elif name in ("ADC", "SBC"):
+            self.arithmetic(name, self.value(op, lo, hi))
+        elif name in ("CMP", "CPX", "CPY"):
+            register = {"CMP": "a", "CPX": "x", "CPY": "y"}[name]
+            v = self.value(op, lo, hi)
+            self.emit(f"o = ({register} - {v}) & 0xFF")
+            self.carry(f"{register} >= {v}")
+            self.zn("o")
+        elif name == "BIT":
+            v = self.value(op, lo, hi)
+            self.emit(
+                f"p = (p & 0x3D) | ({v} & 0xC0)"
+                f" | (0x02 if a & {v} == 0 else 0)"
+            )
+        elif name in ("STA", "STX", "STY"):
+            register = name[2].lower()
+            self.store(self.address(op, lo, hi), register)
+        elif name in ("INC", "DEC"):
+            ea = self.address(op, lo, hi)
+            sign = "+" if name == "INC" else "-"
+            self.emit(f"v = read({ea})")
+            self.store(ea, "v & 0xFF")
+            self.emit(f"v = (v {sign} 1) & 0xFF")
+            self.store(ea, "v")
+            self.zn("v")
+        elif name in ("ASL", "LSR", "ROL", "ROR"):
+            self.shift(op, lo, hi)
+        elif name in ("INX", "INY", "DEX", "DEY"):
+            register = name[2].lower()
+            sign = "+" if name[0] == "I" else "-"
+            self.emit(f"{register} = ({register} {sign} 1) & 0xFF")
+            self.zn(register)
+        elif name in ("TAX", "TAY", "TXA", "TYA", "TSX", "TXS"):
+            source, destination = name[1].lower(), name[2].lower()
+            self.emit(f"{destination} = {source}")
+            if destination != "s":
+                self.zn(destination)
+        elif name in ("CLC", "CLI", "CLD", "CLV"):
+            self.emit(f"p &= 0x{0xFF ^ FLAGS[name[2]]:0>2X}")
+        elif name in ("SEC", "SEI", "SED"):
+            self.emit(f"p |= 0x{FLAGS[name[2]]:0>2X}")
+        elif name in ("NOP", "SKB"):
+            pass
+        elif name == "IGN":
+            # Only the address is calculated, nothing is read
+            self.address(op, lo, hi)
+        elif name in ("PHA", "PHP"):
+            self.push("a" if name == "PHA" else "p | 0x30")
+        elif name == "PLA":
+            self.pop("a")
+            self.zn("a")
+        elif name == "PLP":
+            self.pop("p")
+            self.emit("p = (p & 0xEF) | 0x20")
+        elif name == "JMP":
+            if op.mode == "a":
+                self.emit(f"pc = 0x{(hi << 8) + lo:0>4x}")
+            else:
+                i = (hi << 8) + lo
+                j = i - 0xFF if i & 0xFF == 0xFF else i + 1
+                self.emit(
+                    f"pc = ((read(0x{j:0>4x}) << 8)"
+                    f" + read(0x{i:0>4x})) & 0xFFFF"
+                )
+        elif name == "JSR":
+            ret = following - 1
+            self.push(f"0x{ret >> 8:0>2x}")
+            self.push(f"0x{ret & 0xFF:0>2x}")
+            self.emit(f"pc = 0x{(hi << 8) + lo:0>4x}")
+        elif name == "RTS":
+            self.pop("lo")
+            self.pop("hi")
+            self.emit("pc = (lo + (hi << 8) + 1) & 0xFFFF")
+        else:  # Branches
+            mask, value = BRANCHES[name]
+            target = (following + ((lo & 0x7F) - (lo & 0x80))) & 0xFFFF
+            taken = 2 if target & 0xFF00 != following & 0xFF00 else 1
+            self.emit(
+                f"if {'' if value else 'not '}p & 0x{mask:0>2x}:",
+                f"    e += {taken:d}",
+                f"    pc = 0x{target:0>4x}",
+                "else:",
+                f"    pc = 0x{following:0>4x}",
+            )
+            self.max_extra += taken
+
+        self.length += 1
+        self.cycles += op.cycles
+        if self.target is not None and name not in TERMINATORS:
+            self.guard(op, mark, following)
+
+    def arithmetic(self, name: str, v: str) -> None:
+        """
+        Emit ADC/SBC, looking the result up like
+        :py:meth:`py65emu.cpu.CPU.ADC`/`SBC`
+        """
+        self.emit(f"v = {v}")
+        table = name.lower()
+        i = "(p & 0x01) << 16 | a << 8 | v"
+        if self.cpu.bcd_disabled:
+            self.emit(f"t = binary.{table}[{i}]")
+        else:
+            self.emit(
+                "if p & 0x08:",
+                f"    t = decimal().{table}[{i}]",
+                "else:",
+                f"    t = binary.{table}[{i}]",
+            )
+        self.emit("a = t & 0xFF", "p = (p & 0x3C) | t >> 8")
+
+    def shift(self, op: Operation, lo: int, hi: int) -> None:
+        """Emit ASL/LSR/ROL/ROR on the accumulator or memory"""
+        accumulator = op.mode == "acc"
+        if accumulator:
+            self.emit("v = a")
+        else:
+            ea = self.address(op, lo, hi)
+            self.emit(f"v = read({ea})")
+            self.store(ea, "v")
+
+        match op.name:
+            case "ASL":
+                self.carry("v & 0x80")
+                self.emit("n = (v << 1) & 0xFF")
+            case "LSR":
+                self.carry("v & 0x01")
+                self.emit("n = v >> 1")
+            case "ROL":
+                self.emit("n = ((v << 1) + (p & 0x01)) & 0xFF")
+                self.carry("v & 0x80")
+            case _:  # ROR
+                self.emit("n = ((v >> 1) + (p & 0x01) * 0x80) & 0xFF")
+                self.carry("v & 0x01")
+        self.zn("n")
+
+        if accumulator:
+            self.emit("a = n")
+        elif op.name == "ASL":
+            # CPU.ASL writes the unmasked shifted value
+            self.store(ea, "v << 1")
+        else:
+            self.store(ea, "n")
+
+    def store(self, ea: str, value: str) -> None:
+        self.emit(f"write({ea}, {value})")
+        if self.watch:
+            self.emit(
+                f"if code[({ea}) >> 8]:",
+                f"    invalidate({ea})",
+            )
+        if not (ea.startswith("0x") and ea[2:].isalnum()):
+            self.target = ea
+
+    def guard(self, op: Operation, mark: int, following: int) -> None:
+        """
+        Emit leaving the block after the instruction just emitted if it
+        has stored to the code following it. Stores to fixed addresses are
+        left to :py:meth:`BlockCache.translate`, which ends the block
+        before the code they modify.
+
+        :param Operation op: The instruction
+        :param int mark: Index of its first line
+        :param int following: Address of the next instruction
+        """
+        if op.mode in ("zx", "zy"):
+            last = 0xFF
+        elif op.name in STACK_OPERATIONS:
+            last = self.stack + 0xFF
+        else:
+            last = 0xFFFF
+        if following > last:
+            # The code following it is out of reach
+            return
+
+        # Extra cycles of the instruction end up in `CPU.cc_extra`
+        self.lines.insert(mark, "l = e")
+        registers = ("a", "x", "y", "s", "p")
+        self.emit(
+            f"if 0x{following:0>4x} <= {self.target} < end:",
+            "    " + "; ".join(f"regs.{v} = {v}" for v in registers),
+            f"    regs.pc = 0x{following:0>4x}",
+            f"    cpu.op = ops[{self.length - 1:d}]",
+            "    cpu.cc_extra = e - l",
+            f"    cpu.cc = {op.cycles:d} + e - l",
+            f"    return {self.length:d}, {self.cycles:d} + e",
+        )
+
+    def push(self, value: str) -> None:
+        self.store(f"0x{self.stack:0>4x} + s", value)
+        self.emit("s = (s - 1) & 0xFF")
+        # Where the value went, with `s` already decremented
+        self.target = f"0x{self.stack:0>4x} + ((s + 1) & 0xFF)"
+
+    def pop(self, register: str) -> None:
+        self.emit(
+            "s = (s + 1) & 0xFF",
+            f"{register} = read(0x{self.stack:0>4x} + s)",
+        )
+
+
+class _Code(Protocol):
+    """What the caches keep of translated code, see :py:class:`_CodeCache`"""
+
+    start: int
+    end: int
+    code: bytes
+    checks: tuple[tuple[int, int], ...]
+
+
+_T = TypeVar("_T", bound=_Code)
+
+
+class _CodeCache(Generic[_T]):
+    """
+    Code translated by start address, built once an address has been
+    looked up :py:attr:`.threshold` times. When the memory keeps
+    :py:attr:`py65emu.mmu.Memory.generations` an entry is checked against
+    the write counters of its pages before it is reused. If one of them
+    changed the code bytes are compared, and the code is translated again
+    only if they differ. Addresses that can't be translated are cached
+    too, checked on the pages of their first instruction.
+    """
+
+    def __init__(self, cpu: "CPU", threshold: int):
+        self.cpu = cpu
+        self.threshold = threshold
+        self.generations: list[int] | None = getattr(
+            cpu.mmu, "generations", None
+        )
+        self._entries: dict[int, _T | None] = {}
+        self._counts: dict[int, int] = {}
+        # Checks for cached addresses that couldn't be translated
+        self._missing: dict[int, tuple[tuple[int, int], ...]] = {}
+
+    def _build(self, pc: int) -> _T | None:
+        """Translate the code at `pc`, None if it can't be"""
+        raise NotImplementedError
+
+    def lookup(self, pc: int) -> _T | None:
+        """
+        Get the code starting at `pc`, translating it once it has been
+        looked up :py:attr:`.threshold` times
+
+        :param int pc: Start address
+        :rtype: TranslatedBlock | CompiledLoop | None
+        :return: The code or None if it isn't translated (yet)
+        """
+        try:
+            entry = self._entries[pc]
+        except KeyError:
+            count = self._counts.get(pc, 0) + 1
+            if count < self.threshold:
+                self._counts[pc] = count
+                return None
+
+            self._counts.pop(pc, None)
+            return self._add(pc)
+
+        generations = self.generations
+        if generations is not None:
+            checks = entry.checks if entry else self._missing[pc]
+            for page, generation in checks:
+                if generations[page] != generation:
+                    return self._revalidate(pc, entry)
+
+        return entry
+
+    def _add(self, pc: int) -> _T | None:
+        entry = self._entries[pc] = self._build(pc)
+        if entry is None:
+            self._missing[pc] = self._checks(pc, min(pc + 3, 0x10000))
+        return entry
+
+    def _revalidate(self, pc: int, entry: _T | None) -> _T | None:
+        if entry is not None:
+            read = self.cpu.mmu.cpu_read
+            try:
+                unchanged = all(
+                    read(entry.start + i) == v
+                    for i, v in enumerate(entry.code)
+                )
+            except IndexError:
+                unchanged = False
+
+            if unchanged:
+                entry.checks = self._checks(entry.start, entry.end)
+                return entry
+
+        self._drop(pc)
+        return self._add(pc)
+
+    def _checks(self, start: int, end: int) -> tuple[tuple[int, int], ...]:
+        generations = self.generations
+        if generations is None:
+            return ()
+        return tuple(
+            (page, generations[page])
+            for page in range(start >> 8, ((end - 1) >> 8) + 1)
+        )
+
+    def _drop(self, start: int) -> None:
+        del self._entries[start]
+        self._missing.pop(start, None)
+
+    def flush(self) -> None:
+        """Drop everything translated"""
+        self._entries.clear()
+        self._counts.clear()
+        self._missing.clear()
+
+
+class BlockCache(_CodeCache[TranslatedBlock]):
+    """
+    Translation cache, compiling straight-line 6502 code into Python
+    functions.
+
+    A block starts at the address it is entered from and runs up to and
+    including the next branch, `JMP`, `JSR` or `RTS`, or up to the first
+    instruction the translator has no template for (`BRK`, `RTI` and most
+    illegal opcodes). Those are left to the interpreter. Each block is
+    compiled once and cached by its start address.
+
+    Running a block skips instruction decoding, :py:class:`Operation`
+    dispatch and the per-access cycle bookkeeping. The number of cycles is
+    computed from the instruction table plus page crossing and branch
+    penalties, so :py:attr:`py65emu.cpu.CPU.cc_total` stays exact.
+
+    When the memory keeps :py:attr:`py65emu.mmu.Memory.generations` (like
+    :py:class:`py65emu.mmu.MMU` does) a block is checked against the write
+    counters of its pages before it is reused. If one of them changed, the
+    code bytes are compared and the block is translated again only if
+    they differ. Other memories only let the cache see stores made by
+    translated code, any other change to code requires a call to
+    :py:meth:`.invalidate` or :py:meth:`.flush`. Either way a block never
+    runs stale code: it ends before any instruction stored to at a fixed
+    address from within the block, and is left right after a store to a
+    computed address that hits its remaining code.
+
+    Memory errors raised inside a block leave the registers at the values
+    they had when the block was entered.
+    """
+
+    max_length: int = 64
+    """Maximum number of instructions in a block"""
+
+    def __init__(self, cpu: "CPU", threshold: int = 8):
+        """
+        :param CPU cpu: The CPU to translate code for
+        :param int threshold: Number of times an address has to be looked
+                              up before it is translated, code that only
+                              runs a few times is cheaper to interpret.
+                              (Default: 8)
+        """
+        super().__init__(cpu, threshold)
+        self.io: bytearray | None = getattr(cpu.mmu, "io", None)
+        self.blocks: dict[int, TranslatedBlock | None] = self._entries
+        self._code = bytearray(0x100)
+        self._pages: dict[int, set[int]] = {}
+        self._spans: dict[int, tuple[int, int]] = {}
+
+    def _build(self, pc: int) -> TranslatedBlock | None:
+        return self.translate(pc)
+
+    def _add(self, pc: int) -> TranslatedBlock | None:
+        block = super()._add(pc)
+        end = min(pc + 3, 0x10000) if block is None else block.end
+        self._register(pc, end)
+        return block
+
+    def translate(self, pc: int) -> TranslatedBlock | None:
+        """
+        Translate the block starting at `pc`. Does not use, or update, the
+        cache.
+
+        :param int pc: Start address
+        :rtype: TranslatedBlock | None
+        :return: The block or None if the first instruction can't be
+                 translated
+        """
+        cpu = self.cpu
+        read = cpu.mmu.cpu_read
+        io = self.io if self.io is not None else bytes(0x100)
+        emitter = _Emitter(cpu, watch=self.generations is None)
+
+        start = addr = pc
+        code = bytearray()
+        ops: list[Operation] = []
+        # Fixed addresses stored to by the translated instructions
+        stored: set[int] = set()
+        mark = 0
+
+        while len(ops) < self.max_length:
+            try:
+                if io[addr >> 8] or io[((addr + 2) >> 8) & 0xFF]:
+                    # Reading code from I/O has side effects
+                    break
+                op = cpu.opcodes[read(addr)]
+                width = size(op)
+                if op.name not in TRANSLATABLE or addr + width > 0x10000:
+                    break
+                if not stored.isdisjoint(range(addr, addr + width)):
+                    # Modified by the block, has to be read when it's run
+                    break
+                lo = read(addr + 1) if width > 1 else 0
+                hi = read(addr + 2) if width > 2 else 0
+            except IndexError:
+                break
+
+            mark = len(emitter.lines)
+            emitter.instruction(op, addr, lo, hi)
+            code.extend((op.opcode, lo, hi)[:width])
+            addr += width
+            ops.append(op)
+
+            if op.name in TERMINATORS:
+                break
+            if op.mode in ("z", "a") and op.name not in READS:
+                stored.add((hi << 8) + lo)
+
+        if not ops:
+            return None
+
+        last = ops[-1]
+        # Extra cycles of the last instruction end up in `CPU.cc_extra`
+        if emitter.lines[mark:mark + 1] != ["l = e"]:
+            emitter.lines.insert(mark, "l = e")
+        if last.name not in TERMINATORS:
+            emitter.emit(f"pc = 0x{addr:0>4x}")
+
+        source = self._source(emitter, last.cycles)
+        namespace: dict[str, object] = {
+            "NZ": NZ,
+            "binary": arithmetic.binary(),
+            "decimal": arithmetic.decimal,
+            "code": self._code,
+            "invalidate": self.invalidate,
+            "ops": tuple(ops),
+            "last_op": last,
+            "end": addr,
+        }
+        exec(compile(source, f"<block ${start:0>4x}>", "exec"), namespace)
+
+        block = TranslatedBlock(
+            start=start,
+            end=addr,
+            length=len(ops),
+            max_cycles=emitter.cycles + emitter.max_extra,
+            source=source,
+            fn=namespace["block"],  # type: ignore[arg-type]
+            code=bytes(code),
+            checks=self._checks(start, addr),
+        )
+        return block
+
+    def _source(self, emitter: _Emitter, last_cycles: int) -> str:
+        body = "\n".join("    " + line for line in emitter.lines)
+        registers = ("a", "x", "y", "s", "p")
+        return "\n".join((
+            "def block(cpu):",
+            "    regs = cpu.r",
+            "    mmu = cpu.mmu",
+            "    read = mmu.cpu_read",
+            "    write = mmu.cpu_write",
+            "    " + "; ".join(f"{v} = regs.{v}" for v in registers),
+            "    e = l = 0",
+            body,
+            "    " + "; ".join(f"regs.{v} = {v}" for v in registers),
+            "    regs.pc = pc",
+            "    cpu.op = last_op",
+            "    cpu.cc_extra = e - l",
+            f"    cpu.cc = {last_cycles:d} + e - l",
+            f"    return {emitter.length:d}, {emitter.cycles:d} + e",
+            "",
+        ))
+
+    def _register(self, start: int, end: int) -> None:
+        self._spans[start] = (start, end)
+        for page in range(start >> 8, min((end - 1) >> 8, 0xFF) + 1):
+            self._code[page] = 1
+            self._pages.setdefault(page, set()).add(start)
+
+    def invalidate(self, addr: int, end: int | None = None) -> None:
+        """
+        Drop all blocks containing code between `addr` and `end`
+
+        :param int addr: First modified address
+        :param end: Address following the last modified address.
+                    (Default: addr + 1)
+        :type end: int | None
+        """
+        if end is None:
+            end = addr + 1
+
+        for page in range(addr >> 8, ((end - 1) >> 8) + 1):
+            for start in list(self._pages.get(page, ())):
+                block_start, block_end = self._spans[start]
+                if block_start < end and addr < block_end:
+                    self._drop(start)
+
+    def _drop(self, start: int) -> None:
+        super()._drop(start)
+        block_start, block_end = self._spans.pop(start)
+        last_page = min((block_end - 1) >> 8, 0xFF)
+        for page in range(block_start >> 8, last_page + 1):
+            starts = self._pages[page]
+            starts.discard(start)
+            if not starts:
+                del self._pages[page]
+                self._code[page] = 0
+
+    def flush(self) -> None:
+        """Drop all translated blocks"""
+        super().flush()
+        self._spans.clear()
+        self._pages.clear()
+        self._code[:] = bytes(0x100)
+
+
+class CompiledLoop:
+    """
+    An inner loop, from the target of a backward branch up to and including
+    that branch, compiled into one Python function iterating internally.
+    """
+
+    start: int
+    """Address of the first instruction, the branch target"""
+
+    end: int
+    """Address following the branch"""
+
+    length: int
+    """Number of instructions in one iteration"""
+
+    max_cycles: int
+    """Number of cycles one iteration takes, with every penalty applied"""
+
+    source: str
+    """Generated Python source"""
+
+    fn: Callable[["CPU", float], tuple[int, int]]
+    """
+    Compiled loop, runs at most the given number of iterations and returns
+    the number of instructions and cycles executed
+    """
+
+    code: bytes
+    """The compiled instruction bytes"""
+
+    checks: tuple[tuple[int, int], ...]
+    """
+    Page and its :py:attr:`py65emu.mmu.Memory.generations` value for each
+    page the loop covers, at the time the code was read
+    """
+
+    def __init__(
+        self,
+        start: int,
+        end: int,
+        length: int,
+        max_cycles: int,
+        source: str,
+        fn: Callable[["CPU", float], tuple[int, int]],
+        code: bytes = b"",
+        checks: tuple[tuple[int, int], ...] = (),
+    ):
+        self.start = start
+        self.end = end
+        self.length = length
+        self.max_cycles = max_cycles
+        self.source = source
+        self.fn = fn
+        self.code = code
+        self.checks = checks
+
+    def __repr__(self) -> str:
+        return (
+            f"<CompiledLoop ${self.start:0>4x}-${self.end:0>4x} "
+            f"{self.length:d} instr.>"
+        )
+
+
+Body = list[tuple[Operation, int, int, int]]
+"""Operation, address and operand bytes of each instruction of a loop"""
+
+
+class _LoopEmitter(_Emitter):
+    """
+    Generates the Python statements for the body of a loop.
+
+    Instruction `k` saves the extra cycles accumulated so far in `e{k}` if
+    it can add to them or access a computed address, so any instruction
+    can be left before it is executed: registers are written back,
+    :py:attr:`py65emu.cpu.CPU.op` is set to the preceding instruction and
+    the loop function returns. Iterations are counted in `done`.
+    """
+
+    def __init__(self, cpu: "CPU", body: Body):
+        """
+        :param CPU cpu: The CPU to translate code for
+        :param Body body: The instructions of the loop
+        """
+        super().__init__(cpu, watch=False)
+        self.body = body
+        self.start = body[0][1]
+        self.end = body[-1][1] + size(body[-1][0])
+        self.index = 0
+        self.saved = {
+            k for k, (op, *_) in enumerate(body)
+            if op.mode in ("ax", "ay", "ix", "iy", "rel")
+        }
+        self.prefix = [0]
+        for op, *_ in body:
+            self.prefix.append(self.prefix[-1] + op.cycles)
+        self.code_pages = set(
+            range(self.start >> 8, ((self.end - 1) >> 8) + 1)
+        )
+
+    def address(self, op: Operation, lo: int, hi: int) -> str:
+        ea = super().address(op, lo, hi)
+        if op.mode in ("ax", "ay", "ix", "iy"):
+            # Leave the loop before touching an I/O page
+            self.emit(
+                f"if io[{ea} >> 8]:",
+                *("    " + line for line in self.leave(self.index, True)),
+            )
+        return ea
+
+    def guard(self, op: Operation, mark: int, following: int) -> None:
+        # Static stores to the loop itself are never compiled
+        if op.mode in ("zx", "zy"):
+            pages = {0}
+        elif op.name in STACK_OPERATIONS:
+            pages = {self.cpu.stack_page & 0xFF}
+        else:
+            pages = self.code_pages
+        if pages & self.code_pages:
+            # Self-modifying code, leave before running any of it
+            self.emit(
+                f"if 0x{self.start:0>4x} <= {self.target}"
+                f" < 0x{self.end:0>4x}:",
+                *("    " + line for line in self.leave(self.index + 1, False)),
+            )
+
+    def leave(self, k: int, restore: bool, pc: str | None = None) -> list[str]:
+        """
+        Statements leaving the loop before its `k`-th instruction
+
+        :param int k: Index of the next instruction to execute
+        :param bool restore: Drop the extra cycles the `k`-th instruction
+                             has added
+        :param pc: Expression for the next address. (Default: None, the
+                   address of the `k`-th instruction)
+        :type pc: str | None
+        :rtype: list[str]
+        :return: Python statements
+        """
+        lines = []
+        if restore:
+            lines.append(f"e = e{k:d}")
+        if k == 0:
+            lines += ["if not done:", "    return 0, 0"]
+
+        previous = (k - 1) % len(self.body)
+        extra = f"e - e{previous:d}" if previous in self.saved else "0"
+        registers = ("a", "x", "y", "s", "p")
+        lines += [
+            "; ".join(f"regs.{v} = {v}" for v in registers),
+            f"regs.pc = {pc or f'0x{self.body[k][1]:0>4x}'}",
+            f"cpu.op = ops[{previous:d}]",
+            f"cpu.cc_extra = {extra}",
+            f"cpu.cc = {self.body[previous][0].cycles:d} + {extra}",
+            f"return done * {len(self.body):d} + {k:d}, "
+            f"done * {self.prefix[-1]:d} + {self.prefix[k]:d} + e",
+        ]
+        return lines
+
+    def source(self) -> str:
+        """
+        :rtype: str
+        :return: Source of the function `loop(cpu, iterations)`
+        """
+        for k, (op, pc, lo, hi) in enumerate(self.body):
+            self.index = k
+            if k in self.saved:
+                self.emit(f"e{k:d} = e")
+            self.instruction(op, pc, lo, hi)
+
+        body = "\n".join("        " + line for line in self.lines)
+        leave = "\n".join(
+            "    " + line for line in self.leave(0, False, "pc")
+        )
+        registers = ("a", "x", "y", "s", "p")
+        return "\n".join((
+            "def loop(cpu, iterations):",
+            "    regs = cpu.r",
+            "    mmu = cpu.mmu",
+            "    read = mmu.cpu_read",
+            "    write = mmu.cpu_write",
+            "    " + "; ".join(f"{v} = regs.{v}" for v in registers),
+            "    e = done = 0",
+            "    while done < iterations:",
+            body,
+            "        done += 1",
+            f"        if pc != 0x{self.start:0>4x}"
+            " or cpu.trigger_nmi or cpu.trigger_irq:",
+            "            break",
+            leave,
+            "",
+        ))
+
+
+class LoopCache(_CodeCache[CompiledLoop]):
+    """
+    Compiles hot inner loops into Python functions iterating internally.
+
+    :py:meth:`py65emu.cpu.CPU.run` looks up the target of every backward
+    jump. Once a target has been seen :py:attr:`.threshold` times, the code
+    from there up to the next instruction is compiled if it is a loop: a
+    straight-line sequence of translatable instructions (see
+    :py:data:`TRANSLATABLE`) ending with a branch back to the target.
+    Memory clears, copies and checksums typically look like this.
+
+    The compiled function keeps the registers in locals across iterations
+    and leaves the loop when the branch isn't taken, after an iteration
+    during which an interrupt was triggered, right after a store to its own
+    code, when it has run the number of iterations it was given, or right
+    before an access to one of the :py:attr:`.io` pages. Cycles are
+    computed like in :py:class:`BlockCache`.
+
+    Loops are only compiled for memories keeping
+    :py:attr:`py65emu.mmu.Memory.generations`, which are used to check a
+    loop against changes to its code before it is reused.
+    """
+
+    max_length: int = 64
+    """Maximum number of instructions in a loop"""
+
+    io: bytearray
+    """
+    Non-zero for each page with side effects on access, like memory mapped
+    I/O. Loops don't access those, see :py:meth:`.add_io`. Starts with the
+    pages of :py:attr:`py65emu.mmu.Memory.io`.
+    """
+
+    def __init__(self, cpu: "CPU", threshold: int = 8):
+        """
+        :param CPU cpu: The CPU to compile code for
+        :param int threshold: Number of backward jumps to an address before
+                              the code there is compiled. (Default: 8)
+        """
+        super().__init__(cpu, threshold)
+        self.loops: dict[int, CompiledLoop | None] = self._entries
+        self.io = bytearray(getattr(cpu.mmu, "io", bytes(0x100)))
+
+    def _build(self, pc: int) -> CompiledLoop | None:
+        if self.generations is None:
+            # Changes to the code couldn't be noticed
+            return None
+        return self.compile(pc)
+
+    def _body(self, pc: int) -> Body | None:
+        """
+        Decode the loop starting at `pc`
+
+        :param int pc: Start address
+        :rtype: Body | None
+        :return: The instructions up to and including the branch back to
+                 `pc`, or None if the code there isn't a compilable loop
+        """
+        cpu = self.cpu
+        read = cpu.mmu.cpu_read
+        io = self.io
+        stack_page = cpu.stack_page & 0xFF
+
+        body: Body = []
+        addr = pc
+        while len(body) < self.max_length:
+            try:
+                if io[addr >> 8] or io[((addr + 2) >> 8) & 0xFF]:
+                    return None
+                op = cpu.opcodes[read(addr)]
+                width = size(op)
+                if op.name not in TRANSLATABLE or addr + width > 0x10000:
+                    return None
+                lo = read(addr + 1) if width > 1 else 0
+                hi = read(addr + 2) if width > 2 else 0
+            except IndexError:
+                return None
+
+            # Pages accessed at fixed addresses
+            match op.mode:
+                case "z" | "zx" | "zy" | "ix" | "iy":
+                    page = 0
+                case "a" if op.name != "JMP":
+                    page = hi
+                case _:
+                    page = stack_page if op.name in STACK_OPERATIONS else -1
+            if page >= 0 and io[page]:
+                return None
+
+            body.append((op, addr, lo, hi))
+            addr += width
+            if op.name in BRANCHES:
+                offset = (lo & 0x7F) - (lo & 0x80)
+                if (addr + offset) & 0xFFFF != pc:
+                    return None
+                break
+            if op.name in TERMINATORS:
+                return None
+        else:
+            return None
+
+        for op, _, lo, hi in body:
+            if (
+                op.mode in ("z", "a")
+                and op.name not in READS
+                and pc <= (hi << 8) + lo < addr
+            ):
+                # Writes to its own code
+                return None
+        return body
+
+    def compile(self, pc: int) -> CompiledLoop | None:
+        """
+        Compile the loop starting at `pc`. Does not use, or update, the
+        cache.
+
+        :param int pc: Start address
+        :rtype: CompiledLoop | None
+        :return: The loop or None if the code there isn't a compilable
+                 loop
+        """
+        body = self._body(pc)
+        if body is None:
+            return None
+
+        emitter = _LoopEmitter(self.cpu, body)
+        source = emitter.source()
+        namespace: dict[str, object] = {
+            "NZ": NZ,
+            "binary": arithmetic.binary(),
+            "decimal": arithmetic.decimal,
+            "io": self.io,
+            "ops": tuple(op for op, *_ in body),
+        }
+        exec(compile(source, f"<loop ${pc:0>4x}>", "exec"), namespace)
+
+        code = bytearray()
+        for op, _, lo, hi in body:
+            code.extend((op.opcode, lo, hi)[:size(op)])
+
+        return CompiledLoop(
+            start=pc,
+            end=emitter.end,
+            length=len(body),
+            max_cycles=emitter.prefix[-1] + emitter.max_extra,
+            source=source,
+            fn=namespace["loop"],  # type: ignore[arg-type]
+            code=bytes(code),
+            checks=self._checks(pc, emitter.end),
+        )
+
+    def add_io(self, start: int, length: int) -> None:
+        """
+        Mark the pages from `start` to `start + length` as I/O, loops stop
+        before accessing them. Drops all compiled loops.
+
+        :param int start: First address
+        :param int length: Number of addresses
+        """
+        for page in range(start >> 8, ((start + length - 1) >> 8) + 1):
+            self.io[page & 0xFF] = 1
+        self.flush()
+
+    def flush(self) -> None:
+        """Drop all compiled loops"""
+        super().flush()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_arithmetic
+----------------------------------
+
+Tests for the `ADC` and `SBC` tables in `py65emu.arithmetic`.
+"""
+
+
+import unittest
+
+from py65emu import arithmetic
+from py65emu.cpu import CPU
+from py65emu.mmu import MMU
+
+
+def from_bcd(v: int) -> int:
+    return (((v & 0xF0) // 0x10) * 10) + (v & 0xF)
+
+
+def to_bcd(v: int) -> int:
+    return (v // 10) * 16 + (v % 10)
+
+
+class TestArithmetic(unittest.TestCase):
+    def test_binary(self):
+        tables = arithmetic.binary()
+        for carry in (0, 1):
+            for a in range(0x100):
+                for v in range(0x100):
+                    i = arithmetic.index(a, v, carry)
+
+                    r = a + v + carry
+                    n = 0x80 if r & 0x80 else 0
+                    o = 0x40 if ~(a ^ v) & (a ^ r) & 0x80 else 0
+                    z = 0x02 if r & 0xFF == 0 else 0
+                    c = 0x01 if r > 0xFF else 0
+                    expected = (r & 0xFF) | (n | o | z | c) << 8
+                    if tables.adc[i] != expected:
+                        self.fail(f"ADC {a:02x} + {v:02x} + {carry}")
+
+                    r = a - v - (1 - carry)
+                    n = 0x80 if r & 0x80 else 0
+                    o = 0x40 if (a ^ v) & (a ^ r) & 0x80 else 0
+                    z = 0x02 if r & 0xFF == 0 else 0
+                    c = 0x01 if r >= 0 else 0
+                    expected = (r & 0xFF) | (n | o | z | c) << 8
+                    if tables.sbc[i] != expected:
+                        self.fail(f"SBC {a:02x} - {v:02x} - {1 - carry}")
+
+    def test_decimal(self):
+        """Every valid BCD operand, the result and carry are exact"""
+        tables = arithmetic.decimal()
+        for carry in (0, 1):
+            for a in range(100):
+                for v in range(100):
+                    i = arithmetic.index(to_bcd(a), to_bcd(v), carry)
+
+                    r = a + v + carry
+                    entry = tables.adc[i]
+                    if (entry & 0xFF, entry >> 8 & 0x01) != (
+                        to_bcd(r % 100), int(r > 99)
+                    ):
+                        self.fail(f"ADC {a:d} + {v:d} + {carry}")
+
+                    r = a - v - (1 - carry)
+                    entry = tables.sbc[i]
+                    if (entry & 0xFF, entry >> 8 & 0x01) != (
+                        to_bcd(r % 100), int(r >= 0)
+                    ):
+                        self.fail(f"SBC {a:d} - {v:d} - {1 - carry}")
+
+    def test_decimal_flags(self):
+        """NMOS flags, from http://www.6502.org/tutorials/decimal_mode.html"""
+        tables = arithmetic.decimal()
+
+        # 99 + 01, Z is the one of the binary addition
+        entry = tables.adc[arithmetic.index(0x99, 0x01, 0)]
+        self.assertEqual(entry & 0xFF, 0x00)
+        self.assertEqual(entry >> 8, 0x81)
+
+        # 79 + 00 + 1, V is set like for the binary $7A
+        entry = tables.adc[arithmetic.index(0x79, 0x00, 1)]
+        self.assertEqual(entry & 0xFF, 0x80)
+        self.assertEqual(entry >> 8, 0xC0)
+
+        # Invalid BCD, 1C + 00 + 1 and 0F + 00 + 0
+        self.assertEqual(
+            tables.adc[arithmetic.index(0x1C, 0x00, 1)] & 0xFF, 0x23
+        )
+        self.assertEqual(
+            tables.adc[arithmetic.index(0x0F, 0x00, 0)] & 0xFF, 0x15
+        )
+
+        # SBC flags are the ones of the binary subtraction
+        for i in range(len(tables.sbc)):
+            if tables.sbc[i] >> 8 != arithmetic.binary().sbc[i] >> 8:
+                self.fail(f"SBC flags {i:05x}")
+
+    def test_built_once(self):
+        self.assertIs(arithmetic.binary(), arithmetic.binary())
+        self.assertIs(arithmetic.decimal(), arithmetic.decimal())
+        self.assertEqual(len(arithmetic.binary().adc), 0x20000)
+
+    def test_disable_bcd(self):
+        # SED, CLC, LDA #$09, ADC #$01
+        program = [0xF8, 0x18, 0xA9, 0x09, 0x69, 0x01]
+        for disable_bcd, expected in ((False, 0x10), (True, 0x0A)):
+            with self.subTest(disable_bcd=disable_bcd):
+                c = CPU(
+                    MMU([(0x0, 0x100, False, program)]),
+                    0x0,
+                    disable_bcd=disable_bcd,
+                )
+                for _ in range(4):
+                    c.step()
+                self.assertEqual(c.r.a, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
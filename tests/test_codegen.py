@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_codegen
+----------------------------------
+
+Tests for `py65emu.codegen` module.
+"""
+
+import os
+import random
+import tempfile
+import unittest
+import unittest.mock
+
+from py65emu import codegen
+from py65emu.cpu import CPU
+from py65emu.mmu import MMU, Memory
+from py65emu.operation import OpCodes
+
+
+class Ram(Memory):
+    """64KiB of plain RAM, cheap to compare"""
+
+    def __init__(self, data: bytes | bytearray = bytes(0x10000)):
+        self.data = bytearray(data)
+
+    def reset(self) -> None:
+        pass
+
+    def cpu_write(self, addr: int, value: int) -> None:
+        self.data[addr] = value & 0xFF
+
+    def cpu_read(self, addr: int) -> int:
+        return self.data[addr]
+
+
+class TestCodegen(unittest.TestCase):
+    CODE = 0x80FE
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.instructions = OpCodes.instructions(None)  # type: ignore
+
+    def _state(self, c):
+        return (
+            c.r.a, c.r.x, c.r.y, c.r.s, c.r.p, c.r.pc,
+            c.cc, c.cc_extra, c.cc_total, c._interrupt, c.running,
+            c.mmu.data,
+        )
+
+    def _differential(self, handlers, seed, **kwargs):
+        """
+        Execute each opcode with the generic and the generated handlers,
+        from random registers and memory, and yield the opcode and both
+        CPUs
+        """
+        rng = random.Random(seed)
+        memories = [Ram(), Ram()]
+        cpus = [
+            CPU(memories[0], self.CODE),
+            CPU(memories[1], self.CODE, **kwargs),
+        ]
+        cpus[1].opcodes = cpus[1].opcodes.bind(handlers)
+
+        for opcode in self.instructions:
+            for _ in range(12):
+                data = bytearray(rng.randbytes(0x10000))
+                data[self.CODE] = opcode
+                registers = (*rng.randbytes(4), rng.randrange(0x100) | 0x20)
+                irq = rng.random() < 0.25
+
+                for c, memory in zip(cpus, memories):
+                    memory.data[:] = data
+                    c.r.a, c.r.x, c.r.y, c.r.s, c.r.p = registers
+                    c.r.pc = self.CODE
+                    c.cc_total = 0
+                    c.trigger_irq = irq
+                    c._interrupt = False
+                    c.running = True
+                    c.step()
+
+                yield opcode, cpus
+
+    def test_matches_interpreter(self):
+        handlers = codegen.load(self.instructions, self.directory)
+        for opcode, (exact, generated) in self._differential(handlers, 6502):
+            with self.subTest(opcode=f"{opcode:0>2x}"):
+                self.assertEqual(self._state(exact), self._state(generated))
+
+    def test_fast_profile(self):
+        handlers = codegen.load(self.instructions, self.directory, "fast")
+        for opcode, (exact, fast) in self._differential(
+            handlers, 6510, table_cycles=True
+        ):
+            # Everything but the interrupt bookkeeping
+            with self.subTest(opcode=f"{opcode:0>2x}"):
+                self.assertEqual(
+                    self._state(exact)[:9] + self._state(exact)[10:],
+                    self._state(fast)[:9] + self._state(fast)[10:],
+                )
+
+        source = codegen.generate(self.instructions, "fast")
+        asl = source[source.index("def op_0e("):]
+        asl = asl[:asl.index("\n\n")]
+        self.assertEqual(asl.count("write("), 1)
+        self.assertNotIn("increment_cycle_count", source)
+
+        with self.assertRaises(ValueError):
+            codegen.generate(self.instructions, "turbo")
+
+    def test_folded(self):
+        source = codegen.generate(self.instructions)
+        bpl = source[source.index("def op_10("):]
+        bpl = bpl[:bpl.index("\n\n")]
+
+        self.assertIn("if not r._nz & 0x180:", bpl)
+        self.assertNotIn("getFlag", bpl)
+        self.assertNotIn("cpu.B(", source)
+        self.assertNotIn("cpu.P(", source)
+        self.assertNotIn("cpu.T(", source)
+
+    def test_cache(self):
+        handlers = codegen.load(self.instructions, self.directory)
+        self.assertIs(
+            codegen.load(self.instructions, self.directory), handlers
+        )
+
+        path = os.path.join(
+            self.directory,
+            f"opcodes_exact_{codegen.key(self.instructions)}.py"
+        )
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(len(handlers), 0x100)
+
+        # A fresh process imports the cached module
+        codegen._loaded.clear()
+        codegen._memo.clear()
+        with unittest.mock.patch.object(
+            codegen, "generate", side_effect=AssertionError
+        ):
+            reloaded = codegen.load(self.instructions, self.directory)
+        self.assertEqual(
+            [h and h.__name__ for h in reloaded],
+            [h and h.__name__ for h in handlers],
+        )
+
+    def test_memo(self):
+        handlers = codegen.load(self.instructions, self.directory)
+        with unittest.mock.patch.object(
+            codegen, "key", side_effect=AssertionError
+        ):
+            self.assertIs(
+                codegen.load(self.instructions, self.directory), handlers
+            )
+            self.assertIs(
+                OpCodes.shared(CPU, handlers), OpCodes.shared(CPU, handlers)
+            )
+
+        # Mutable instruction sets are hashed on every call
+        instructions = dict(self.instructions)
+        codegen.load(instructions, self.directory)
+        with unittest.mock.patch.object(
+            codegen, "key", side_effect=AssertionError
+        ):
+            with self.assertRaises(AssertionError):
+                codegen.load(instructions, self.directory)
+
+    def test_undefined(self):
+        instructions = dict(self.instructions)
+        del instructions[0x02]
+        handlers = codegen.load(instructions, self.directory)
+        self.assertIsNone(handlers[0x02])
+        self.assertEqual(getattr(handlers[0x01], "__name__"), "op_01")
+
+    def test_key(self):
+        changed = dict(self.instructions)
+        changed[0xEA] = ("NOP", "imp", 3, "v", 1)
+        self.assertNotEqual(
+            codegen.key(changed), codegen.key(self.instructions)
+        )
+
+        # Changes to the generator itself
+        self.assertEqual(len(codegen.generator_digest()), 64)
+        with unittest.mock.patch.object(
+            codegen, "generator_digest", return_value="0" * 64
+        ):
+            edited = codegen.key(self.instructions)
+        self.assertNotEqual(edited, codegen.key(self.instructions))
+
+        with unittest.mock.patch.dict(
+            os.environ, {"PY65EMU_CACHE_DIR": self.directory}
+        ):
+            self.assertEqual(
+                codegen.cache_dir(),
+                os.path.join(self.directory, f"codegen-{codegen.VERSION:d}")
+            )
+
+    def test_unwritable(self):
+        path = os.path.join(self.directory, "file")
+        with open(path, "w"):
+            pass
+
+        handlers = codegen.load(self.instructions, path)
+        self.assertEqual(getattr(handlers[0xEA], "__name__"), "op_ea")
+        self.assertFalse(os.path.isdir(path))
+
+    def test_specialize(self):
+        with unittest.mock.patch.dict(
+            os.environ, {"PY65EMU_CACHE_DIR": self.directory}
+        ):
+            c = CPU(
+                MMU([(0x0000, 0x400, False, [0xA9, 0x80])]),
+                0x0000,
+                specialize=True
+            )
+        handler = c.opcodes[0xA9].handler
+        self.assertEqual(getattr(handler, "__name__"), "op_a9")
+
+        c.step()
+        self.assertEqual((c.r.a, c.r.p, c.cc), (0x80, 0xA4, 2))
+
+    def test_profile(self):
+        with unittest.mock.patch.dict(
+            os.environ, {"PY65EMU_CACHE_DIR": self.directory}
+        ):
+            c = CPU(
+                MMU([(0x0000, 0x400, False, [0x0E, 0x00, 0x02])]),
+                0x0000,
+                profile="fast"
+            )
+            with self.assertRaises(ValueError):
+                CPU(MMU([]), 0, profile="turbo")
+
+        self.assertTrue(c.table_cycles)
+        handler = c.opcodes[0x0E].handler
+        self.assertEqual(getattr(handler, "__name__"), "op_0e")
+        self.assertTrue(handler.__module__.startswith("opcodes_fast_"))
+
+        c.mmu.cpu_write(0x200, 0x81)
+        c.step()
+        self.assertEqual(c.mmu.cpu_read(0x200), 0x02)
+        self.assertEqual((c.r.p, c.cc), (0x25, 6))
+
+
+if __name__ == "__main__":
+    unittest.main()
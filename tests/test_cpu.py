@@ -8,10 +8,13 @@ test_cpu
 Tests for `py65emu` module.
 """
 
+import io
 import os
+import random
 import unittest
+import unittest.mock
 
-from py65emu.cpu import CPU, FlagBit
+from py65emu.cpu import CPU, FlagBit, RunResult, StopReason
 from py65emu.mmu import MMU
 
 
@@ -804,6 +807,226 @@ class TestCPU(unittest.TestCase):
         c.step()
         self.assertEqual(c.r.a, 0x77)
 
+    def test_run_max_instructions(self):
+        c = self._cpu(romInit=[0xA9, 0x55, 0x69, 0x22, 0xEA])
+        result = c.run(max_instructions=2)
+        self.assertIsInstance(result, RunResult)
+        self.assertEqual(result.instructions, 2)
+        self.assertEqual(result.cycles, 4)
+        self.assertEqual(result.reason, StopReason.INSTRUCTIONS)
+        self.assertEqual(c.r.a, 0x77)
+        self.assertEqual(c.r.pc, 0x1004)
+        self.assertEqual(c.cc_total, 7 + 4)
+
+    def test_run_max_cycles(self):
+        # LDA #$01, LDA $0100, LDA #$02
+        c = self._cpu(romInit=[0xA9, 0x01, 0xAD, 0x00, 0x01, 0xA9, 0x02])
+        result = c.run(max_cycles=5)
+        self.assertEqual(result, RunResult(6, 2, StopReason.CYCLES))
+        self.assertEqual(c.r.pc, 0x1005)
+
+    def test_run_stop_pc(self):
+        c = self._cpu(romInit=[0xE8, 0xE8, 0xE8, 0xE8])
+        result = c.run(stop_pc=0x1003)
+        self.assertEqual(result, RunResult(6, 3, StopReason.PC))
+        self.assertEqual(c.r.x, 3)
+
+        result = c.run(stop_pc=0x1003)
+        self.assertEqual(result, RunResult(0, 0, StopReason.PC))
+
+    def test_run_halted(self):
+        c = self._cpu(romInit=[0xE8, 0x02, 0xE8])
+        result = c.run(max_instructions=10)
+        self.assertEqual(result.instructions, 2)
+        self.assertEqual(result.reason, StopReason.HALTED)
+        self.assertFalse(c.running)
+        self.assertEqual(c.r.x, 1)
+
+        result = c.run(max_instructions=10)
+        self.assertEqual(result, RunResult(0, 0, StopReason.HALTED))
+
+    def test_run_matches_step(self):
+        program = [
+            0xA0, 0x80, 0xB9, 0x00, 0x00, 0xB9, 0x80, 0x00,
+            0x18, 0xB0, 0xFF, 0x90, 0x01, 0x90, 0x8F,
+        ]
+        stepped = self._cpu(romInit=program)
+        for _ in range(7):
+            stepped.step()
+
+        c = self._cpu(romInit=program)
+        result = c.run(max_instructions=7)
+        self.assertEqual(result.cycles, stepped.cc_total - 7)
+        self.assertEqual(c.cc_total, stepped.cc_total)
+        self.assertEqual(c.cc, stepped.cc)
+        self.assertEqual(repr(c.r), repr(stepped.r))
+
+    def test_run_debug(self):
+        c = self._cpu(romInit=[0xE8, 0xE8])
+        c.debug = True
+        with unittest.mock.patch("sys.stdout", new_callable=io.StringIO):
+            result = c.run(max_instructions=2)
+        self.assertEqual(result, RunResult(4, 2, StopReason.INSTRUCTIONS))
+        self.assertEqual(c.r.x, 2)
+
+    def test_run_idle_poll(self):
+        # wait: LDA $0002; BPL wait
+        program = [0xAD, 0x02, 0x00, 0x10, 0xFB]
+        results = []
+        for skip_idle in (False, True):
+            c = self._cpu(romInit=program)
+            c.skip_idle = skip_idle
+            for budget in ({"max_cycles": 10000}, {"max_instructions": 999}):
+                results.append((
+                    c.run(**budget), c.cc_total, c.cc, c.r.pc, c.op.opcode
+                ))
+
+        self.assertEqual(results[:2], results[2:])
+        self.assertEqual(
+            results[2][0], RunResult(10000, 2857, StopReason.CYCLES)
+        )
+
+    def test_run_idle_jump(self):
+        # JMP *
+        c = self._cpu(romInit=[0x4C, 0x00, 0x10])
+        self.assertEqual(c.run(), RunResult(9, 3, StopReason.IDLE))
+        self.assertEqual(c.r.pc, 0x1000)
+
+        self.assertEqual(
+            c.run(max_instructions=1000000),
+            RunResult(3000000, 1000000, StopReason.INSTRUCTIONS)
+        )
+        self.assertEqual(c.cc_total, 7 + 9 + 3000000)
+
+        c.skip_idle = False
+        self.assertEqual(
+            c.run(max_cycles=30),
+            RunResult(30, 10, StopReason.CYCLES)
+        )
+
+    def test_run_idle_write(self):
+        # loop: INC $10; BNE loop; NOP; JMP *
+        c = self._cpu(romInit=[0xE6, 0x10, 0xD0, 0xFC, 0xEA, 0x4C, 0x05, 0x10])
+        c.mmu.cpu_write(0x10, 0x01)
+        result = c.run()
+        self.assertEqual(result.reason, StopReason.IDLE)
+        self.assertEqual(result.instructions, 255 * 2 + 1 + 3)
+        self.assertEqual(c.mmu.cpu_read(0x10), 0)
+
+    def test_run_idle_io(self):
+        # wait: LDA $2002; BPL wait; KIL
+        reads = []
+
+        def status(addr: int) -> int:
+            reads.append(addr)
+            return 0x80 if len(reads) > 100 else 0x00
+
+        c = self._cpu(romInit=[0xAD, 0x02, 0x20, 0x10, 0xFB, 0x02])
+        assert isinstance(c.mmu, MMU)
+        c.mmu.addHandler(0x2000, 0x8, status)
+        self.assertTrue(c.skip_idle)
+
+        result = c.run()
+        self.assertEqual(result.reason, StopReason.HALTED)
+        self.assertEqual(reads, [0x2002] * 101)
+
+    def test_run_io_code(self):
+        # loop: INX; NOP; BNE loop; KIL
+        program = [0xE8, 0xEA, 0xD0, 0xFC, 0x02]
+        reads = []
+
+        def code(addr: int) -> int:
+            reads.append(addr)
+            return program[addr - 0x2000]
+
+        for cached in (False, True):
+            with self.subTest(cached=cached):
+                mmu = MMU([(0, 0x200)])
+                mmu.addHandler(0x2000, 0x5, code)
+                c = CPU(
+                    mmu,
+                    0x2000,
+                    translate=cached,
+                    fuse=cached,
+                    compile_loops=True,
+                )
+                assert c.loops is not None
+                c.loops.threshold = 1
+                reads.clear()
+
+                result = c.run()
+                self.assertEqual(result.reason, StopReason.HALTED)
+                self.assertEqual(result.instructions, 256 * 3 + 1)
+                self.assertEqual(len(reads), 256 * 4 + 1)
+                self.assertIsNone(c.loops.compile(0x2000))
+                if c.blocks is not None:
+                    self.assertIsNone(c.blocks.translate(0x2000))
+
+    def test_run_idle_interrupt(self):
+        c = self._cpu(romInit=[0x4C, 0x00, 0x10])
+        c.trigger_irq = True
+        c.r.setFlag(FlagBit.I)
+        self.assertEqual(
+            c.run(max_instructions=100),
+            RunResult(300, 100, StopReason.INSTRUCTIONS)
+        )
+
+    def test_run_until_pcs(self):
+        # INX; INX; INX; INX; JMP $1000
+        c = self._cpu(romInit=[0xE8, 0xE8, 0xE8, 0xE8, 0x4C, 0x00, 0x10])
+        self.assertEqual(
+            c.run_until(pcs={0x1002, 0x1004}),
+            RunResult(4, 2, StopReason.PC)
+        )
+        self.assertEqual(
+            c.run_until(pcs=[0x1000], max_instructions=10),
+            RunResult(7, 3, StopReason.PC)
+        )
+        self.assertEqual(c.r.x, 4)
+
+    def test_run_until_every(self):
+        # loop: INX; JMP loop
+        c = self._cpu(romInit=[0xE8, 0x4C, 0x00, 0x10])
+        calls = []
+
+        def predicate(cpu):
+            calls.append(cpu.r.x)
+            return cpu.r.x >= 10
+
+        result = c.run_until(predicate=predicate, every=4)
+        self.assertEqual(result, RunResult(50, 20, StopReason.PREDICATE))
+        self.assertEqual(calls, [2, 4, 6, 8, 10])
+
+        with self.assertRaises(ValueError):
+            c.run_until(predicate=predicate)
+
+    def test_run_until_watch(self):
+        # INC $10; INC $0110; INC $10; JMP *
+        c = self._cpu(romInit=[
+            0xE6, 0x10, 0xEE, 0x10, 0x01, 0xE6, 0x10, 0x4C, 0x07, 0x10
+        ])
+        calls = []
+
+        def predicate(cpu):
+            calls.append(cpu.r.pc)
+            return cpu.mmu.cpu_read(0x10) == 2
+
+        result = c.run_until(predicate=predicate, watch=[0x10, 0x20])
+        self.assertEqual(result, RunResult(16, 3, StopReason.PREDICATE))
+        self.assertEqual(calls, [0x1002, 0x1007])
+
+        # The predicate doesn't keep an idle loop from being skipped
+        calls.clear()
+        self.assertEqual(
+            c.run_until(
+                predicate=predicate,
+                watch=[0x10],
+                max_instructions=1000,
+            ),
+            RunResult(3000, 1000, StopReason.INSTRUCTIONS)
+        )
+        self.assertEqual(calls, [])
+
     def test_run_rom(self):
         path = os.path.join(
             os.path.dirname(os.path.realpath(__file__)),
@@ -846,6 +1069,38 @@ class TestCPU(unittest.TestCase):
                 c.step()
                 self.assertEqual(c.cc, expected_cycle, f"{c.op.opcode:0>2x}")
 
+    def test_table_cycles(self):
+        rng = random.Random(6502)
+        data = list(rng.randbytes(0x10000))
+        cpus = [
+            CPU(MMU([(0, 0x10000, False, data)]), 0x80FE),
+            CPU(MMU([(0, 0x10000, False, data)]), 0x80FE, table_cycles=True),
+        ]
+
+        for opcode in range(0x100):
+            for _ in range(12):
+                # Zero page, stack and the instruction
+                values = [*rng.randbytes(0x200), opcode, *rng.randbytes(2)]
+                addresses = [*range(0x200), 0x80FE, 0x80FF, 0x8100]
+                registers = (*rng.randbytes(4), rng.randrange(0x100) | 0x20)
+
+                for c in cpus:
+                    for addr, v in zip(addresses, values):
+                        c.mmu.cpu_write(addr, v)
+                    c.r.a, c.r.x, c.r.y, c.r.s, c.r.p = registers
+                    c.r.pc = 0x80FE
+                    c.running = True
+                    c.step()
+
+                with self.subTest(opcode=f"{opcode:0>2x}"):
+                    self.assertEqual(*[
+                        (
+                            c.r.a, c.r.x, c.r.y, c.r.s, c.r.p, c.r.pc,
+                            c.cc, c.cc_extra, c.cc_total,
+                        )
+                        for c in cpus
+                    ])
+
     def tearDown(self):
         pass
 
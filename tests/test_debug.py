@@ -117,7 +117,7 @@ class TestDisassembly(BaseDebug):
         opc = self.c.nextByte()
         op = self.c.opcodes[opc]
 
-        dasm = Disassembly(op, *op.get_operands())
+        dasm = Disassembly(self.c, op, *op.get_operands(self.c))
         return dasm
 
     def test_initialized_correct(self):
@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_fusion
+----------------------------------
+
+Tests for `py65emu.fusion` module.
+"""
+
+import itertools
+import unittest
+
+from py65emu.cpu import CPU, RunResult, StopReason
+from py65emu.fusion import FUSIONS
+from py65emu.mmu import MMU
+
+
+class TestFusion(unittest.TestCase):
+    CODE = 0x02F0
+
+    def _cpu(self, program, fuse):
+        memory = [0] * 0x400
+        memory[0x10:0x14] = [0xF0, 0x10, 0x00, 0x12]  # Pointers
+        memory[0x20] = 0x80
+        memory[self.CODE:self.CODE + len(program)] = program
+        mmu = MMU([(0x0000, 0x400, False, memory), (0x1000, 0x1400)])
+        for i in range(0x100):
+            mmu.cpu_write(0x10F0 + i, i)
+
+        c = CPU(mmu, self.CODE, fuse=fuse)
+        if fuse:
+            self.fused: list[tuple[int, int] | None] = []
+
+            def wrap(handler):
+                def fused(cpu, pc, opcode):
+                    result = handler(cpu, pc, opcode)
+                    self.fused.append(result)
+                    return result
+                return fused
+
+            c.fusions = {k: wrap(v) for k, v in FUSIONS.items()}
+        return c
+
+    def _state(self, c):
+        return (
+            c.r.a, c.r.x, c.r.y, c.r.s, c.r.p, c.r.pc,
+            c.cc, c.cc_extra, c.cc_total, c.op and c.op.opcode,
+            [c.mmu.cpu_read(i) for i in range(0x100)],
+            [c.mmu.cpu_read(i) for i in range(0x1200, 0x1300)],
+        )
+
+    def assertFused(self, program, instructions, fused=True):
+        """
+        Run `program` through its fused handler and through the
+        interpreter, with a few different register values
+        """
+        registers = (
+            (0x00, 0x00, 0x00),
+            (0x01, 0x7F, 0x80),
+            (0x7F, 0x80, 0xFF),
+            (0x80, 0xFF, 0x01),
+            (0xFF, 0x01, 0x7F),
+        )
+        flags = (0x20, 0xE3)
+        for (a, x, y), p in itertools.product(registers, flags):
+            with self.subTest(program=program, a=a, x=x, y=y, p=p):
+                cpus = [self._cpu(program, False), self._cpu(program, False)]
+                for c in cpus:
+                    c.r.a, c.r.x, c.r.y, c.r.p = a, x, y, p
+                interpreted, c = cpus
+
+                result = FUSIONS[program[0]](c, self.CODE, program[0])
+                if not fused:
+                    self.assertIsNone(result)
+                    self.assertEqual(
+                        self._state(interpreted), self._state(c)
+                    )
+                    continue
+
+                expected = interpreted.run(max_instructions=instructions)
+                self.assertEqual(
+                    result, (expected.instructions, expected.cycles)
+                )
+                c.cc_total += expected.cycles
+                self.assertEqual(self._state(interpreted), self._state(c))
+
+    def test_load_store(self):
+        self.assertFused([0xA9, 0x80, 0x85, 0x30], 2)  # LDA #; STA $LL
+        self.assertFused([0xA9, 0x00, 0x8D, 0x00, 0x11], 2)  # STA $LLHH
+        self.assertFused([0xA5, 0x20, 0x85, 0x30], 2)  # LDA $LL
+        self.assertFused([0xAD, 0x05, 0x11, 0x8D, 0x00, 0x12], 2)
+
+    def test_copy_indirect(self):
+        # LDA ($10),Y; STA ($12),Y
+        self.assertFused([0xB1, 0x10, 0x91, 0x12], 2)
+
+    def test_compare_branch(self):
+        for compare, branch, offset in itertools.product(
+            (0xC9, 0xE0, 0xC0),
+            (0x10, 0x30, 0x50, 0x70, 0x90, 0xB0, 0xD0, 0xF0),
+            (0x20, 0xF0),
+        ):
+            self.assertFused([compare, 0x7F, branch, offset], 2)
+
+    def test_step_branch(self):
+        for step, branch, offset in itertools.product(
+            (0xCA, 0x88, 0xE8, 0xC8),
+            (0x10, 0xD0, 0xF0),
+            (0x02, 0x20, 0xF0),
+        ):
+            self.assertFused([step, branch, offset], 2)
+
+    def test_step_compare_branch(self):
+        # INY; CPY #$80; BNE
+        self.assertFused([0xC8, 0xC0, 0x80, 0xD0, 0xF0], 3)
+        # DEX; CPX #$00; BEQ
+        self.assertFused([0xCA, 0xE0, 0x00, 0xF0, 0x20], 3)
+        # INY; CPX #$80; BNE, different registers
+        self.assertFused([0xC8, 0xE0, 0x80, 0xD0, 0xF0], 3, fused=False)
+        # INY; CPY #$80; NOP
+        self.assertFused([0xC8, 0xC0, 0x80, 0xEA], 3, fused=False)
+
+    def test_no_match(self):
+        self.assertFused([0xA9, 0x01, 0xEA], 2, fused=False)
+        self.assertFused([0xB1, 0x10, 0xEA], 2, fused=False)
+        self.assertFused([0xC9, 0x10, 0xEA], 2, fused=False)
+        self.assertFused([0xCA, 0xEA], 2, fused=False)
+
+    def test_unmapped(self):
+        # LDA #$01 at the end of mapped memory
+        c = CPU(MMU([(0x0000, 0x2, False, [0xA9, 0x01])]), 0x0000, fuse=True)
+        with self.assertRaises(IndexError):
+            c.run(max_instructions=2)
+        self.assertEqual(c.r.a, 0x01)
+
+    def test_limits(self):
+        # LDA #$01; STA $30; DEX; BNE; NOP
+        program = [0xA9, 0x01, 0x85, 0x30, 0xCA, 0xD0, 0x00, 0xEA]
+
+        c = self._cpu(program, True)
+        self.assertEqual(
+            c.run(max_instructions=1),
+            RunResult(2, 1, StopReason.INSTRUCTIONS)
+        )
+        self.assertEqual(self.fused, [])
+
+        c = self._cpu(program, True)
+        self.assertEqual(
+            c.run(stop_pc=self.CODE + 2),
+            RunResult(2, 1, StopReason.PC)
+        )
+        self.assertEqual(self.fused, [])
+
+        c = self._cpu(program, True)
+        self.assertEqual(
+            c.run(max_cycles=3),
+            RunResult(5, 2, StopReason.CYCLES)
+        )
+        self.assertEqual(self.fused, [])
+
+        c = self._cpu(program, True)
+        self.assertEqual(
+            c.run(max_instructions=5),
+            RunResult(12, 5, StopReason.INSTRUCTIONS)
+        )
+        self.assertEqual(self.fused, [(2, 5), (2, 5)])
+
+    def test_pending_interrupt(self):
+        c = self._cpu([0xA9, 0x01, 0x85, 0x30], True)
+        c.trigger_irq = True
+        c.run(max_instructions=2)
+        self.assertEqual(self.fused, [])
+
+    def test_disabled(self):
+        self.assertIsNone(self._cpu([], False).fusions)
+        self.assertIs(CPU(MMU([]), 0, fuse=True).fusions, FUSIONS)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -11,9 +11,8 @@ Klaus Dormann's tests used for `py65emu` module.
 
 import os
 import unittest
-import copy
 
-from py65emu.cpu import CPU, FlagBit
+from py65emu.cpu import CPU, FlagBit, StopReason
 from py65emu.mmu import MMU
 from py65emu.debug import Debug
 
@@ -70,47 +69,21 @@ class Decimal:
         if self.cpu is None:
             return None
 
+        zp = self.cpu.mmu.read_range(0x0000, 0x11)
+
         # operands - register Y = carry in
-        # 0x0000 1 byte
-        self.N1 = self.cpu.mmu.cpu_read(0x0000)
-        # 0x0001 1 byte
-        self.N2 = self.cpu.mmu.cpu_read(0x0001)
+        self.N1, self.N2 = zp[0x00], zp[0x01]
         # binary result
-        # 0x0002 1 byte
-        self.HA = self.cpu.mmu.cpu_read(0x0002)
-        # 0x0003 1 byte
-        self.HNVZC = self.cpu.mmu.cpu_read(0x0003)
+        self.HA, self.HNVZC = zp[0x02], zp[0x03]
         # decimal result
-        # 0x0004 1 byte
-        self.DA = self.cpu.mmu.cpu_read(0x0004)
-        # 0x0005 1 byte
-        self.DNVZC = self.cpu.mmu.cpu_read(0x0005)
+        self.DA, self.DNVZC = zp[0x04], zp[0x05]
         # predicted results
-        # 0x0006 1 byte
-        self.AR = self.cpu.mmu.cpu_read(0x0006)
-        # 0x0007 1 byte
-        self.NF = self.cpu.mmu.cpu_read(0x0007)
-
-        # 0x0008 1 byte
-        self.VF = self.cpu.mmu.cpu_read(0x0008)
-        # 0x0009 1 byte
-        self.ZF = self.cpu.mmu.cpu_read(0x0009)
-        # 0x000a 1 byte
-        self.CF = self.cpu.mmu.cpu_read(0x000a)
-        # 0x000b 1 byte
-        self.ERROR = self.cpu.mmu.cpu_read(0x000b)
+        self.AR, self.NF, self.VF, self.ZF, self.CF = zp[0x06:0x0b]
+        self.ERROR = zp[0x0b]
         # workspace
-        # 0x000c 1 byte
-        self.N1L = self.cpu.mmu.cpu_read(0x000c)
-        # 0x000d 1 byte
-        self.N1H = self.cpu.mmu.cpu_read(0x000d)
-        # 0x000e 1 byte
-        self.N2L = self.cpu.mmu.cpu_read(0x000e)
+        self.N1L, self.N1H, self.N2L = zp[0x0c:0x0f]
         # 0x000f 2 byte
-        self.N2H = (
-            self.cpu.mmu.cpu_read(0x000f) |
-            (self.cpu.mmu.cpu_read(0x0010) << 8)
-        )
+        self.N2H = zp[0x0f] | (zp[0x10] << 8)
 
     def __eq__(self, other):
         if not isinstance(other, Decimal):
@@ -163,7 +136,6 @@ class Decimal:
         return new
 
 
-@unittest.skip('Runs, but doesn\'t break')
 class KlausDormannDecimal(KlausDormann):
     def setUp(self):
         super().setUp()
@@ -174,49 +146,46 @@ class KlausDormannDecimal(KlausDormann):
         )
         self.c = self._cpu(path, 0x200)
 
+    def _cpu(self, path: str, pc: int = 0x400) -> CPU:
+        mmu = [
+            (0, pc, False),
+        ]
+        # Straight-line code is translated, the translated ADC and SBC use
+        # the same tables as the interpreter
+        self.c = CPU(MMU(mmu), pc, translate=True)
+
+        with open(path, "rb") as fp:
+            if isinstance(self.c.mmu, MMU):
+                self.c.mmu.addBlock(pc, 0x10000 - pc, False, fp)
+
+        return self.c
+
     def test(self):
         """
         Bruce Clark - Verify decimal mode behavior, modified by Klaus Dormann
         See https://github.com/Klaus2m5/6502_65C02_functional_tests
-        """
-
-        total_no_of_cycles = 0
-        self.c.running = True
-
-        comparison_value = Decimal(self.c)
-        comparison_value.update()
-        new_value = copy.copy(comparison_value)
 
-        while self.c.running:
-            self.c.step()
-
-            new_value.update()
-            if comparison_value != new_value:
-                # res = comparison_value ^ new_value
-                comparison_value = new_value
-
-            # total_no_of_cycles += self.c.cc
-            total_no_of_cycles += 1
-
-            if self.c.running is not True:
-                print("No. of cycles {}".format(total_no_of_cycles))
-                self.assertEqual(
-                    self.c.mmu.cpu_read(0x000b),
-                    0,
-                    "Test reported error"
-                )
-                break
-
-            if self.c.r.pc == 0x0257:
-                break
-
-            self.assertLess(
-                total_no_of_cycles,
-                0x2500000,
-                "Maximum number of loops exceeded"
-            )
-
-        print("No. of cycles {}".format(total_no_of_cycles))
+        Adds and subtracts every pair of valid BCD numbers, with and without
+        carry, and compares the accumulator and carry with the predicted
+        ones. Ends on a KIL at DONE ($025B).
+        """
+        result = self.c.run(max_cycles=0x1000000)
+        self.assertEqual(result.reason, StopReason.HALTED)
+
+        state = Decimal(self.c)
+        state.update()
+        self.assertEqual(
+            self.c.r.pc - 1,
+            0x025B,
+            "Stopped outside of DONE"
+        )
+        self.assertEqual(
+            state.ERROR,
+            0,
+            f"Test reported error: N1={state.N1:0>2x} N2={state.N2:0>2x} "
+            f"carry={self.c.r.y:d} DA={state.DA:0>2x} AR={state.AR:0>2x} "
+            f"DNVZC={state.DNVZC:0>2x} CF={state.CF:0>2x}"
+        )
 
 
 @unittest.skip('Takes a long time to run!')
@@ -6,10 +6,20 @@ test_mmu
 ----------------------------------
 """
 
+import io
+import mmap
 import os
 import unittest
 
-from py65emu.mmu import MMU, MemoryRangeError, ReadOnlyError
+from py65emu.cpu import CPU
+from py65emu.mmu import (
+    Bank,
+    FlatMemory,
+    MMU,
+    Memory,
+    MemoryRangeError,
+    ReadOnlyError
+)
 
 
 class TestMMU(unittest.TestCase):
@@ -60,6 +70,305 @@ class TestMMU(unittest.TestCase):
         with self.assertRaises(MemoryRangeError):
             m.addBlock(255, 128)
 
+    def test_addBlock_contained(self):
+        m = MMU([(0x100, 0x100)])
+        with self.assertRaises(MemoryRangeError):
+            m.addBlock(0x100, 0x100)
+        with self.assertRaises(MemoryRangeError):
+            m.addBlock(0x140, 0x10)
+        with self.assertRaises(MemoryRangeError):
+            m.addBlock(0x0, 0x1000)
+        m.addBlock(0x0, 0x100)
+        m.addBlock(0x200, 0x100)
+
+        m = MMU([(0x8000, 0xC000)])
+        with self.assertRaises(MemoryRangeError):
+            m.addBlock(0x10000, 0x10)
+
+    def test_page_table(self):
+        m = MMU([
+            (0x0000, 0x80),
+            (0x0080, 0x80),
+            (0x0100, 0x300),
+            (0x8000, 0x100, True),
+            (0x9000, 0x10),
+        ])
+        self.assertIsNone(m.pages[0x00])
+        self.assertIs(m.pages[0x01], m.blocks[2])
+        self.assertIs(m.pages[0x03], m.blocks[2])
+        self.assertIsNone(m.pages[0x04])
+        self.assertIs(m.pages[0x80], m.blocks[3])
+        self.assertIsNone(m.pages[0x90])
+
+        for addr, block in (
+            (0x007F, 0), (0x0080, 1), (0x0100, 2), (0x03FF, 2),
+            (0x8000, 3), (0x900F, 4),
+        ):
+            with self.subTest(addr=addr):
+                self.assertIs(m.getBlock(addr), m.blocks[block])
+                m.blocks[block][addr - m.blocks[block].start] = 0x42
+                self.assertEqual(m.cpu_read(addr), 0x42)
+
+        with self.assertRaises(IndexError):
+            m.getBlock(0x9010)
+        with self.assertRaises(IndexError):
+            m.cpu_read(0x0400)
+
+    def test_past_end(self):
+        # Like the ROM of the nestest configuration
+        m = MMU([(0x8000, 0xC000, True, [1] * 0x8001)])
+        self.assertEqual(m.cpu_read(0xFFFF), 1)
+        self.assertEqual(m.cpu_read(0x10000), 1)
+        self.assertEqual(m.cpu_read(0x10001), 0)
+
+    def test_handler(self):
+        written = []
+        m = MMU([(0x0000, 0x2000), (0x2010, 0x10)])
+        handler = m.addHandler(
+            0x2000,
+            0x8,
+            lambda addr: addr & 0x7,
+            lambda addr, value: written.append((addr, value)),
+        )
+        self.assertIn(handler, m.blocks)
+        self.assertIs(m.getBlock(0x2007), handler)
+        self.assertIs(m.getBlock(0x2010), m.blocks[1])
+
+        self.assertEqual(m.cpu_read(0x2003), 3)
+        m.cpu_write(0x2005, 0x1AB)
+        self.assertEqual(written, [(0x2005, 0xAB)])
+
+        # RAM pages are still looked up directly
+        self.assertIs(m.pages[0x1F], m.blocks[0])
+        self.assertIsNone(m.pages[0x20])
+        self.assertEqual(
+            [page for page in range(0x100) if m.io[page]], [0x20]
+        )
+
+        with self.assertRaises(MemoryRangeError):
+            m.addHandler(0x1FFF, 0x2, lambda addr: 0)
+        with self.assertRaises(MemoryRangeError):
+            m.addBlock(0x2004, 0x1)
+        with self.assertRaises(IndexError):
+            m.cpu_read(0x2008)
+
+        m.reset()
+        self.assertEqual(m.cpu_read(0x2006), 6)
+
+    def test_handler_readonly(self):
+        m = MMU()
+        m.addHandler(0x4000, 0x18, lambda addr: 0x1FF)
+        self.assertEqual(m.cpu_read(0x4000), 0xFF)
+        with self.assertRaises(ReadOnlyError):
+            m.cpu_write(0x4000, 0)
+
+    def test_handler_generations(self):
+        m = MMU()
+        generations = list(m.generations)
+        m.addHandler(0x20FF, 0x2, lambda addr: 0, lambda addr, value: None)
+        generations[0x20] += 1
+        generations[0x21] += 1
+        self.assertEqual(m.generations, generations)
+
+        # Reading a device can change it
+        m.cpu_read(0x20FF)
+        generations[0x20] += 1
+        self.assertEqual(m.generations, generations)
+
+        m.cpu_write(0x2100, 1)
+        generations[0x21] += 1
+        self.assertEqual(m.generations, generations)
+
+    def test_bank(self):
+        rom = bytearray(0x4000)
+        for i in range(4):
+            rom[i * 0x1000:(i + 1) * 0x1000] = bytes([i]) * 0x1000
+
+        m = MMU([(0x0000, 0x800)])
+        bank = m.addBank(0x8000, 0x1000, rom)
+        self.assertEqual(bank.banks, 4)
+        self.assertIs(m.pages[0x80], bank)
+        self.assertIsNone(m.pages[0x90])
+        self.assertEqual(m.cpu_read(0x8FFF), 0)
+
+        generations = list(m.generations)
+        bank.select(2)
+        self.assertEqual(m.cpu_read(0x8000), 2)
+        self.assertEqual(bank.offset, 0x2000)
+        self.assertIs(m.pages[0x80], bank)
+        self.assertEqual(
+            [p for p in range(0x100) if m.generations[p] != generations[p]],
+            list(range(0x80, 0x90))
+        )
+
+        # Nothing is copied
+        rom[0x2010] = 0x42
+        self.assertEqual(m.cpu_read(0x8010), 0x42)
+
+        bank.select(5)
+        self.assertEqual(m.cpu_read(0x8000), 1)
+        bank.map(0x0800)
+        self.assertEqual(m.cpu_read(0x87FF), 0)
+        self.assertEqual(m.cpu_read(0x8800), 1)
+        with self.assertRaises(MemoryRangeError):
+            bank.map(0x3001)
+
+        with self.assertRaises(ReadOnlyError):
+            m.cpu_write(0x8000, 1)
+        with self.assertRaises(MemoryRangeError):
+            m.addBank(0x8800, 0x1000, rom)
+
+    def test_bank_control(self):
+        # A mapper selecting the bank with any write to the ROM area
+        rom = bytes(range(0x10)) * 0x100 * 4
+        m = MMU()
+        bank = m.addBank(
+            0xC000,
+            0x1000,
+            rom,
+            control=lambda addr, value: bank.select(value)
+        )
+        m.addBank(0xD000, 0x1000, rom, offset=0x3000)
+
+        m.cpu_write(0xC123, 3)
+        self.assertEqual(bank.offset, 0x3000)
+        self.assertEqual(m.cpu_read(0xC123), 0x03)
+        with self.assertRaises(ReadOnlyError):
+            m.cpu_write(0xD000, 1)
+
+    def test_bank_writeable(self):
+        ram = bytearray(0x2000)
+        m = MMU()
+        bank = m.addBank(0x1000, 0x1000, ram, readonly=False)
+        self.assertIs(m.pages[0x10], bank)
+
+        m.cpu_write(0x1001, 0x1AB)
+        self.assertEqual(ram[0x0001], 0xAB)
+        bank.select(1)
+        m.cpu_write(0x1001, 0xCD)
+        self.assertEqual(ram[0x1001], 0xCD)
+
+        m.reset()
+        self.assertEqual(ram[0x1001], 0x00)
+        self.assertEqual(ram[0x0001], 0xAB)
+
+        with self.assertRaises(ReadOnlyError):
+            m.addBank(0x4000, 0x1000, bytes(0x1000), readonly=False)
+
+    def test_rom(self):
+        path = os.path.join(
+            os.path.dirname(os.path.realpath(__file__)),
+            "files",
+            "test_load_file.bin"
+        )
+        with open(path, "rb") as f:
+            content = f.read()
+
+        m = MMU()
+        rom = m.addROM(0x1000, path)
+        self.assertIsInstance(rom.data.obj, mmap.mmap)
+        self.assertTrue(rom.readonly)
+        self.assertEqual(rom.length, len(content))
+        self.assertEqual(m.cpu_read(0x1000), 0xA9)
+        self.assertEqual(
+            bytes(m.cpu_read(0x1000 + i) for i in range(len(content))),
+            content
+        )
+        with self.assertRaises(ReadOnlyError):
+            m.cpu_write(0x1000, 0)
+
+        with open(path, "rb") as f:
+            rom = m.addROM(0x2000, f, valueOffset=1, length=1)
+        self.assertIsInstance(rom.data.obj, mmap.mmap)
+        self.assertEqual(m.cpu_read(0x2000), content[1])
+        with self.assertRaises(IndexError):
+            m.cpu_read(0x2001)
+
+        rom = m.addROM(0x3000, io.BytesIO(content))
+        self.assertEqual(m.cpu_read(0x3000), 0xA9)
+
+        # valueOffset counts from the beginning, like for a mapped file
+        stream = io.BytesIO(content)
+        stream.read(1)
+        m.addROM(0x3100, stream, valueOffset=1)
+        self.assertEqual(m.cpu_read(0x3100), content[1])
+        with open(path, "rb") as f:
+            f.read(1)
+            m.addROM(0x3200, f, valueOffset=1)
+        self.assertEqual(m.cpu_read(0x3200), content[1])
+
+        with self.assertRaises(MemoryRangeError):
+            m.addROM(0x4000, content, valueOffset=1, length=len(content))
+
+    def test_rom_memoryview(self):
+        data = bytearray(0x2010)
+        m = MMU()
+        m.addROM(0xE000, memoryview(data)[0x10:])
+        m.addROM(0xC000, data, valueOffset=0x10)
+
+        # Nothing is copied
+        data[0x10] = 0x4C
+        self.assertEqual(m.cpu_read(0xE000), 0x4C)
+        self.assertEqual(m.cpu_read(0xC000), 0x4C)
+        self.assertEqual(m.getBlock(0xFFFF).end, 0x10000)
+
+    def test_read_range(self):
+        m = MMU([(0x0000, 0x100, False, list(range(0x100))), (0x100, 0x100)])
+        m.addHandler(0x200, 0x10, lambda addr: addr & 0xFF)
+
+        view = m.read_range(0x10, 0x20)
+        self.assertIsInstance(view, memoryview)
+        self.assertTrue(view.readonly)
+        self.assertEqual(bytes(view), bytes(range(0x10, 0x30)))
+        # A view on the block, not a copy
+        m.cpu_write(0x10, 0xAA)
+        self.assertEqual(view[0], 0xAA)
+
+        self.assertEqual(
+            bytes(m.read_range(0xFE, 0x104)),
+            bytes([0xFE, 0xFF]) + bytes(0x100) + bytes([0x00, 0x01])
+        )
+        self.assertEqual(bytes(m.read_range(0x0, 0)), b"")
+        with self.assertRaises(IndexError):
+            m.read_range(0x205, 0x10)
+
+    def test_write_range(self):
+        m = MMU([(0x0000, 0x100), (0x100, 0x100), (0x200, 0x100, True)])
+        generations = list(m.generations)
+
+        m.write_range(0xFE, [1, 2, 3, 4])
+        self.assertEqual(bytes(m.read_range(0xFD, 6)), b"\0\1\2\3\4\0")
+        generations[0] += 1
+        generations[1] += 1
+        self.assertEqual(m.generations, generations)
+
+        # Nothing is written when a part is read only
+        with self.assertRaises(ReadOnlyError):
+            m.write_range(0x1FF, b"\xFF\xFF")
+        self.assertEqual(m.cpu_read(0x1FF), 0)
+        with self.assertRaises(IndexError):
+            m.write_range(0x2FF, b"\xFF\xFF")
+
+        m.load(0x1FF, b"\xFF\xFE")
+        self.assertEqual(bytes(m.read_range(0x1FF, 2)), b"\xFF\xFE")
+
+        written = []
+        m.addHandler(
+            0x300,
+            0x10,
+            lambda addr: 0,
+            lambda addr, value: written.append((addr, value))
+        )
+        m.write_range(0x300, b"\x05\x06")
+        self.assertEqual(written, [(0x300, 5), (0x301, 6)])
+
+        m.addHandler(0x400, 0x10, lambda addr: 0)
+        m.addROM(0x500, b"\x01\x02")
+        with self.assertRaises(ReadOnlyError):
+            m.load(0x400, b"\x00")
+        with self.assertRaises(ReadOnlyError):
+            m.load(0x500, b"\x00")
+
     def test_write(self):
         m = MMU([(0, 128)])
         m.cpu_write(16, 25)
@@ -124,9 +433,378 @@ class TestMMU(unittest.TestCase):
         self.assertEqual(m.cpu_read(0), 5)
         self.assertEqual(m.cpu_read(16), 0)
 
+    def test_generations(self):
+        m = MMU([(0, 0x200), (0x200, 0x100, True, [1, 2, 3])])
+        generations = list(m.generations)
+        self.assertIs(m.blocks[0].generations, m.generations)
+        self.assertIs(m.blocks[1].generations, m.generations)
+
+        m.cpu_write(0x0105, 1)
+        generations[1] += 1
+        self.assertEqual(m.generations, generations)
+
+        m.blocks[0][0x10] = 1
+        generations[0] += 1
+        self.assertEqual(m.generations, generations)
+
+        # Read only blocks aren't cleared by reset
+        m.reset()
+        generations[0] += 1
+        generations[1] += 1
+        self.assertEqual(m.generations, generations)
+
+        m.addBlock(0x1080, 0x100)
+        generations[0x10] += 1
+        generations[0x11] += 1
+        self.assertEqual(m.generations, generations)
+
+    def test_fork(self):
+        m = MMU([(0x0000, 0x800, False, [1, 2, 3]), (0x8000, 0x100, True)])
+        f = m.fork()
+        self.assertIs(f.getBlock(0x0000)._memory, m.getBlock(0x0000)._memory)
+        self.assertEqual(f.read_range(0x0, 4).tobytes(), b"\1\2\3\0")
+
+        # Only the written page is copied
+        f.cpu_write(0x0001, 0x20)
+        self.assertEqual(f.cpu_read(0x0001), 0x20)
+        self.assertEqual(m.cpu_read(0x0001), 0x02)
+        self.assertEqual(f.getBlock(0x0000).length, 0x100)
+        self.assertIsNot(
+            f.getBlock(0x0000)._memory, m.getBlock(0x0000)._memory
+        )
+        self.assertIs(
+            f.getBlock(0x100)._memory, m.getBlock(0x100)._memory
+        )
+        self.assertIs(f._write_pages[0x00], f.pages[0x00])
+        self.assertIsNone(f._write_pages[0x01])
+
+        m.cpu_write(0x0102, 0x30)
+        self.assertEqual(m.cpu_read(0x0102), 0x30)
+        self.assertEqual(f.cpu_read(0x0102), 0x00)
+        self.assertEqual(f.generations[0x00], m.generations[0x00] + 1)
+
+        f.load(0x07FF, b"\x40")
+        self.assertEqual(f.cpu_read(0x07FF), 0x40)
+        self.assertEqual(m.cpu_read(0x07FF), 0x00)
+        with self.assertRaises(ReadOnlyError):
+            f.cpu_write(0x8000, 1)
+
+        # A fork of a fork, and the memories are reset independently
+        g = f.fork()
+        g.cpu_write(0x0001, 0x50)
+        self.assertEqual(f.cpu_read(0x0001), 0x20)
+        f.reset()
+        self.assertEqual(f.read_range(0x0, 0x800).tobytes(), bytes(0x800))
+        self.assertEqual(g.cpu_read(0x0001), 0x50)
+        self.assertEqual(m.cpu_read(0x0001), 0x02)
+        f.cpu_write(0x0003, 1)
+        self.assertIs(f._write_pages[0x00], f.pages[0x00])
+
+    def test_fork_partial_page(self):
+        m = MMU([(0x0010, 0x20), (0x0030, 0x10, True, [7])])
+        f = m.fork()
+        f.cpu_write(0x0010, 1)
+        f.write_range(0x2F, b"\2")
+        self.assertEqual(f.read_range(0x10, 0x21).tobytes(), (
+            b"\1" + bytes(0x1E) + b"\2\7"
+        ))
+        self.assertEqual(m.read_range(0x10, 0x21).tobytes(), (
+            bytes(0x20) + b"\7"
+        ))
+        with self.assertRaises(IndexError):
+            f.cpu_write(0x0040, 1)
+
+    def test_fork_devices(self):
+        written = []
+        ram = bytearray(0x200)
+        m = MMU([(0x0000, 0x100)])
+        m.addHandler(
+            0x100, 0x10, lambda addr: 0x42, lambda a, v: written.append(v)
+        )
+        bank = m.addBank(0x1000, 0x100, ram, readonly=False)
+
+        f = m.fork()
+        f.cpu_write(0x100, 1)
+        self.assertEqual(written, [1])
+        self.assertEqual(f.cpu_read(0x100), 0x42)
+
+        # The windows move on their own
+        window = f.getBlock(0x1000)
+        assert isinstance(window, Bank)
+        window.select(1)
+        self.assertEqual(bank.offset, 0)
+
+    def test_fork_bank(self):
+        ram = bytearray(0x200)
+        rom = bytes(range(0x100)) * 2
+        m = MMU()
+        m.addBank(0x1000, 0x100, ram, readonly=False)
+        m.addBank(0x1100, 0x100, ram, readonly=False, offset=0x100)
+        m.addBank(0x1200, 0x100, rom)
+        m.cpu_write(0x1000, 1)
+
+        f = m.fork()
+        f.cpu_write(0x1000, 2)
+        f.cpu_write(0x1101, 3)
+        self.assertEqual(f.read_range(0x1000, 2).tobytes(), b"\2\0")
+        self.assertEqual(ram[:2], b"\1\0")
+        self.assertEqual(ram[0x101], 0)
+        self.assertEqual(m.cpu_read(0x1000), 1)
+
+        # Windows on the same memory keep sharing it in the fork
+        window = f.getBlock(0x1000)
+        assert isinstance(window, Bank)
+        window.select(1)
+        self.assertEqual(f.cpu_read(0x1001), 3)
+
+        rom_window = f.getBlock(0x1200)
+        assert isinstance(rom_window, Bank)
+        self.assertIs(rom_window.data.obj, rom)
+
+        m.cpu_write(0x1100, 4)
+        self.assertEqual(f.cpu_read(0x1100), 0)
+
+    def test_dirty(self):
+        m = MMU([(0x0000, 0x800), (0x1000, 0x100, True)])
+        # Adding the blocks wrote their pages
+        self.assertEqual(
+            [p for p in range(0x100) if m.dirty[p]], [*range(0x08), 0x10]
+        )
+        m.clear_dirty()
+
+        m.cpu_write(0x0001, 1)
+        m.write_range(0x01FF, b"\1\2")
+        self.assertEqual(
+            [p for p in range(0x100) if m.dirty[p]], [0x00, 0x01, 0x02]
+        )
+        m.clear_dirty()
+        self.assertFalse(any(m.dirty))
+        m.cpu_read(0x0001)
+        self.assertFalse(any(m.dirty))
+        m.load(0x1000, b"\1")
+        self.assertEqual([p for p in range(0x100) if m.dirty[p]], [0x10])
+
+    def test_snapshot(self):
+        m = MMU([(0x0000, 0x800), (0x0810, 0x10), (0x8000, 0x100, True)])
+        m.addHandler(0x0800, 0x10, lambda addr: 0)
+        m.cpu_write(0x0000, 1)
+
+        full = m.snapshot()
+        self.assertIsNone(full.previous)
+        self.assertEqual(sorted(full.pages), list(range(0x09)))
+        self.assertEqual(full.pages[0x08], ((0x0810, bytes(0x10)),))
+
+        m.cpu_write(0x0000, 2)
+        m.cpu_write(0x0101, 3)
+        first = m.snapshot(full)
+        self.assertIs(first.previous, full)
+        self.assertEqual(sorted(first.pages), [0x00, 0x01])
+
+        m.cpu_write(0x0101, 4)
+        m.cpu_write(0x0815, 5)
+        second = m.snapshot(first)
+        self.assertEqual(sorted(second.pages), [0x01, 0x08])
+
+        m.cpu_write(0x0000, 6)
+        m.cpu_write(0x0700, 7)
+        m.restore(first)
+        self.assertEqual(
+            [m.cpu_read(a) for a in (0x0000, 0x0101, 0x0700, 0x0815)],
+            [2, 3, 0, 0]
+        )
+        m.restore(second)
+        self.assertEqual(
+            [m.cpu_read(a) for a in (0x0000, 0x0101, 0x0700, 0x0815)],
+            [2, 4, 0, 5]
+        )
+        m.restore(full)
+        self.assertEqual(m.read_range(0x0000, 0x800).tobytes(), (
+            b"\1" + bytes(0x7FF)
+        ))
+        self.assertEqual(m.cpu_read(0x0815), 0)
+
+    def test_snapshot_fork(self):
+        m = MMU([(0x0000, 0x200)])
+        snapshot = m.snapshot()
+        f = m.fork()
+        f.cpu_write(0x0100, 1)
+        f.restore(snapshot)
+        self.assertEqual(f.cpu_read(0x0100), 0)
+        self.assertIs(
+            f.getBlock(0x0000)._memory, m.getBlock(0x0000)._memory
+        )
+
     def tearDown(self):
         pass
 
 
+class TestMemory(unittest.TestCase):
+    class Ram(Memory):
+        def __init__(self):
+            self.data = bytearray(0x100)
+
+        def reset(self) -> None:
+            pass
+
+        def cpu_write(self, addr: int, value: int) -> None:
+            self.data[addr] = value & 0xFF
+
+        def cpu_read(self, addr: int) -> int:
+            return self.data[addr]
+
+    def test_ranges(self):
+        m = self.Ram()
+        m.write_range(0x10, b"\1\2")
+        m.load(0x12, [3])
+        self.assertEqual(bytes(m.read_range(0x0F, 5)), b"\0\1\2\3\0")
+        with self.assertRaises(IndexError):
+            m.read_range(0xFF, 2)
+
+    def test_fork(self):
+        m = self.Ram()
+        f = m.fork()
+        f.cpu_write(0, 1)
+        self.assertIsInstance(f, self.Ram)
+        self.assertEqual((m.cpu_read(0), f.cpu_read(0)), (0, 1))
+
+
+class TestFlatMemory(unittest.TestCase):
+    def test_create(self):
+        m = FlatMemory()
+        self.assertEqual(m.cpu_read(0x0000), 0)
+        self.assertEqual(m.cpu_read(0xFFFF), 0)
+
+    def test_create_with_list(self):
+        m = FlatMemory([(0x100, 0x100, True, [1, 2, 3], 0x10)])
+        self.assertEqual(m.cpu_read(0x110), 1)
+        self.assertEqual(m.cpu_read(0x112), 3)
+        self.assertEqual(m.cpu_read(0x113), 0)
+
+        with self.assertRaises(IndexError):
+            FlatMemory([(0x100, 2, False, [1, 2, 3])])
+        with self.assertRaises(MemoryRangeError):
+            FlatMemory([(0x10000, 0x100)])
+
+    def test_create_with_file(self):
+        path = os.path.join(
+            os.path.dirname(os.path.realpath(__file__)),
+            "files",
+            "test_load_file.bin"
+        )
+
+        with open(path, "rb") as f:
+            m = FlatMemory([(0, 128, True, f)])
+
+        self.assertEqual(m.cpu_read(0), 0xA9)
+
+    def test_past_end(self):
+        # Like the ROM of the nestest configuration
+        m = FlatMemory([(0xF000, 0x2000, True, [0xEA] * 0x1800, 0x0800)])
+        self.assertEqual(m.cpu_read(0xF7FF), 0x00)
+        self.assertEqual(m.cpu_read(0xF800), 0xEA)
+        self.assertEqual(m.cpu_read(0xFFFF), 0xEA)
+        self.assertEqual(len(m._memory), 0x10000)
+        with self.assertRaises(IndexError):
+            m.cpu_read(0x10000)
+
+    def test_index_error(self):
+        # Fails like MMU, negative addresses don't wrap around
+        m = FlatMemory()
+        for addr in (-1, 0x10000):
+            with self.subTest(addr=addr):
+                with self.assertRaises(IndexError):
+                    m.cpu_read(addr)
+                with self.assertRaises(IndexError):
+                    m.cpu_write(addr, 1)
+        self.assertEqual(m.cpu_read(0xFFFF), 0)
+
+    def test_overlap(self):
+        m = FlatMemory([(0x1000, 0x100), (0xF000, 0x2000, True)])
+        for start, length in ((0x10FF, 0x10), (0x0F00, 0x101), (0xFFFF, 1)):
+            with self.subTest(start=start):
+                with self.assertRaises(MemoryRangeError):
+                    m.addBlock(start, length, True, [1])
+        self.assertEqual(m.cpu_read(0x10FF), 0)
+        m.cpu_write(0x10FF, 1)
+        m.addBlock(0x1100, 0x100)
+
+    def test_write_readonly(self):
+        m = FlatMemory([(0, 16, True), (16, 16), (32, 16, True)])
+        with self.assertRaises(ReadOnlyError):
+            m.cpu_write(8, 1)
+        m.cpu_write(20, 1)
+        self.assertEqual(m.cpu_read(20), 1)
+        with self.assertRaises(ReadOnlyError):
+            m.cpu_write(40, 1)
+        m.cpu_write(48, 0x1FF)
+        self.assertEqual(m.cpu_read(48), 0xFF)
+
+    def test_reset(self):
+        m = FlatMemory([(0, 16, True, [5]), (16, 16, False)])
+        m.cpu_write(16, 10)
+        m.cpu_write(0x8000, 10)
+        m.reset()
+        self.assertEqual(m.cpu_read(0), 5)
+        self.assertEqual(m.cpu_read(16), 0)
+        self.assertEqual(m.cpu_read(0x8000), 0)
+
+    def test_generations(self):
+        m = FlatMemory([(0, 0x200), (0x200, 0x100, True, [1, 2, 3])])
+        generations = list(m.generations)
+
+        m.cpu_write(0x0105, 1)
+        generations[1] += 1
+        self.assertEqual(m.generations, generations)
+
+        m.reset()
+        self.assertEqual(
+            m.generations, [g + 1 for g in generations]
+        )
+
+    def test_ranges(self):
+        m = FlatMemory([(0x1000, 0x100, True)])
+        m.write_range(0x0FFE, [1, 2])
+        view = m.read_range(0x0FFE, 3)
+        self.assertTrue(view.readonly)
+        self.assertEqual(bytes(view), b"\1\2\0")
+
+        with self.assertRaises(ReadOnlyError):
+            m.write_range(0x0FFF, [3, 4])
+        self.assertEqual(m.cpu_read(0x0FFF), 2)
+
+        generations = list(m.generations)
+        m.load(0x0FFF, [3, 4])
+        self.assertEqual(bytes(view), b"\1\3\4")
+        self.assertEqual(
+            [p for p in range(0x100) if m.generations[p] != generations[p]],
+            [0x0F, 0x10]
+        )
+
+        with self.assertRaises(IndexError):
+            m.read_range(0xFFFF, 2)
+        with self.assertRaises(IndexError):
+            m.load(0xFFFF, [1, 2])
+
+    def test_fork(self):
+        m = FlatMemory([(0x1000, 0x100, True, [1])])
+        m.cpu_write(0x20, 2)
+        f = m.fork()
+        f.cpu_write(0x20, 3)
+        self.assertEqual((m.cpu_read(0x20), f.cpu_read(0x20)), (2, 3))
+        self.assertEqual(f.cpu_read(0x1000), 1)
+        with self.assertRaises(ReadOnlyError):
+            f.cpu_write(0x1000, 0)
+        self.assertEqual(f.generations[0], m.generations[0] + 1)
+
+    def test_cpu(self):
+        # LDA #$2A, STA $0300
+        m = FlatMemory([(0x0200, 0x100, True, [0xA9, 0x2A, 0x8D, 0x00, 0x03])])
+        c = CPU(m, 0x0200)
+        c.step()
+        c.step()
+        self.assertEqual(m.cpu_read(0x0300), 0x2A)
+        self.assertEqual(c.r.pc, 0x0205)
+
+
 if __name__ == "__main__":
     unittest.main()
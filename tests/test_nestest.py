@@ -10,11 +10,31 @@ Tests for `py65emu` module.
 
 
 import os
+import tempfile
 import unittest
+import unittest.mock
 
-from py65emu.cpu import CPU, Registers
-from py65emu.mmu import MMU
+from py65emu import codegen
+from py65emu.cpu import CPU, Registers, StopReason
+from py65emu.mmu import MMU, FlatMemory
 from py65emu.debug import Debug
+from py65emu.fusion import FUSIONS
+
+
+# Generated handlers go to a temporary cache, not the user's one
+_cache_dir = tempfile.TemporaryDirectory()
+_environ = unittest.mock.patch.dict(
+    os.environ, {"PY65EMU_CACHE_DIR": _cache_dir.name}
+)
+
+
+def setUpModule():
+    _environ.start()
+
+
+def tearDownModule():
+    _environ.stop()
+    _cache_dir.cleanup()
 
 
 class NesTestError(Exception):
@@ -52,7 +72,9 @@ class NesTestRom(unittest.TestCase):
         # Debug.crash_dump(self.c)
         pass
 
-    def load_cpu(self) -> "CPU":
+    def load_cpu(
+        self, memory: type[MMU | FlatMemory] = MMU, **kwargs
+    ) -> "CPU":
         path = os.path.join(
             os.path.dirname(os.path.realpath(__file__)),
             "files",
@@ -61,7 +83,7 @@ class NesTestRom(unittest.TestCase):
         )
 
         with open(path, "rb") as f:
-            mmu = MMU(
+            mmu = memory(
                 [
                     (0x0000, 0x800),  # RAM
                     (0x2000, 0x8),  # PPU
@@ -70,7 +92,7 @@ class NesTestRom(unittest.TestCase):
                 ]
             )
 
-        c = CPU(mmu=mmu, pc=0xC000, disable_bcd=True)
+        c = CPU(mmu=mmu, pc=0xC000, disable_bcd=True, **kwargs)
         c.r.s = 0xFD
         return c
 
@@ -116,11 +138,174 @@ class NesTestRom(unittest.TestCase):
                 self.c.cc_total, 30000, "Too many cycles!"
             )
 
+    def test_nestest_table_cycles(self):
+        self.c = self.load_cpu(table_cycles=True)
+
+        while self.c.r.pc != 0xC66E:
+            self.c.step()
+            self.checkCycle(self.c.cc_total)
+            self.assertLessEqual(
+                self.c.cc_total, 30000, "Too many cycles!"
+            )
+
+        self.c = self.load_cpu(table_cycles=True)
+        result = self.c.run(stop_pc=0xC66E, max_cycles=30000)
+        self.assertEqual(result.instructions, 8990)
+        self.checkCycle(self.c.cc_total)
+
+    def test_nestest_fast_profile(self):
+        self.c = self.load_cpu(profile="fast")
+
+        while self.c.r.pc != 0xC66E:
+            self.c.step()
+            self.checkCycle(self.c.cc_total)
+            self.assertLessEqual(
+                self.c.cc_total, 30000, "Too many cycles!"
+            )
+
+    def test_nestest_run(self):
+        result = self.c.run(stop_pc=0xC66E, max_cycles=30000)
+        self.assertEqual(result.reason, StopReason.PC)
+        self.assertEqual(result.instructions, 8990)
+        self.checkCycle(self.c.cc_total)
+
+    def test_nestest_run_until(self):
+        # Stop on the first error code written to $02/$03
+        def failed(c):
+            return bool(c.mmu.cpu_read(0x0002) or c.mmu.cpu_read(0x0003))
+
+        result = self.c.run_until(
+            pcs={0xC66E, 0xC6A3},
+            predicate=failed,
+            watch=[0x0002, 0x0003],
+            max_cycles=30000,
+        )
+        self.assertEqual(result.reason, StopReason.PC)
+        self.assertEqual(self.c.r.pc, 0xC6A3)
+        self.checkCycle(self.c.cc_total)
+
+        result = self.c.run_until(
+            pcs={0xC66E},
+            predicate=failed,
+            every=100,
+            max_cycles=30000,
+        )
+        self.assertEqual(result.reason, StopReason.PC)
+        self.assertEqual(self.c.r.pc, 0xC66E)
+        self.checkCycle(self.c.cc_total)
+
+    def test_nestest_compiled_loops(self):
+        self.c = self.load_cpu(compile_loops=True)
+        assert self.c.loops is not None
+        self.c.loops.threshold = 1
+
+        result = self.c.run(stop_pc=0xC66E, max_cycles=30000)
+        self.assertEqual(result.reason, StopReason.PC)
+        self.assertEqual(result.instructions, 8990)
+        self.checkCycle(self.c.cc_total)
+
+    def test_nestest_flat_memory(self):
+        self.c = self.load_cpu(FlatMemory)
+        self.assertIsInstance(self.c.mmu, FlatMemory)
+
+        result = self.c.run(stop_pc=0xC66E, max_cycles=30000)
+        self.assertEqual(result.reason, StopReason.PC)
+        self.assertEqual(result.instructions, 8990)
+        self.checkCycle(self.c.cc_total)
+
+    def test_nestest_banked(self):
+        # NROM-128, the 16 KiB PRG ROM is mirrored at $8000 and $C000
+        path = os.path.join(
+            os.path.dirname(os.path.realpath(__file__)),
+            "files",
+            "nestest.nes"
+        )
+        with open(path, "rb") as f:
+            prg = f.read()[0x10:0x4010]
+
+        mmu = MMU(
+            [
+                (0x0000, 0x800),  # RAM
+                (0x2000, 0x8),  # PPU
+                (0x4000, 0x18),
+            ]
+        )
+        mmu.addBank(0x8000, 0x4000, prg)
+        mmu.addBank(0xC000, 0x4000, prg)
+        self.assertEqual(mmu.cpu_read(0x8000), mmu.cpu_read(0xC000))
+
+        self.c = CPU(mmu=mmu, pc=0xC000, disable_bcd=True)
+        self.c.r.s = 0xFD
+        result = self.c.run(stop_pc=0xC66E, max_cycles=30000)
+        self.assertEqual(result.reason, StopReason.PC)
+        self.assertEqual(result.instructions, 8990)
+        self.checkCycle(self.c.cc_total)
+
+    def test_nestest_mapped(self):
+        path = os.path.join(
+            os.path.dirname(os.path.realpath(__file__)),
+            "files",
+            "nestest.nes"
+        )
+        mmu = MMU([(0x0000, 0x800), (0x2000, 0x8), (0x4000, 0x18)])
+        # Skip the 16 byte iNES header, the PRG ROM is mirrored
+        mmu.addROM(0x8000, path, valueOffset=0x10, length=0x4000)
+        mmu.addROM(0xC000, path, valueOffset=0x10, length=0x4000)
+
+        self.c = CPU(mmu=mmu, pc=0xC000, disable_bcd=True)
+        self.c.r.s = 0xFD
+        result = self.c.run(stop_pc=0xC66E, max_cycles=30000)
+        self.assertEqual(result.reason, StopReason.PC)
+        self.assertEqual(result.instructions, 8990)
+        self.checkCycle(self.c.cc_total)
+
+    def test_nestest_fork(self):
+        for cached in (False, True):
+            with self.subTest(cached=cached):
+                self.c = parent = self.load_cpu(
+                    table_cycles=cached, translate=cached, compile_loops=cached
+                )
+                parent.run(max_instructions=4000)
+                child = parent.fork()
+                self.assertIsNot(child.r, parent.r)
+                self.assertEqual(repr(child.r), repr(parent.r))
+
+                result = parent.run(stop_pc=0xC66E, max_cycles=30000)
+                self.assertEqual(result.reason, StopReason.PC)
+                self.checkCycle(parent.cc_total)
+
+                self.c = child
+                self.assertNotEqual(child.cc_total, parent.cc_total)
+                result = child.run(stop_pc=0xC66E, max_cycles=30000)
+                self.assertEqual(result.reason, StopReason.PC)
+                self.assertEqual(result.instructions, 8990 - 4000)
+                self.checkCycle(child.cc_total)
+
+    def test_nestest_fused(self):
+        self.c.fusions = FUSIONS
+
+        while self.c.r.pc != 0xC66E:
+            self.c.run(max_instructions=3, stop_pc=0xC66E)
+            self.checkCycle(self.c.cc_total)
+            self.assertLessEqual(
+                self.c.cc_total, 30000, "Too many cycles!"
+            )
+
+    def test_nestest_specialized(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.c.opcodes = self.c.opcodes.bind(
+                codegen.load(self.c.opcodes.instructions(), directory)
+            )
+
+        result = self.c.run(stop_pc=0xC66E, max_cycles=30000)
+        self.assertEqual(result.reason, StopReason.PC)
+        self.assertEqual(result.instructions, 8990)
+        self.checkCycle(self.c.cc_total)
+
     def checkCycle(self, cycle: int) -> None:
         pc = "OP: {:0>4x}".format(self.c.r.pc)
 
-        legal_op_error = self.c.mmu.cpu_read(0x0002)
-        illegal_op_error = self.c.mmu.cpu_read(0x0003)
+        legal_op_error, illegal_op_error = self.c.mmu.read_range(0x0002, 2)
 
         self.assertEqual(
             legal_op_error,
@@ -14,7 +14,13 @@ import unittest.mock
 
 from py65emu.cpu import CPU
 from py65emu.mmu import MMU
-from py65emu.operation import OpCodes, Operation, UndefinedOperation
+from py65emu.operation import (
+    INSTRUCTIONS,
+    TABLES,
+    OpCodes,
+    Operation,
+    UndefinedOperation
+)
 
 
 class TestOperation(unittest.TestCase):
@@ -40,9 +46,19 @@ class TestOperation(unittest.TestCase):
 
     def test_unknown_operation(self):
         self._cpu()
-        opc = OpCodes(self.c)
+        opc = OpCodes(CPU)
         with self.assertRaises(UndefinedOperation):
             opc[0x125]
+        with self.assertRaises(UndefinedOperation):
+            opc[-1]
+
+    def test_lookup_by_opcode(self):
+        self._cpu()
+        opc = OpCodes(CPU)
+        for opcode in range(0x100):
+            with self.subTest(opcode=opcode):
+                self.assertIs(opc[opcode], opc.ops[opcode])
+                self.assertEqual(opc[opcode].opcode, opcode)
 
     def test_repr_on_operation(self):
         subtests = [
@@ -73,6 +89,112 @@ class TestOperation(unittest.TestCase):
                 self.assertIsInstance(c, Operation)
                 self.assertEqual(repr(c), data[1])
 
+    def test_handler_is_bound_once(self):
+        self._cpu()
+        for opcode in (0x18, 0xA9, 0x0A, 0xEA):
+            with self.subTest(opcode=opcode):
+                op = self.c.opcodes[opcode]
+                handler = op.handler
+                self.assertTrue(callable(handler))
+                self.assertEqual(op.opname, op._get_opname())
+                self.assertEqual(op.amode, op._get_amode())
+                self.assertIs(op.handler, handler)
+
+    def test_execute_uses_bound_handler(self):
+        self._cpu()
+        op = self.c.opcodes[0xE8]  # INX
+        self.c.r.x = 0x41
+        op.execute(self.c)
+        self.assertEqual(self.c.r.x, 0x42)
+
+    def test_tables(self):
+        self._cpu()
+        opc = self.c.opcodes
+        self.assertIs(opc.tables, TABLES)
+
+        for opcode in range(0x100):
+            op = opc[opcode]
+            with self.subTest(opcode=opcode):
+                self.assertEqual(
+                    (
+                        TABLES.names[opcode],
+                        TABLES.modes[opcode],
+                        TABLES.cycles[opcode],
+                        TABLES.bytes[opcode],
+                        TABLES.amodes[opcode],
+                        TABLES.opnames[opcode],
+                    ),
+                    (
+                        op.name,
+                        op.mode,
+                        op.cycles,
+                        op.bytes,
+                        op.amode,
+                        op.opname,
+                    )
+                )
+
+        self.assertEqual(TABLES.bytes[0xEA], 1)  # NOP
+        self.assertEqual(TABLES.bytes[0xA9], 2)  # LDA #$BB
+        self.assertEqual(TABLES.bytes[0x6C], 3)  # JMP ($LLHH)
+        self.assertEqual(TABLES.opnames[0xD0], "B")  # BNE
+        self.assertEqual(TABLES.amodes[0x8D], "a_a")  # STA $LLHH
+
+        with self.assertRaises(TypeError):
+            INSTRUCTIONS[0xEA] = ("NOP", "imp", 3, "v", 1)  # type: ignore
+
+    def test_custom_instructions(self):
+        class Custom(OpCodes):
+            def instructions(self):
+                instructions = dict(INSTRUCTIONS)
+                del instructions[0x02]
+                return instructions
+
+        opc = Custom(CPU)
+        self.assertIsNot(opc.tables, TABLES)
+        self.assertIsNone(opc.tables.names[0x02])
+        self.assertIsNone(opc.ops[0x02])
+        self.assertEqual(opc.tables.names[0xEA], "NOP")
+
+    def test_shared_table(self):
+        a = CPU(MMU([(0x0, 0x100, False, [0xE8])]), 0x0)
+        b = CPU(MMU([(0x0, 0x100, False, [0xE8, 0xE8])]), 0x0)
+        self.assertIs(a.opcodes, b.opcodes)
+        self.assertIs(a.opcodes, OpCodes.shared(CPU))
+        self.assertFalse(hasattr(a.opcodes[0xE8], "cpu"))
+
+        a.step()
+        b.step()
+        b.step()
+        self.assertEqual((a.r.x, b.r.x), (1, 2))
+
+        class Subclass(CPU):
+            pass
+
+        c = Subclass(MMU([(0x0, 0x100)]), 0x0)
+        self.assertIsNot(c.opcodes, a.opcodes)
+        self.assertIs(c.opcodes.cpu, Subclass)
+
+    def test_bind_copies(self):
+        opc = OpCodes.shared(CPU)
+        handler = opc[0xEA].handler
+        nop = unittest.mock.Mock()
+        handlers = [None] * 0xEA + [nop] + [None] * 0x15
+
+        bound = opc.bind(handlers)
+        self.assertIsNot(bound, opc)
+        self.assertIs(opc[0xEA].handler, handler)
+        self.assertIs(bound[0xEA].handler, nop)
+        self.assertIs(bound[0xE8], opc[0xE8])
+        self.assertIs(
+            OpCodes.shared(CPU, handlers), OpCodes.shared(CPU, handlers)
+        )
+
+        c = CPU(MMU([(0x0, 0x100, False, [0xEA])]), 0x0)
+        c.opcodes = bound
+        c.step()
+        nop.assert_called_once_with(c)
+
     def tearDown(self):
         pass
 
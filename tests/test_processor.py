@@ -9,13 +9,32 @@ Processor tests for `py65emu` module.
 """
 
 
+import os
+import tempfile
 import unittest
+import unittest.mock
 
 from enum import Enum
 from py65emu.cpu import CPU, FlagBit
 from py65emu.mmu import MMU
 
 
+# Generated handlers go to a temporary cache, not the user's one
+_cache_dir = tempfile.TemporaryDirectory()
+_environ = unittest.mock.patch.dict(
+    os.environ, {"PY65EMU_CACHE_DIR": _cache_dir.name}
+)
+
+
+def setUpModule():
+    _environ.start()
+
+
+def tearDownModule():
+    _environ.stop()
+    _cache_dir.cleanup()
+
+
 class RegisterMode(Enum):
     """
     An enum helper, used when testing addressing modes for
@@ -32,6 +51,7 @@ class RegisterMode(Enum):
 
 class Processor(unittest.TestCase):
     c: CPU | None = None
+    profile = "exact"
 
     def setUp(self):
         pass
@@ -48,6 +68,7 @@ class Processor(unittest.TestCase):
                 ]
             ),
             pc,
+            profile=self.profile,
         )
         return self.c
 
@@ -3988,5 +4009,251 @@ class ProgramCounter(Processor):
         self.assertEqual(c.r.pc, 0)
 
 
+class FastProfile:
+    """Runs the tests of a :py:class:`Processor` with the `fast` profile"""
+
+    profile = "fast"
+
+
+class FastInitialization(FastProfile, Initialization):
+    pass
+
+
+class FastInstructionADC(FastProfile, InstructionADC):
+    pass
+
+
+class FastInstructionAND(FastProfile, InstructionAND):
+    pass
+
+
+class FastInstructionASL(FastProfile, InstructionASL):
+    pass
+
+
+class FastInstructionBCC(FastProfile, InstructionBCC):
+    pass
+
+
+class FastInstructionBCS(FastProfile, InstructionBCS):
+    pass
+
+
+class FastInstructionBEQ(FastProfile, InstructionBEQ):
+    pass
+
+
+class FastInstructionBIT(FastProfile, InstructionBIT):
+    pass
+
+
+class FastInstructionBMI(FastProfile, InstructionBMI):
+    pass
+
+
+class FastInstructionBNE(FastProfile, InstructionBNE):
+    pass
+
+
+class FastInstructionBPL(FastProfile, InstructionBPL):
+    pass
+
+
+class FastInstructionBRK(FastProfile, InstructionBRK):
+    pass
+
+
+class FastInstructionBVC(FastProfile, InstructionBVC):
+    pass
+
+
+class FastInstructionBVS(FastProfile, InstructionBVS):
+    pass
+
+
+class FastInstructionCLC(FastProfile, InstructionCLC):
+    pass
+
+
+class FastInstructionCLD(FastProfile, InstructionCLD):
+    pass
+
+
+class FastInstructionCLI(FastProfile, InstructionCLI):
+    pass
+
+
+class FastInstructionCLV(FastProfile, InstructionCLV):
+    pass
+
+
+class FastInstructionCMP(FastProfile, InstructionCMP):
+    pass
+
+
+class FastInstructionCPX(FastProfile, InstructionCPX):
+    pass
+
+
+class FastInstructionCPY(FastProfile, InstructionCPY):
+    pass
+
+
+class FastInstructionDEC(FastProfile, InstructionDEC):
+    pass
+
+
+class FastInstructionDEX(FastProfile, InstructionDEX):
+    pass
+
+
+class FastInstructionDEY(FastProfile, InstructionDEY):
+    pass
+
+
+class FastInstructionEOR(FastProfile, InstructionEOR):
+    pass
+
+
+class FastInstructionINC(FastProfile, InstructionINC):
+    pass
+
+
+class FastInstructionINX(FastProfile, InstructionINX):
+    pass
+
+
+class FastInstructionINY(FastProfile, InstructionINY):
+    pass
+
+
+class FastInstructionJMP(FastProfile, InstructionJMP):
+    pass
+
+
+class FastInstructionJSR(FastProfile, InstructionJSR):
+    pass
+
+
+class FastInstructionLDA(FastProfile, InstructionLDA):
+    pass
+
+
+class FastInstructionLDX(FastProfile, InstructionLDX):
+    pass
+
+
+class FastInstructionLDY(FastProfile, InstructionLDY):
+    pass
+
+
+class FastInstructionLSR(FastProfile, InstructionLSR):
+    pass
+
+
+class FastInstructionORA(FastProfile, InstructionORA):
+    pass
+
+
+class FastInstructionPHA(FastProfile, InstructionPHA):
+    pass
+
+
+class FastInstructionPHP(FastProfile, InstructionPHP):
+    pass
+
+
+class FastInstructionPLA(FastProfile, InstructionPLA):
+    pass
+
+
+class FastInstructionPLP(FastProfile, InstructionPLP):
+    pass
+
+
+class FastInstructionROL(FastProfile, InstructionROL):
+    pass
+
+
+class FastInstructionROR(FastProfile, InstructionROR):
+    pass
+
+
+class FastInstructionRTI(FastProfile, InstructionRTI):
+    pass
+
+
+class FastInstructionRTS(FastProfile, InstructionRTS):
+    pass
+
+
+class FastInstructionSBC(FastProfile, InstructionSBC):
+    pass
+
+
+class FastInstructionSEC(FastProfile, InstructionSEC):
+    pass
+
+
+class FastInstructionSED(FastProfile, InstructionSED):
+    pass
+
+
+class FastInstructionSEI(FastProfile, InstructionSEI):
+    pass
+
+
+class FastInstructionSTA(FastProfile, InstructionSTA):
+    pass
+
+
+class FastInstructionSTX(FastProfile, InstructionSTX):
+    pass
+
+
+class FastInstructionSTY(FastProfile, InstructionSTY):
+    pass
+
+
+class FastInstructionTAX(FastProfile, InstructionTAX):
+    pass
+
+
+class FastInstructionTSX(FastProfile, InstructionTSX):
+    pass
+
+
+class FastInstructionTXS(FastProfile, InstructionTXS):
+    pass
+
+
+class FastAccumulatorAddress(FastProfile, AccumulatorAddress):
+    pass
+
+
+class FastIndexAddress(FastProfile, IndexAddress):
+    pass
+
+
+class FastCompareAddress(FastProfile, CompareAddress):
+    pass
+
+
+class FastDecrementIncrementAddress(FastProfile, DecrementIncrementAddress):
+    pass
+
+
+class FastStoreInMemoryAddress(FastProfile, StoreInMemoryAddress):
+    pass
+
+
+class FastCycle(FastProfile, Cycle):
+    pass
+
+
+class FastProgramCounter(FastProfile, ProgramCounter):
+    pass
+
+
 if __name__ == "__main__":
     unittest.main()
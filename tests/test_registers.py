@@ -8,7 +8,7 @@ test_mmu
 
 import unittest
 
-from py65emu.cpu import FlagBit, Registers
+from py65emu.cpu import FLAG_C, FLAG_N, FLAG_Z, FlagBit, Registers
 
 
 class TestRegisters(unittest.TestCase):
@@ -43,6 +43,79 @@ class TestRegisters(unittest.TestCase):
         r.setFlag("Z", False)
         self.assertFalse(r.getFlag("Z"))
 
+    def test_flags_int(self):
+        r = Registers()
+        r.setFlag(0x80)
+        self.assertEqual(r.p, 0b10100100)
+        self.assertTrue(r.getFlag(0x80))
+        r.clearFlag(0x80)
+        self.assertEqual(r.p, 0b00100100)
+
+        with self.assertRaises(ValueError):
+            r.setFlag(0x03)
+        with self.assertRaises(KeyError):
+            r.getFlag("X")
+
+    def test_flags_mask(self):
+        r = Registers()
+        r._set_flag(FLAG_N)
+        r._set_flag(FLAG_C, 0x40)
+        self.assertEqual(r.p, 0b10100101)
+        self.assertIs(r._get_flag(FLAG_C), True)
+        self.assertIs(r._get_flag(FLAG_Z), False)
+        r._set_flag(FLAG_C, False)
+        r._clear_flag(FLAG_N)
+        self.assertEqual(r.p, 0b00100100)
+
+        for v, p in ((0x00, 0b00100110), (0x80, 0b10100100), (0x7F, 0x24)):
+            with self.subTest(v=v):
+                r.p = 0b10100110
+                r.ZN(v)
+                self.assertEqual(r.p, p)
+
+    def test_lazy_flags(self):
+        r = Registers()
+        r.ZN(0x00)
+        r._c = True
+        r._v = 0x80
+        self.assertEqual(r._p, 0b00100100)
+        self.assertEqual(r.p, 0b01100111)
+
+        r.ZN(0x80)
+        r._c = 0
+        self.assertTrue(r.getFlag("N"))
+        self.assertFalse(r.getFlag("Z"))
+        self.assertFalse(r.getFlag("C"))
+        self.assertEqual(r.flags, "NVU..I..")
+
+        r.ZN(0x01)
+        r.setFlag("Z")
+        self.assertEqual(r.p, 0b01100110)
+
+        # Every value written reads back, N and Z set together included
+        for p in range(0x100):
+            with self.subTest(p=p):
+                r.p = p
+                self.assertEqual(r.p, p)
+
+    def test_flags_each(self):
+        """Setting or clearing one flag leaves every other one as it was"""
+        r = Registers()
+        for p in range(0x100):
+            for bit in range(8):
+                mask = 1 << bit
+                for v in (False, True):
+                    r.p = p
+                    r._set_flag(mask, v)
+                    expected = p | mask if v else p & ~mask
+                    if r.p != expected or r._get_flag(mask) != v:
+                        self.fail(f"P {p:02x} flag {mask:02x} {v}")
+
+    def test_slots(self):
+        r = Registers()
+        with self.assertRaises(AttributeError):
+            r.q = 0  # type: ignore[attr-defined]
+
     def tearDown(self):
         pass
 
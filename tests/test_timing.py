@@ -54,6 +54,12 @@ class Timing(unittest.TestCase):
         return cycle_test_data_results
 
     def test_cycle_test(self):
+        self._cycle_test()
+
+    def test_cycle_test_table_cycles(self):
+        self._cycle_test(table_cycles=True)
+
+    def _cycle_test(self, **kwargs):
         path = os.path.join(
             os.path.dirname(os.path.realpath(__file__)),
             "files",
@@ -64,7 +70,7 @@ class Timing(unittest.TestCase):
         with open(path, "rb") as f:
             mmu.addBlock(0x0000, 0x10000, False, f)
 
-        c = CPU(mmu, 0x00)
+        c = CPU(mmu, 0x00, **kwargs)
         c.r.s = 0xFD
 
         total_no_of_cycles = 0
@@ -0,0 +1,595 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_translate
+----------------------------------
+
+Tests for `py65emu.translate` module.
+"""
+
+import random
+import unittest
+
+from py65emu.cpu import CPU, RunResult, StopReason
+from py65emu.mmu import MMU, Memory
+from py65emu.translate import (
+    BRANCHES,
+    TERMINATORS,
+    TRANSLATABLE,
+    BlockCache,
+    LoopCache,
+    size
+)
+
+
+class Ram(Memory):
+    """64KiB of plain RAM, cheap to compare"""
+
+    def __init__(self, data: bytes | bytearray = bytes(0x10000)):
+        self.data = bytearray(data)
+
+    def reset(self) -> None:
+        pass
+
+    def cpu_write(self, addr: int, value: int) -> None:
+        self.data[addr] = value & 0xFF
+
+    def cpu_read(self, addr: int) -> int:
+        return self.data[addr]
+
+
+class TrackedRam(Ram):
+    """:py:class:`Ram` keeping write counters"""
+
+    def __init__(self, data: bytes | bytearray = bytes(0x10000)):
+        super().__init__(data)
+        self.generations = [0] * 0x100
+
+    def cpu_write(self, addr: int, value: int) -> None:
+        self.data[addr] = value & 0xFF
+        self.generations[addr >> 8] += 1
+
+
+class TestTranslate(unittest.TestCase):
+    CODE = 0xC000
+
+    def _pair(self, data, disable_bcd=False):
+        interpreted = CPU(Ram(data), self.CODE, disable_bcd=disable_bcd)
+        translated = CPU(Ram(data), self.CODE, disable_bcd=disable_bcd)
+        translated.blocks = BlockCache(translated, threshold=1)
+        return interpreted, translated
+
+    def _translating(self, mmu, pc):
+        c = CPU(mmu, pc)
+        c.blocks = BlockCache(c, threshold=1)
+        return c
+
+    def _program(self, rng, opcodes):
+        body = [
+            op for op in opcodes.ops
+            if op and op.name in TRANSLATABLE and op.name not in TERMINATORS
+        ]
+        last = [op for op in opcodes.ops if op and op.name in TERMINATORS]
+
+        program = []
+        for op in rng.sample(body, rng.randint(1, 12)) + [rng.choice(last)]:
+            program.append(op.opcode)
+            if size(op) > 1:
+                program.append(rng.randrange(0x100))
+            if size(op) > 2:
+                # Keep data accesses away from the code
+                program.append(rng.randrange(0x40))
+        return program
+
+    def _assertSameState(self, a, b):
+        self.assertEqual(
+            (a.r.a, a.r.x, a.r.y, a.r.s, a.r.p, a.r.pc),
+            (b.r.a, b.r.x, b.r.y, b.r.s, b.r.p, b.r.pc),
+        )
+        self.assertEqual((a.cc, a.cc_extra), (b.cc, b.cc_extra))
+        self.assertEqual(a.cc_total, b.cc_total)
+        self.assertEqual(a.op.opcode, b.op.opcode)
+        self.assertEqual(a.mmu.data, b.mmu.data)
+
+    def _differential(self, disable_bcd):
+        rng = random.Random(6502)
+        data = bytearray(rng.randbytes(0x10000))
+        # Zero page pointers stay below the code
+        data[:0x100] = bytes(v & 0x7F for v in data[:0x100])
+        a, b = self._pair(data, disable_bcd)
+
+        for _ in range(300):
+            program = self._program(rng, a.opcodes)
+            for i, v in enumerate(program):
+                a.mmu.cpu_write(self.CODE + i, v)
+                b.mmu.cpu_write(self.CODE + i, v)
+            b.blocks.flush()
+
+            registers = (*rng.randbytes(4), rng.randrange(0x100) | 0x20)
+            for c in (a, b):
+                c.r.pc = self.CODE
+                c.r.a, c.r.x, c.r.y, c.r.s, c.r.p = registers
+
+            block = b.blocks.lookup(self.CODE)
+            self.assertIsNotNone(block)
+
+            self.assertEqual(
+                a.run(max_instructions=block.length),
+                b.run(max_instructions=block.length),
+                block.source
+            )
+            self._assertSameState(a, b)
+
+    def test_matches_interpreter(self):
+        self._differential(disable_bcd=False)
+
+    def test_matches_interpreter_bcd_disabled(self):
+        self._differential(disable_bcd=True)
+
+    def test_block_extent(self):
+        # LDA #$01; STA $10; INX; BNE $C000; BRK
+        a, b = self._pair(bytes(0x10000))
+        for i, v in enumerate([0xA9, 0x01, 0x85, 0x10, 0xE8, 0xD0, 0xF9, 0]):
+            b.mmu.cpu_write(self.CODE + i, v)
+
+        block = b.blocks.translate(self.CODE)
+        self.assertEqual(block.start, 0xC000)
+        self.assertEqual(block.end, 0xC007)
+        self.assertEqual(block.length, 4)
+        self.assertEqual(block.max_cycles, 2 + 3 + 2 + 2 + 1)
+        self.assertEqual(repr(block), "<TranslatedBlock $c000-$c007 4 instr.>")
+
+        # BRK is left to the interpreter
+        self.assertIsNone(b.blocks.translate(0xC007))
+
+    def test_max_length(self):
+        _, b = self._pair(bytes([0xEA]) * 0x10000)
+        block = b.blocks.translate(self.CODE)
+        self.assertEqual(block.length, BlockCache.max_length)
+        self.assertEqual(block.end, self.CODE + BlockCache.max_length)
+
+    def test_threshold(self):
+        _, b = self._pair(bytes([0xEA]) * 0x10000)
+        blocks = b.blocks
+        blocks.threshold = 3
+
+        self.assertIsNone(blocks.lookup(self.CODE))
+        self.assertIsNone(blocks.lookup(self.CODE))
+        block = blocks.lookup(self.CODE)
+        self.assertIsNotNone(block)
+        self.assertIs(blocks.lookup(self.CODE), block)
+
+    def test_invalidate(self):
+        _, b = self._pair(bytes([0xEA]) * 0x10000)
+        blocks = b.blocks
+
+        block = blocks.lookup(self.CODE)
+        self.assertIs(blocks.lookup(self.CODE), block)
+
+        # Outside of the block
+        blocks.invalidate(self.CODE + block.length)
+        self.assertIs(blocks.lookup(self.CODE), block)
+
+        b.mmu.cpu_write(self.CODE + 1, 0x00)
+        blocks.invalidate(self.CODE + 1)
+        block = blocks.lookup(self.CODE)
+        self.assertEqual(block.length, 1)
+
+        blocks.flush()
+        self.assertEqual(blocks.blocks, {})
+        self.assertIsNot(blocks.lookup(self.CODE), block)
+
+    def test_invalidate_untranslatable(self):
+        _, b = self._pair(bytes(0x10000))
+        self.assertIsNone(b.blocks.lookup(self.CODE))
+
+        b.mmu.cpu_write(self.CODE, 0xEA)
+        b.blocks.invalidate(self.CODE, self.CODE + 0x100)
+        self.assertIsNotNone(b.blocks.lookup(self.CODE))
+
+    def test_generations(self):
+        """Code changes are picked up from the MMU write counters"""
+        c = self._translating(
+            MMU([(0x0000, 0x400, False, [0xEA] * 0x10, 0x200)]), 0x200
+        )
+        blocks = c.blocks
+        self.assertIs(blocks.generations, c.mmu.generations)
+
+        block = blocks.lookup(0x200)
+        self.assertEqual(block.length, 0x10)
+        self.assertEqual(block.checks, ((2, c.mmu.generations[2]),))
+
+        # Data on the same page, the block is still valid
+        c.mmu.cpu_write(0x2F0, 1)
+        self.assertIs(blocks.lookup(0x200), block)
+        self.assertEqual(block.checks, ((2, c.mmu.generations[2]),))
+
+        # Same value, same code
+        c.mmu.cpu_write(0x205, 0xEA)
+        self.assertIs(blocks.lookup(0x200), block)
+
+        c.mmu.cpu_write(0x205, 0x00)
+        block = blocks.lookup(0x200)
+        self.assertEqual(block.length, 5)
+
+        # Untranslatable code turned into translatable code
+        self.assertIsNone(blocks.lookup(0x205))
+        c.mmu.cpu_write(0x205, 0xEA)
+        self.assertEqual(blocks.lookup(0x205).length, 0xB)
+
+    def test_self_modifying_code(self):
+        """
+        The loop increments the immediate operand of its own `LDA`:
+
+        .. code-block::
+
+            $0200: LDA #$00
+                   CLC
+                   ADC #$01
+                   STA $0201
+                   BNE $0200
+                   BRK
+        """
+        program = [
+            0xA9, 0x00, 0x18, 0x69, 0x01, 0x8D, 0x01, 0x02, 0xD0, 0xF6, 0x00
+        ]
+        results = []
+        for translate in (False, True):
+            c = CPU(MMU([(0x0000, 0x400, False, program, 0x200)]), 0x200)
+            if translate:
+                c.blocks = BlockCache(c, threshold=1)
+            results.append((c.run(max_instructions=5 * 256), c.r.pc, c.r.a))
+
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[1][1:], (0x020A, 0x00))
+
+    def test_stores_to_own_code(self):
+        """
+        Each iteration patches the immediate operand of the `LDA` further
+        down its block, at a fixed and at a computed address:
+
+        .. code-block::
+
+            $0200: LDX #$00
+                   LDY #$00
+            loop:  INX
+                   STX $0209      ; or TXA; STA $020A,Y
+                   LDA #$00
+                   STA $0300,X
+                   CPX #$40
+                   BNE loop
+                   KIL
+        """
+        static = [
+            0xA2, 0x00, 0xA0, 0x00, 0xE8, 0x8E, 0x09, 0x02, 0xA9, 0x00,
+            0x9D, 0x00, 0x03, 0xE0, 0x40, 0xD0, 0xF3, 0x02,
+        ]
+        computed = [
+            0xA2, 0x00, 0xA0, 0x00, 0xE8, 0x8A, 0x99, 0x0A, 0x02, 0xA9,
+            0x00, 0x9D, 0x00, 0x03, 0xE0, 0x40, 0xD0, 0xF2, 0x02,
+        ]
+        for program in (static, computed):
+            data = bytearray(0x10000)
+            data[0x200:0x200 + len(program)] = program
+            for memory in (Ram, TrackedRam):
+                with self.subTest(program=program, memory=memory):
+                    interpreted = CPU(memory(data), 0x200)
+                    c = self._translating(memory(data), 0x200)
+
+                    self.assertEqual(interpreted.run(), c.run())
+                    self._assertSameState(interpreted, c)
+                    self.assertEqual(
+                        c.mmu.data[0x301:0x341], bytes(range(1, 0x41))
+                    )
+
+    def test_run_limits(self):
+        # LDX #$00; loop: INX; CPX #$10; BNE loop; BRK
+        program = [0xA2, 0x00, 0xE8, 0xE0, 0x10, 0xD0, 0xFB, 0x00]
+        c = self._translating(
+            MMU([(0x0000, 0x400, False, program, 0x200)]), 0x200
+        )
+
+        self.assertEqual(
+            c.run(max_instructions=10),
+            RunResult(23, 10, StopReason.INSTRUCTIONS)
+        )
+        self.assertEqual(
+            c.run(max_cycles=7),
+            RunResult(7, 3, StopReason.CYCLES)
+        )
+        # Stops in the middle of a block
+        self.assertEqual(c.run(stop_pc=0x0205).reason, StopReason.PC)
+        self.assertEqual(c.r.pc, 0x0205)
+
+        result = c.run(stop_pc=0x0207)
+        self.assertEqual(result.reason, StopReason.PC)
+        self.assertEqual(c.r.x, 0x10)
+
+    def test_reset_flushes(self):
+        c = CPU(MMU([(0x0000, 0x10000)]), 0x200, translate=True)
+        self.assertIsInstance(c.blocks, BlockCache)
+
+        c.blocks = blocks = BlockCache(c, threshold=1)
+        blocks.lookup(0x200)
+        self.assertNotEqual(blocks.blocks, {})
+        c.reset()
+        self.assertEqual(blocks.blocks, {})
+
+
+class TestLoopCache(unittest.TestCase):
+    CODE = 0xC000
+    IO = 0x2000
+
+    def _loop(self, rng, opcodes):
+        """A random loop, ending with a branch back to its start"""
+        body = [
+            op for op in opcodes.ops
+            if op and op.name in TRANSLATABLE and op.name not in TERMINATORS
+        ]
+        branches = [op for op in opcodes.ops if op and op.name in BRANCHES]
+
+        program = []
+        for op in rng.sample(body, rng.randint(1, 8)):
+            program.append(op.opcode)
+            if size(op) > 1:
+                program.append(rng.randrange(0x100))
+            if size(op) > 2:
+                # Keep data accesses away from the code
+                program.append(rng.randrange(0x40))
+        program += [rng.choice(branches).opcode, (-len(program) - 2) & 0xFF]
+        return program + [0x02]  # KIL
+
+    def _cpu(self, data, pc=CODE):
+        c = CPU(TrackedRam(data), pc, compile_loops=True)
+        assert c.loops is not None
+        c.loops.threshold = 1
+        return c
+
+    def _state(self, c):
+        return (
+            c.r.a, c.r.x, c.r.y, c.r.s, c.r.p, c.r.pc,
+            c.cc, c.cc_extra, c.cc_total, c.op and c.op.opcode, c.running,
+            c.mmu.data,
+        )
+
+    def test_matches_interpreter(self):
+        rng = random.Random(6510)
+        data = bytearray(rng.randbytes(0x10000))
+        # Zero page pointers stay below the code
+        data[:0x100] = bytes(v & 0x7F for v in data[:0x100])
+        interpreted = CPU(Ram(data), self.CODE)
+        compiled = self._cpu(data)
+        assert compiled.loops is not None
+        compiled.loops.add_io(self.IO, 0x100)
+
+        loops = 0
+        for _ in range(300):
+            program = self._loop(rng, interpreted.opcodes)
+            for c in (interpreted, compiled):
+                for i, v in enumerate(program):
+                    c.mmu.cpu_write(self.CODE + i, v)
+                c.r.pc = self.CODE
+                c.running = True
+
+            registers = (*rng.randbytes(4), rng.randrange(0x100) | 0x20)
+            for c in (interpreted, compiled):
+                c.r.a, c.r.x, c.r.y, c.r.s, c.r.p = registers
+
+            budget = rng.choice((
+                {"max_instructions": rng.randrange(1, 2000)},
+                {"max_cycles": rng.randrange(1, 5000)},
+            ))
+            self.assertEqual(
+                interpreted.run(**budget), compiled.run(**budget)
+            )
+            self.assertEqual(self._state(interpreted), self._state(compiled))
+            loops += compiled.loops.lookup(self.CODE) is not None
+
+        # Most of them are compiled
+        self.assertGreater(loops, 200)
+
+    def test_loop_extent(self):
+        # loop: STA $0300,X; DEX; BNE loop; BRK
+        c = self._cpu(bytes(0x10000), 0x200)
+        for i, v in enumerate([0x9D, 0x00, 0x03, 0xCA, 0xD0, 0xFA, 0x00]):
+            c.mmu.cpu_write(0x200 + i, v)
+        assert c.loops is not None
+
+        loop = c.loops.lookup(0x200)
+        assert loop is not None
+        self.assertEqual(
+            (loop.start, loop.end, loop.length), (0x200, 0x206, 3)
+        )
+        self.assertEqual(loop.max_cycles, 5 + 2 + 3)
+        self.assertIs(c.loops.lookup(0x200), loop)
+
+        # Not loops
+        self.assertIsNone(c.loops.lookup(0x203))
+        self.assertIsNone(c.loops.lookup(0x206))
+
+    def test_threshold(self):
+        # loop: INX; BNE loop
+        data = bytearray(0x10000)
+        data[0x200:0x203] = [0xE8, 0xD0, 0xFD]
+        c = CPU(TrackedRam(data), 0x200, compile_loops=True)
+        assert c.loops is not None
+        for _ in range(c.loops.threshold - 1):
+            self.assertIsNone(c.loops.lookup(0x200))
+        self.assertIsNotNone(c.loops.lookup(0x200))
+
+        # Memories without generations aren't compiled for
+        c = CPU(Ram(data), 0x200, compile_loops=True)
+        assert c.loops is not None
+        c.loops.threshold = 1
+        self.assertIsNone(c.loops.lookup(0x200))
+
+    def test_run(self):
+        """
+        Clears a page, then sums it up:
+
+        .. code-block::
+
+            $0200: LDA #$55
+                   LDY #$00
+            clear: STA ($10),Y
+                   INY
+                   BNE clear
+                   CLC
+            sum:   ADC ($10),Y
+                   INY
+                   BNE sum
+                   KIL
+        """
+        program = [
+            0xA9, 0x55, 0xA0, 0x00, 0x91, 0x10, 0xC8, 0xD0, 0xFB, 0x18,
+            0x71, 0x10, 0xC8, 0xD0, 0xFB, 0x02,
+        ]
+        data = bytearray(0x10000)
+        data[0x200:0x200 + len(program)] = program
+        data[0x10:0x12] = [0x00, 0x30]
+
+        interpreted = CPU(Ram(data), 0x200)
+        c = self._cpu(data, 0x200)
+        assert c.loops is not None
+
+        self.assertEqual(interpreted.run(), c.run())
+        self.assertEqual(self._state(interpreted), self._state(c))
+        self.assertEqual(sorted(c.loops.loops), [0x204, 0x20A])
+
+    def test_io(self):
+        # loop: LDA $1FFE,X; INX; BNE loop; KIL
+        data = bytearray(0x10000)
+        data[0x200:0x207] = [0xBD, 0xFE, 0x1F, 0xE8, 0xD0, 0xFA, 0x02]
+        c = self._cpu(data, 0x200)
+        assert c.loops is not None
+        c.loops.add_io(0x2000, 0x10)
+
+        loop = c.loops.lookup(0x200)
+        assert loop is not None
+        # Stops right before reading $2000
+        self.assertEqual(loop.fn(c, 100), (2 * 3, 2 * 9))
+        self.assertEqual((c.r.pc, c.r.x), (0x200, 0x02))
+        self.assertEqual((c.op.name, c.cc), ("BNE", 3))
+
+        # Static accesses aren't compiled
+        data[0x200:0x203] = [0xAD, 0x00, 0x20]
+        c = self._cpu(data, 0x200)
+        assert c.loops is not None
+        c.loops.add_io(0x2000, 0x10)
+        self.assertIsNone(c.loops.lookup(0x200))
+
+    def test_interrupt(self):
+        # loop: INX; BNE loop; KIL
+        data = bytearray(0x10000)
+        data[0x200:0x203] = [0xE8, 0xD0, 0xFD]
+        c = self._cpu(data, 0x200)
+        assert c.loops is not None
+        loop = c.loops.lookup(0x200)
+        assert loop is not None
+
+        c.trigger_irq = True
+        self.assertEqual(loop.fn(c, 100), (2, 5))
+        self.assertEqual((c.r.pc, c.r.x), (0x200, 0x01))
+
+    def test_self_modifying_code(self):
+        """
+        The loop increments the immediate operand of its own `LDA`:
+
+        .. code-block::
+
+            $0200: LDX #$01
+            loop:  LDA #$00
+                   CLC
+                   ADC #$01
+                   STA $0202,X
+                   BNE loop
+                   KIL
+        """
+        program = [
+            0xA2, 0x01, 0xA9, 0x00, 0x18, 0x69, 0x01, 0x9D, 0x02, 0x02,
+            0xD0, 0xF6, 0x02,
+        ]
+        data = bytearray(0x10000)
+        data[0x200:0x200 + len(program)] = program
+
+        interpreted = CPU(Ram(data), 0x200)
+        c = self._cpu(data, 0x200)
+        assert c.loops is not None
+        self.assertEqual(interpreted.run(), c.run())
+        self.assertEqual(self._state(interpreted), self._state(c))
+        self.assertEqual((c.r.pc, c.r.a), (0x020D, 0x00))
+
+        # Stores to fixed addresses in the loop aren't compiled
+        data[0x207:0x20A] = [0x8D, 0x03, 0x02]
+        c = self._cpu(data, 0x200)
+        assert c.loops is not None
+        self.assertIsNone(c.loops.lookup(0x202))
+
+    def test_store_to_following_code(self):
+        """
+        Each iteration patches the immediate operand of the `LDA` right
+        after its store:
+
+        .. code-block::
+
+            $0300: LDX #$00
+                   LDY #$00
+            loop:  INX
+                   TXA
+                   STA $030A,Y
+                   LDA #$00
+                   STA $0500,X
+                   CPX #$40
+                   BNE loop
+                   KIL
+        """
+        program = [
+            0xA2, 0x00, 0xA0, 0x00, 0xE8, 0x8A, 0x99, 0x0A, 0x03, 0xA9,
+            0x00, 0x9D, 0x00, 0x05, 0xE0, 0x40, 0xD0, 0xF2, 0x02,
+        ]
+        data = bytearray(0x10000)
+        data[0x300:0x300 + len(program)] = program
+
+        interpreted = CPU(Ram(data), 0x300)
+        c = self._cpu(data, 0x300)
+        assert c.loops is not None
+        self.assertEqual(interpreted.run(), c.run())
+        self.assertEqual(self._state(interpreted), self._state(c))
+        self.assertEqual(c.mmu.data[0x501:0x541], bytes(range(1, 0x41)))
+        self.assertIsNotNone(c.loops.loops.get(0x304))
+
+    def test_run_limits(self):
+        # LDX #$00; loop: INX; CPX #$10; BNE loop; KIL
+        data = bytearray(0x10000)
+        data[0x200:0x208] = [0xA2, 0x00, 0xE8, 0xE0, 0x10, 0xD0, 0xFB, 0x02]
+        c = self._cpu(data, 0x200)
+
+        self.assertEqual(
+            c.run(max_instructions=10),
+            RunResult(23, 10, StopReason.INSTRUCTIONS)
+        )
+        self.assertEqual(
+            c.run(max_cycles=14),
+            RunResult(14, 6, StopReason.CYCLES)
+        )
+        # Stops in the middle of a loop
+        self.assertEqual(c.run(stop_pc=0x0205).reason, StopReason.PC)
+        self.assertEqual(c.r.pc, 0x0205)
+
+        result = c.run(stop_pc=0x0207)
+        self.assertEqual(result.reason, StopReason.PC)
+        self.assertEqual(c.r.x, 0x10)
+
+    def test_reset_flushes(self):
+        c = self._cpu(bytes(0x10000), 0x200)
+        assert c.loops is not None
+        self.assertIsInstance(c.loops, LoopCache)
+        c.loops.lookup(0x200)
+        self.assertNotEqual(c.loops.loops, {})
+        c.reset()
+        self.assertEqual(c.loops.loops, {})
+
+
+if __name__ == "__main__":
+    unittest.main()